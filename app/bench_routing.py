@@ -0,0 +1,152 @@
+"""
+Before/after per-update routing overhead of callback queries.
+
+Rebuilds the bot's callback handler table twice with no-op handlers:
+legacy (one `F.data` filter per handler, admin check on every admin
+handler) and current (`Route` filters, router-level admin check and
+CallbackRouteMiddleware). Feeds the same callback updates through both
+dispatchers, checks they pick the same handler and times feed_update.
+
+Usage:
+    python -m app.bench_routing [--repeat N]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from aiogram import Bot, Dispatcher, F, Router
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from app.keyboards.callbacks import Route
+from app.middlewares.callback_route import CallbackRouteMiddleware, RouterGate
+from app.middlewares.role import RoleMiddleware
+from app.services.role_service import admin_ids, observe
+
+ADMIN_ID = 1
+CLIENT_ID = 2
+
+# (callback data, sent by admin) - client traffic first, as in production
+SAMPLES = [
+    ("page:1", False),
+    ("butcher:42", False),
+    ("back_to_list", False),
+    ("butcher_loc:42", False),
+    ("district:17", False),
+    ("region:3", False),
+    ("client:nearby", False),
+    ("client:settings", False),
+    ("radius:5", False),
+    ("noop", False),
+    ("back_to_menu", False),
+    ("role:client", False),
+    ("price:SELL:Mol", False),
+    ("admin_butchers_page:all:0:n:1700000000:12:1", True),
+    ("admin_butcher_view:5", True),
+    ("toggle_closed:5", True),
+    ("cancel:delete:5", True),
+]
+
+
+def _legacy_filter(route: Route):
+    """The F.data filter the handler had before the prefix routes."""
+    fields = list(route.factory.model_fields)
+    head = ":".join([route.prefix] + [str(route.values[f]) for f in fields if f in route.values])
+    if len(route.values) == len(fields):
+        return F.data == head
+    return F.data.startswith(head + ":")
+
+
+def _noop(name: str, hits: list):
+    async def handler(callback: CallbackQuery):
+        hits.append(name)
+    return handler
+
+
+def build(routers: list, legacy: bool, hits: list) -> Dispatcher:
+    """Dispatcher with the callback handlers of `routers`, each replaced by a no-op."""
+    dp = Dispatcher(storage=MemoryStorage())
+    if not legacy:
+        dp.update.outer_middleware(RoleMiddleware())
+    copies = []
+    for router in routers:
+        copy = Router(name=router.name)
+        root = [f.callback for f in router.callback_query._handler.filters or ()
+                if not isinstance(f.callback, RouterGate)]
+        if not legacy:
+            copy.callback_query.filter(*root)
+        for handler in router.callback_query.handlers:
+            filters = []
+            for flt in handler.filters or ():
+                if legacy and isinstance(flt.callback, Route):
+                    filters.append(_legacy_filter(flt.callback))
+                else:
+                    filters.append(flt.callback)
+            if legacy and root:
+                filters.append(F.from_user.id.in_(admin_ids()))
+            copy.callback_query.register(_noop(handler.callback.__name__, hits), *filters)
+        dp.include_router(copy)
+        copies.append(copy)
+    if not legacy:
+        dp.callback_query.outer_middleware(CallbackRouteMiddleware(*copies))
+    return dp
+
+
+def _update(update_id: int, data: str, admin: bool) -> Update:
+    user = User(id=ADMIN_ID if admin else CLIENT_ID, is_bot=False, first_name="Bench")
+    message = Message(message_id=1, date=0, chat=Chat(id=user.id, type="private"), text="menu")
+    return Update(update_id=update_id, callback_query=CallbackQuery(
+        id=str(update_id), from_user=user, chat_instance="bench", message=message, data=data
+    ))
+
+
+async def time_routing(dp: Dispatcher, bot: Bot, hits: list, repeat: int) -> dict:
+    """Median feed_update time per sample (µs) and the handler each one reached."""
+    result = {}
+    for n, (data, admin) in enumerate(SAMPLES):
+        update = _update(n, data, admin)
+        hits.clear()
+        await dp.feed_update(bot, update)
+        routed = hits[0] if hits else "-"
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await dp.feed_update(bot, update)
+            samples.append(time.perf_counter() - start)
+        result[data] = (statistics.median(samples) * 1e6, routed)
+    return result
+
+
+async def run(repeat: int):
+    from app.handlers import common, butcher, client, admin
+
+    observe({"telegram_id": ADMIN_ID, "role": "admin"})
+    routers = [common.router, butcher.router, client.router, admin.router]
+    bot = Bot(token="42:BENCH")
+    hits = []
+    try:
+        before = await time_routing(build(routers, True, hits), bot, hits, repeat)
+        after = await time_routing(build(routers, False, hits), bot, hits, repeat)
+    finally:
+        await bot.session.close()
+
+    print(f"feed_update per callback, median of {repeat} runs (µs)")
+    print(f"{'callback data':<46}{'before':>10}{'after':>10}  handler")
+    for data, _ in SAMPLES:
+        mark = "" if before[data][1] == after[data][1] else f"  (before: {before[data][1]})"
+        print(f"{data:<46}{before[data][0]:>10.1f}{after[data][0]:>10.1f}  {after[data][1]}{mark}")
+    total_before = statistics.mean(v[0] for v in before.values())
+    total_after = statistics.mean(v[0] for v in after.values())
+    print(f"{'mean':<46}{total_before:>10.1f}{total_after:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Callback routing overhead: F.data chains vs prefix routes")
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(run(args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import hashlib
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -9,35 +10,81 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 if not BOT_TOKEN:
     raise RuntimeError("BOT_TOKEN topilmadi. .env faylga BOT_TOKEN kiriting.")
 
-# Admin telegram IDs - mutable list for runtime updates
-_ADMINS_FROM_ENV = [int(x.strip()) for x in os.getenv("ADMINS", "").split(",") if x.strip()]
-ADMINS = _ADMINS_FROM_ENV.copy()  # Mutable list
+# Key for signing deep links (t.me/<bot>?start=b_<id>_<sig>); defaults to one derived
+# from the token, so changing the token invalidates links already shared
+DEEPLINK_SECRET = os.getenv("DEEPLINK_SECRET") or hashlib.sha256(BOT_TOKEN.encode()).hexdigest()
 
-
-def add_admin(telegram_id: int):
-    """Add admin to runtime ADMINS list."""
-    if telegram_id not in ADMINS:
-        ADMINS.append(telegram_id)
-
-
-def remove_admin(telegram_id: int):
-    """Remove admin from runtime ADMINS list."""
-    if telegram_id in ADMINS:
-        ADMINS.remove(telegram_id)
+# Bootstrap admin telegram IDs; promoted to role 'admin' in the DB at startup.
+# The live admin set is app.services.role_service (users.role = 'admin').
+ADMINS = frozenset(int(x.strip()) for x in os.getenv("ADMINS", "").split(",") if x.strip())
 
 # Database path
 BASE_DIR = Path(__file__).resolve().parent.parent
 DB_PATH = BASE_DIR / "data" / "bot.db"
 
+# Online backups: gzip snapshots in BACKUP_DIR, newest BACKUP_KEEP kept, BACKUP_INTERVAL=0 disables schedule
+BACKUP_DIR = Path(os.getenv("BACKUP_DIR", str(BASE_DIR / "data" / "backups")))
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))
+BACKUP_INTERVAL = int(os.getenv("BACKUP_INTERVAL", "86400"))
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "256"))
+
+# Background DB maintenance (seconds / MB / pages)
+MAINTENANCE_INTERVAL = int(os.getenv("MAINTENANCE_INTERVAL", "300"))
+MAINTENANCE_WAL_MAX_MB = int(os.getenv("MAINTENANCE_WAL_MAX_MB", "16"))
+MAINTENANCE_OPTIMIZE_INTERVAL = int(os.getenv("MAINTENANCE_OPTIMIZE_INTERVAL", "21600"))
+MAINTENANCE_FREELIST_PAGES = int(os.getenv("MAINTENANCE_FREELIST_PAGES", "256"))
+
+# Statements slower than this (milliseconds) are logged with parameters and query plan
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "50"))
+
+# Lock contention: SQLite waits DB_BUSY_TIMEOUT_MS for a lock, then a statement is
+# retried up to DB_BUSY_RETRIES times with jittered exponential backoff from DB_RETRY_BASE_DELAY seconds
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "2000"))
+DB_BUSY_RETRIES = int(os.getenv("DB_BUSY_RETRIES", "3"))
+DB_RETRY_BASE_DELAY = float(os.getenv("DB_RETRY_BASE_DELAY", "0.05"))
+
 # Pagination
 PAGE_SIZE = 8
 
 # Radius options in km
 RADIUS_OPTIONS = [5, 10, 25]
 
+# Max shops returned by a name/address search (best bm25 matches first)
+SEARCH_LIMIT = int(os.getenv("SEARCH_LIMIT", "40"))
+
+# Inline mode (@bot <query>): results per answer / per query in total,
+# seconds Telegram caches an answer, seconds and entries of our own result cache.
+# Our cache is cleared when a shop is edited, blocked, closed or deleted; prices
+# may lag by INLINE_RESULT_TTL. Telegram's cache can't be cleared: a blocked or
+# deleted shop may still be listed for INLINE_CACHE_TIME, but its card link is
+# re-checked when opened.
+INLINE_PAGE_SIZE = 20
+INLINE_MAX_RESULTS = int(os.getenv("INLINE_MAX_RESULTS", "100"))
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "300"))
+INLINE_RESULT_TTL = int(os.getenv("INLINE_RESULT_TTL", "60"))
+INLINE_RESULT_CACHE_SIZE = 512
+
+# Update scheduler: max updates processed concurrently (per-chat order is always kept)
+UPDATE_CONCURRENCY = int(os.getenv("UPDATE_CONCURRENCY", "32"))
+
 # Throttle settings
+# Broadcast: send THROTTLE_BATCH messages, then sleep THROTTLE_SLEEP seconds
 THROTTLE_BATCH = 25
 THROTTLE_SLEEP = 1
+# Per-user token buckets: RATE tokens/second, up to BURST at once
+THROTTLE_MESSAGE_RATE = float(os.getenv("THROTTLE_MESSAGE_RATE", "1"))
+THROTTLE_MESSAGE_BURST = int(os.getenv("THROTTLE_MESSAGE_BURST", "5"))
+THROTTLE_CALLBACK_RATE = float(os.getenv("THROTTLE_CALLBACK_RATE", "2"))
+THROTTLE_CALLBACK_BURST = int(os.getenv("THROTTLE_CALLBACK_BURST", "8"))
+# Max number of user buckets kept in memory (LRU)
+THROTTLE_CACHE_SIZE = int(os.getenv("THROTTLE_CACHE_SIZE", "10000"))
+
+# Identical callback taps (same user, message and data) within this many seconds are dropped
+DEBOUNCE_WINDOW = float(os.getenv("DEBOUNCE_WINDOW", "1.5"))
+
+# Prometheus metrics endpoint (http://METRICS_HOST:METRICS_PORT/metrics), 0 disables it
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9102"))
 
 # Meat categories
 MEAT_SELL_CATEGORIES = ["Mol", "Qo'y", "Qiyma", "Jigar"]
@@ -45,3 +92,6 @@ MEAT_BUY_CATEGORIES = ["Mol", "Qo'y"]
 
 DEFAULT_LANGUAGE = "uz"
 
+# Timestamps are stored as UTC epochs and shown in this UTC offset (hours; Tashkent = +5)
+TIMEZONE_OFFSET = int(os.getenv("TIMEZONE_OFFSET", "5"))
+
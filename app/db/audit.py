@@ -0,0 +1,393 @@
+"""
+Query-plan auditor for the service layer.
+
+Builds a throw-away database filled with a synthetic dataset, runs every
+registered service call against it while capturing the SQL it executes,
+and checks each statement with EXPLAIN QUERY PLAN. Any full `SCAN` of a
+table larger than LARGE_TABLE_ROWS fails the audit (exit code 1), unless
+the call is explicitly allowed to read the whole table. Calls listed in
+STATEMENT_BUDGET also fail when they execute more statements than allowed,
+and so do the handler steps of STEP_BUDGET (updates fed through the bot's
+dispatcher with an offline session, middlewares included).
+
+Usage:
+    python -m app.db.audit [--users N] [--butchers N] [--verbose]
+"""
+import argparse
+import asyncio
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.dispatcher.event.bases import UNHANDLED
+from aiogram.methods import GetMe
+from aiogram.types import Chat, Message, User
+
+from app.db import session
+from app.db.session import captured_statements, statement_label
+from app.utils.textnorm import search_key
+
+LARGE_TABLE_ROWS = 1000
+
+# Max statements (DB round trips) per call for single-round-trip handler steps
+STATEMENT_BUDGET = {
+    "user.ensure_user": 1,          # /start
+    "user.get_user_context": 1,     # user + shop rows for handlers
+    "user.upsert_user": 1,
+    "user.update_user": 1,
+    "user.set_role": 1,
+    "user.assign_reg_no": 1,        # new registration
+    "butcher.get_butcher_detail": 1,
+    "butcher.get_butcher_card": 1,
+    "butcher.update_butcher": 1,
+    "butcher.approve_butcher": 1,
+    "butcher.unblock_butcher": 1,
+    "butcher.toggle_closed": 1,
+    "butcher.search_butchers": 1,
+    "stats.get_statistics": 1,      # Statistika screen
+    "stats.get_activity": 1,
+    "user.get_all_users_count": 1,
+    "butcher.count_butchers": 1,
+    "butcher.delete_butcher": 1,    # prices cascade, role reset by trigger
+    "user.delete_user_completely": 1,
+}
+
+# Max statements per handler step: one update fed through the full dispatcher
+# (middlewares included), so a handler chaining single-statement calls is caught
+STEP_BUDGET = {
+    "/start": 1,
+    "/start <shop link>": 2,        # user + shop card
+    "client: shop card": 1,
+    "client: back to list": 0,      # FSM data only
+    "client: back to menu": 0,
+    "client: region": 1,
+    "client: district": 1,
+    "admin: shop card": 3,          # user language, shop, link opens
+    "admin: add admin": 2,          # shop delete + role, one transaction
+}
+
+# Keyset-paginated calls: an index walk in ORDER BY order that LIMIT cuts
+# short (no temp B-tree) reads one page, not the whole index
+KEYSET_CALLS = {
+    "butcher.list_butchers_page",
+    "butcher.list_butchers_page(deep)",
+    "butcher.list_butchers_page(region)",
+}
+
+# Virtual tables (FTS5) report their own MATCH lookup as a SCAN; not a table read
+_SCAN = re.compile(r"^SCAN (\w+)\b(?! VIRTUAL TABLE)(?: USING (?:COVERING )?INDEX (\w+))?")
+_ALIAS = re.compile(r"\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!WHERE|JOIN|LEFT|ON|ORDER|GROUP|LIMIT|INNER)(\w+))?", re.I)
+
+
+def _registered_calls():
+    """(name, coroutine factory, allow_full_scan) for every audited service call."""
+    from app.services import user_service as us
+    from app.services import butcher_service as bs
+    from app.services import price_service as ps
+    from app.services import region_service as rs
+    from app.services import donate_service as ds
+    from app.services import stats_service as st
+    from app.services import role_service as ro
+
+    return [
+        ("user.get_user", lambda: us.get_user(100_050), False),
+        ("user.get_user_by_id", lambda: us.get_user_by_id(50), False),
+        ("user.get_user_context", lambda: us.get_user_context(100_007), False),
+        ("user.ensure_user", lambda: us.ensure_user(100_053, name="Audit"), False),
+        ("user.upsert_user", lambda: us.upsert_user(9_999_999, name="Audit"), False),
+        ("user.update_user", lambda: us.update_user(100_050, name="Audit"), False),
+        ("user.set_role", lambda: us.set_role(100_051, "client"), False),
+        ("user.is_registered", lambda: us.is_registered(100_052), False),
+        ("user.assign_reg_no", lambda: us.assign_reg_no(9_999_999), False),
+        ("user.get_user_counts", lambda: us.get_user_counts(), False),
+        ("user.get_all_users_count", lambda: us.get_all_users_count(), False),
+        # Broadcast reads every recipient by design
+        ("user.get_all_users_by_role", lambda: us.get_all_users_by_role("client"), True),
+        ("butcher.get_butcher_by_user", lambda: bs.get_butcher_by_user(60), False),
+        ("butcher.get_butcher_detail", lambda: bs.get_butcher_detail(7), False),
+        ("butcher.get_butcher_card", lambda: bs.get_butcher_card(7), False),
+        ("butcher.find_by_district", lambda: bs.find_by_district(3), False),
+        ("butcher.find_nearby_by_radius", lambda: bs.find_nearby_by_radius(41.3, 69.25, 5), False),
+        ("butcher.search_butchers", lambda: bs.search_butchers("qassob 12"), False),
+        # Unused listing of every pending shop (the admin panel pages them)
+        ("butcher.get_pending_butchers", lambda: bs.get_pending_butchers(), True),
+        ("butcher.get_butcher_counts", lambda: bs.get_butcher_counts(), False),
+        ("butcher.list_butchers_page", lambda: bs.list_butchers_page(), False),
+        ("butcher.list_butchers_page(deep)", lambda: bs.list_butchers_page("approved", None, (0, 10)), False),
+        ("butcher.list_butchers_page(region)", lambda: bs.list_butchers_page("pending", 3, (2**40, 0), "prev"), False),
+        ("butcher.count_butchers", lambda: bs.count_butchers("pending", 3), False),
+        ("role.load_admins", lambda: ro.load_admins(), False),
+        ("stats.get_statistics", lambda: st.get_statistics(), False),
+        ("stats.get_activity", lambda: st.get_activity(), False),
+        ("butcher.update_butcher", lambda: bs.update_butcher(8, work_time="09:00 - 18:00"), False),
+        ("butcher.approve_butcher", lambda: bs.approve_butcher(9), False),
+        ("butcher.unblock_butcher", lambda: bs.unblock_butcher(9), False),
+        ("butcher.toggle_closed", lambda: bs.toggle_closed(10), False),
+        # Unused listing of every approved shop
+        ("butcher.find_all_approved", lambda: bs.find_all_approved(), True),
+        ("price.get_prices", lambda: ps.get_prices(7, "SELL"), False),
+        ("price.upsert_price", lambda: ps.upsert_price(7, "SELL", "Mol", 70_000), False),
+        ("price.get_cheapest_prices_by_district", lambda: ps.get_cheapest_prices_by_district(3), False),
+        ("region.list_regions", lambda: rs.list_regions(), False),
+        ("region.list_districts", lambda: rs.list_districts(1), False),
+        ("region.search_districts", lambda: rs.search_districts("qoqon"), False),
+        ("donate.get_donate_settings", lambda: ds.get_donate_settings(), False),
+        ("butcher.delete_butcher", lambda: bs.delete_butcher(11), False),
+        ("user.delete_user_completely", lambda: us.delete_user_completely(100_070), False),
+    ]
+
+
+def populate(db_path: Path, users: int, butchers: int, seed: int = 42):
+    """Fill an initialized database with a synthetic dataset."""
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(str(db_path))
+    try:
+        district_ids = [r[0] for r in conn.execute("SELECT id FROM districts")]
+        region_of = dict(conn.execute("SELECT id, region_id FROM districts"))
+        roles = ["client"] * 8 + ["pending"]
+        conn.executemany(
+            "INSERT INTO users (telegram_id, role, name, phone, reg_no) VALUES (?, ?, ?, ?, ?)",
+            (
+                (100_000 + i, "butcher" if i < butchers else rnd.choice(roles),
+                 f"User {i}", f"+99890{i:07d}", i + 1)
+                for i in range(users)
+            )
+        )
+        rows = []
+        for i in range(butchers):
+            district = rnd.choice(district_ids)
+            shop_name = f"Qassob {rnd.randrange(10**6):06d}"
+            rows.append((
+                i + 1, shop_name, search_key(shop_name), f"Owner {i}", f"+99891{i:07d}",
+                region_of[district], district,
+                37.2 + rnd.random() * 8.3, 56.0 + rnd.random() * 17.0,
+                "08:00 - 20:00", f"photo{i}",
+                int(rnd.random() < 0.85), int(rnd.random() < 0.03),
+            ))
+        conn.executemany("""
+        INSERT INTO butchers (user_id, shop_name, search_key, owner_name, phone, region_id, district_id,
+                              lat, lon, work_time, image_file_id, is_approved, is_blocked)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.executemany(
+            "INSERT INTO prices (butcher_id, price_type, category, price) VALUES (?, ?, ?, ?)",
+            (
+                (b, ptype, cat, rnd.randrange(50_000, 120_000, 500))
+                for b in range(1, butchers + 1)
+                for ptype, cats in (("SELL", ("Mol", "Qo'y", "Qiyma", "Jigar")), ("BUY", ("Mol", "Qo'y")))
+                for cat in cats
+                if rnd.random() < 0.7
+            )
+        )
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class _OfflineSession(BaseSession):
+    """Bot session that answers every API call locally with a minimal result."""
+
+    async def make_request(self, bot, method, timeout=None):
+        if isinstance(method, GetMe):
+            return User(id=1, is_bot=True, first_name="Audit", username="audit_bot")
+        if method.__returning__ is bool:
+            return True
+        return Message(message_id=2, date=0, chat=Chat(id=getattr(method, "chat_id", None) or 1, type="private"),
+                       text="audit")
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+async def _handler_steps(bot):
+    """(name, update, fsm state or None) per audited handler step, after their fixtures."""
+    from aiogram.types import CallbackQuery, Update
+    from app.services import user_service as us, butcher_service as bs
+    from app.states import AdminAddAdmin
+    from app.utils.deeplink import butcher_payload
+
+    client, admin_id, shop = 7_000_001, 7_000_002, 7
+    await us.ensure_user(client, name="Client", role="client")
+    await us.ensure_user(admin_id, name="Admin", role="admin")
+    await bs.update_butcher(shop, is_approved=1, is_blocked=0)
+
+    def message(user_id, text):
+        return Message(message_id=1, date=0, chat=Chat(id=user_id, type="private"),
+                       from_user=User(id=user_id, is_bot=False, first_name="Audit"), text=text)
+
+    def tap(user_id, data):
+        return CallbackQuery(id=data, from_user=User(id=user_id, is_bot=False, first_name="Audit"),
+                             chat_instance="audit", message=message(1, "screen"), data=data)
+
+    steps = [
+        ("/start", message(client, "/start"), None),
+        ("/start <shop link>", message(client, f"/start {butcher_payload(shop)}"), None),
+        ("client: shop card", tap(client, f"butcher:{shop}"), None),
+        ("client: back to list", tap(client, "back_to_list"), None),
+        ("client: back to menu", tap(client, "back_to_menu"), None),
+        ("client: region", tap(client, "region:1"), None),
+        ("client: district", tap(client, "district:3"), None),
+        ("admin: shop card", tap(admin_id, f"admin_butcher_view:{shop}"), None),
+        ("admin: add admin", message(admin_id, "100010"), AdminAddAdmin.waiting_telegram_id),
+    ]
+    return [(name, Update(update_id=n, **{"message" if isinstance(event, Message) else "callback_query": event}), state)
+            for n, (name, event, state) in enumerate(steps)]
+
+
+async def audit_steps(verbose: bool = False) -> int:
+    """Feed each handler step through the bot's dispatcher and check STEP_BUDGET. Returns failures."""
+    from app.main import build_dispatcher
+
+    bot = Bot(token="1:AUDIT", session=_OfflineSession())
+    dp = build_dispatcher(bot)
+    failures = 0
+    for name, update, state in await _handler_steps(bot):
+        event = update.message or update.callback_query
+        if state is not None:
+            await dp.fsm.get_context(bot, event.from_user.id, event.from_user.id).set_state(state)
+        statements = []
+        token = captured_statements.set(statements)
+        try:
+            result = await dp.feed_update(bot, update)
+        finally:
+            captured_statements.reset(token)
+        budget = STEP_BUDGET[name]
+        if result is UNHANDLED:
+            failures += 1
+            print(f"[FAIL] step {name}: no handler took the update")
+        elif len(statements) > budget:
+            failures += 1
+            print(f"[FAIL] step {name}: {len(statements)} statements (budget {budget})")
+            for sql, _ in statements:
+                print(f"        {statement_label(sql)}")
+        elif verbose:
+            print(f"[ok] step {name}: {len(statements)} statements (budget {budget})")
+    return failures
+
+
+def table_sizes(db_path: Path) -> dict:
+    conn = sqlite3.connect(str(db_path))
+    try:
+        tables = [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        )]
+        return {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables}
+    finally:
+        conn.close()
+
+
+def partial_indexes(db_path: Path) -> dict:
+    """{name: rows} of partial indexes: scanning one only reads the rows it holds."""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        result = {}
+        for name, table, sql in conn.execute(
+            "SELECT name, tbl_name, sql FROM sqlite_master WHERE type = 'index' AND sql LIKE '%WHERE%'"
+        ).fetchall():
+            where = re.split(r"\bWHERE\b", sql, flags=re.I)[-1]
+            result[name] = conn.execute(f'SELECT COUNT(*) FROM "{table}" WHERE {where}').fetchone()[0]
+        return result
+    finally:
+        conn.close()
+
+
+def full_scans(sql: str, plan: list, sizes: dict, partial: dict = {}, keyset: bool = False) -> list:
+    """
+    Large tables that the plan reads in full. A scan of a partial index counts
+    as a read of the rows it holds, so it only passes if its WHERE narrows them.
+    For `keyset` calls an index walk without a temp B-tree is one page, not a full read.
+    """
+    bounded = keyset and not any("TEMP B-TREE" in d for d in plan)
+    aliases = {}
+    for table, alias in _ALIAS.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    result = []
+    for detail in plan:
+        match = _SCAN.match(detail)
+        if not match or (bounded and match.group(2)):
+            continue
+        table = aliases.get(match.group(1), match.group(1))
+        rows = partial.get(match.group(2), sizes.get(table, 0))
+        if rows > LARGE_TABLE_ROWS:
+            result.append(f"{detail} ({rows} rows)")
+    return result
+
+
+async def audit(users: int, butchers: int, verbose: bool = False) -> int:
+    from app.db.models import init_db, seed_regions_districts
+
+    tmp = Path(tempfile.mkdtemp(prefix="qassob-audit-"))
+    session.DB_PATH = tmp / "audit.db"
+    await init_db()
+    await seed_regions_districts()
+    populate(session.DB_PATH, users, butchers)
+    sizes = table_sizes(session.DB_PATH)
+    partial = partial_indexes(session.DB_PATH)
+    print("Dataset: " + ", ".join(f"{t}={n}" for t, n in sorted(sizes.items())))
+
+    failures = 0
+    for name, call, allow_full_scan in _registered_calls():
+        statements = []
+        token = captured_statements.set(statements)
+        try:
+            await call()
+        finally:
+            captured_statements.reset(token)
+
+        budget = STATEMENT_BUDGET.get(name)
+        if budget is not None and len(statements) > budget:
+            failures += 1
+            print(f"[FAIL] {name}: {len(statements)} statements (budget {budget})")
+            for sql, _ in statements:
+                print(f"        {statement_label(sql)}")
+
+        db = await session.get_db()
+        try:
+            seen = set()
+            for sql, params in statements:
+                if sql in seen or not statement_label(sql, 10).upper().startswith(
+                        ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")):
+                    continue
+                seen.add(sql)
+                plan = await db.explain(sql, params)
+                scans = full_scans(sql, plan, sizes, partial, keyset=name in KEYSET_CALLS)
+                bad = scans and not allow_full_scan
+                if bad:
+                    failures += 1
+                if bad or verbose:
+                    mark = "FAIL" if bad else ("allow" if scans else "ok")
+                    print(f"[{mark}] {name}: {statement_label(sql)}")
+                    for detail in plan:
+                        print(f"        {detail}")
+        finally:
+            await db.close()
+
+    failures += await audit_steps(verbose)
+
+    print(f"\n{failures} failure(s): full scans of large tables or statement budget exceeded")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN QUERY PLAN audit of service queries")
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--butchers", type=int, default=5_000)
+    parser.add_argument("--verbose", action="store_true", help="print plans of passing statements too")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(audit(args.users, args.butchers, args.verbose)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Before/after timings of the approved-butcher hot queries.
+
+Builds a synthetic database (100k shops by default) and times each hot
+query twice: with the legacy index set and with the one from init_db.
+
+Usage:
+    python -m app.db.bench [--butchers N] [--repeat N]
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.db import session
+from app.db.audit import populate
+
+# Index set before the partial/covering indexes were introduced
+LEGACY_INDEXES = [
+    "CREATE INDEX idx_butchers_location ON butchers(lat, lon)",
+    "CREATE INDEX idx_butchers_region ON butchers(region_id)",
+    "CREATE INDEX idx_butchers_district ON butchers(district_id)",
+    "CREATE INDEX idx_prices_lookup ON prices(butcher_id, price_type, category)",
+]
+
+HOT_QUERIES = {
+    "find_by_district": ("""
+        SELECT * FROM butchers
+        WHERE district_id = ? AND is_approved = 1 AND is_blocked = 0
+        ORDER BY search_key
+    """, lambda rnd, districts: (rnd.choice(districts),)),
+    "find_nearby_by_radius": ("""
+        SELECT * FROM butchers
+        WHERE is_approved = 1 AND is_blocked = 0
+          AND lat BETWEEN ? AND ?
+          AND lon BETWEEN ? AND ?
+    """, lambda rnd, districts: _box(rnd)),
+    "cheapest_price": ("""
+        SELECT p.price, p.updated_at, b.shop_name, b.id as butcher_id, b.phone
+        FROM prices p
+        JOIN butchers b ON p.butcher_id = b.id
+        WHERE b.district_id = ?
+          AND p.price_type = ?
+          AND p.category = ?
+          AND b.is_approved = 1 AND b.is_blocked = 0
+        ORDER BY p.price ASC
+        LIMIT 1
+    """, lambda rnd, districts: (rnd.choice(districts), "SELL", rnd.choice(["Mol", "Qo'y", "Qiyma", "Jigar"]))),
+    "pending_queue": ("""
+        SELECT b.*, r.name_uz as region_name, d.name_uz as district_name
+        FROM butchers b
+        LEFT JOIN regions r ON b.region_id = r.id
+        LEFT JOIN districts d ON b.district_id = d.id
+        WHERE b.is_approved = 0 AND b.is_blocked = 0
+        ORDER BY b.created_at DESC
+    """, lambda rnd, districts: ()),
+}
+
+
+def _box(rnd):
+    lat = 37.2 + rnd.random() * 8.3
+    lon = 56.0 + rnd.random() * 17.0
+    return (lat - 0.09, lat + 0.09, lon - 0.12, lon + 0.12)
+
+
+def use_legacy_indexes(conn: sqlite3.Connection):
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name IN ('butchers', 'prices') "
+        "AND sql IS NOT NULL AND name != 'ux_prices'"
+    ).fetchall():
+        conn.execute(f"DROP INDEX {name}")
+    for sql in LEGACY_INDEXES:
+        conn.execute(sql)
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def time_queries(conn: sqlite3.Connection, repeat: int, seed: int = 7) -> dict:
+    districts = [r[0] for r in conn.execute("SELECT id FROM districts")]
+    result = {}
+    for name, (sql, params) in HOT_QUERIES.items():
+        rnd = random.Random(seed)
+        samples = []
+        for _ in range(repeat):
+            args = params(rnd, districts)
+            start = time.perf_counter()
+            conn.execute(sql, args).fetchall()
+            samples.append(time.perf_counter() - start)
+        plan = " / ".join(r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params(rnd, districts)))
+        result[name] = (statistics.median(samples) * 1000, plan)
+    return result
+
+
+async def build(butchers: int) -> Path:
+    from app.db.models import init_db, seed_regions_districts
+
+    session.DB_PATH = Path(tempfile.mkdtemp(prefix="qassob-bench-")) / "bench.db"
+    await init_db()
+    await seed_regions_districts()
+    populate(session.DB_PATH, butchers * 2, butchers)
+    await init_db()  # re-run: ANALYZE with data
+    return session.DB_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot query timings: legacy vs current indexes")
+    parser.add_argument("--butchers", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    path = asyncio.run(build(args.butchers))
+    conn = sqlite3.connect(str(path))
+    try:
+        after = time_queries(conn, args.repeat)
+        use_legacy_indexes(conn)
+        before = time_queries(conn, args.repeat)
+    finally:
+        conn.close()
+
+    print(f"{args.butchers} shops, median of {args.repeat} runs (ms)")
+    print(f"{'query':<24}{'before':>10}{'after':>10}")
+    for name in HOT_QUERIES:
+        print(f"{name:<24}{before[name][0]:>10.3f}{after[name][0]:>10.3f}")
+    print()
+    for name in HOT_QUERIES:
+        print(f"{name}\n  before: {before[name][1]}\n  after:  {after[name][1]}")
+
+
+if __name__ == "__main__":
+    main()
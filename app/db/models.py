@@ -1,25 +1,314 @@
+from app.config import TIMEZONE_OFFSET
 from app.db.session import get_db
+from app.utils.textnorm import search_key
+
+# Schemas of tables that migrations rebuild; {table} is the table name.
+# Timestamps are integer Unix epochs (UTC), formatted only when rendered.
+USERS_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    telegram_id INTEGER UNIQUE NOT NULL,
+    role TEXT NOT NULL DEFAULT 'pending',
+    name TEXT,
+    phone TEXT,
+    lat REAL,
+    lon REAL,
+    language TEXT NOT NULL DEFAULT 'uz',
+    reg_no INTEGER UNIQUE,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+"""
+
+BUTCHERS_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER UNIQUE NOT NULL,
+    shop_name TEXT NOT NULL,
+    owner_name TEXT,
+    phone TEXT,
+    region_id INTEGER,
+    district_id INTEGER,
+    lat REAL,
+    lon REAL,
+    address_text TEXT,
+    work_time TEXT,
+    image_file_id TEXT,
+    extra_info TEXT,
+    video_file_id TEXT,
+    search_key TEXT,
+    is_approved INTEGER NOT NULL DEFAULT 0,
+    is_blocked INTEGER NOT NULL DEFAULT 0,
+    is_closed INTEGER NOT NULL DEFAULT 0,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    FOREIGN KEY (region_id) REFERENCES regions(id),
+    FOREIGN KEY (district_id) REFERENCES districts(id)
+);
+"""
+
+PRICES_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    butcher_id INTEGER NOT NULL,
+    price_type TEXT NOT NULL CHECK(price_type IN ('SELL', 'BUY')),
+    category TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+    FOREIGN KEY (butcher_id) REFERENCES butchers(id) ON DELETE CASCADE
+);
+"""
+
+BROADCASTS_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    role_target TEXT NOT NULL,
+    message TEXT,
+    media_type TEXT,
+    media_file_id TEXT,
+    created_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+"""
+
+BOT_SETTINGS_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    donate_card_number TEXT,
+    donate_default_amount INTEGER DEFAULT 10000,
+    donate_message_uz TEXT,
+    support_profile TEXT,
+    updated_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+);
+"""
+
+
+async def _rebuild_table(db, table: str, ddl: str, convert: dict = None):
+    """
+    Recreate `table` from `ddl` keeping its rows, indexes, triggers and
+    AUTOINCREMENT counter (SQLite's documented ALTER TABLE procedure).
+    `convert` maps a column to the SQL expression that fills it from the old row.
+    Must run inside a transaction with foreign keys off.
+    """
+    cursor = await db.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,)
+    )
+    extras = [row[0] for row in await cursor.fetchall()]
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    old_columns = {row[1] for row in await cursor.fetchall()}
+    cursor = await db.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,))
+    seq = await cursor.fetchone()
+
+    tmp = f"_new_{table}"
+    await db.execute(ddl.format(table=tmp))
+    cursor = await db.execute(f"PRAGMA table_info({tmp})")
+    columns = [row[1] for row in await cursor.fetchall() if row[1] in old_columns]
+    exprs = [(convert or {}).get(c, c) for c in columns]
+    await db.execute(
+        f"INSERT INTO {tmp} ({', '.join(columns)}) SELECT {', '.join(exprs)} FROM {table}"
+    )
+    await db.execute(f"DROP TABLE {table}")
+    await db.execute(f"ALTER TABLE {tmp} RENAME TO {table}")
+    if seq:
+        await db.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (seq[0], table)
+        )
+    for sql in extras:
+        await db.execute(sql)
+
+
+async def _migrate_fk_cascade(db):
+    """v1: ON DELETE CASCADE for butchers.user_id and prices.butcher_id."""
+    # Drop/detach rows that would violate the enforced constraints
+    await db.execute("DELETE FROM butchers WHERE user_id NOT IN (SELECT id FROM users)")
+    await db.execute("DELETE FROM prices WHERE butcher_id NOT IN (SELECT id FROM butchers)")
+    await db.execute("UPDATE butchers SET region_id = NULL WHERE region_id NOT IN (SELECT id FROM regions)")
+    await db.execute("UPDATE butchers SET district_id = NULL WHERE district_id NOT IN (SELECT id FROM districts)")
+    await _rebuild_table(db, "butchers", BUTCHERS_DDL)
+    await _rebuild_table(db, "prices", PRICES_DDL)
+
+
+# Butcher state for counters: disjoint, sums to the total
+_BUTCHER_STATE = (
+    "CASE WHEN {row}.is_blocked = 1 THEN 'blocked' "
+    "WHEN {row}.is_approved = 1 THEN 'approved' ELSE 'pending' END"
+)
+_BUMP = "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value"
+
+
+def _butcher_counter_rows(row: str, delta: int) -> str:
+    """VALUES rows for one butcher's counters (all/state, overall and per region)."""
+    state = _BUTCHER_STATE.format(row=row)
+    region = f"':r' || COALESCE({row}.region_id, 0)"
+    return (
+        f"('butchers:' || {state}, {delta}), "
+        f"('butchers:all' || {region}, {delta}), "
+        f"('butchers:' || {state} || {region}, {delta})"
+    )
+
+
+async def _recount(db):
+    """Recompute the counters table from users and butchers."""
+    state = _BUTCHER_STATE.format(row="butchers")
+    await db.execute("DELETE FROM counters")
+    await db.execute(f"""
+    INSERT INTO counters (name, value)
+    SELECT 'users:all', COUNT(*) FROM users
+    UNION ALL SELECT 'users:role:' || role, COUNT(*) FROM users GROUP BY role
+    UNION ALL SELECT 'butchers:all', COUNT(*) FROM butchers
+    UNION ALL SELECT 'butchers:' || {state}, COUNT(*) FROM butchers GROUP BY 1
+    UNION ALL SELECT 'butchers:all:r' || COALESCE(region_id, 0), COUNT(*) FROM butchers GROUP BY 1
+    UNION ALL SELECT 'butchers:' || {state} || ':r' || COALESCE(region_id, 0), COUNT(*) FROM butchers GROUP BY 1
+    """)
+
+
+def _local_day(ts: str) -> str:
+    """SQL day number of an epoch in the bot's timezone (matches timefmt.local_day)."""
+    return f"(({ts}) + {TIMEZONE_OFFSET * 3600}) / 86400"
+
+
+_TODAY = _local_day("CAST(strftime('%s', 'now') AS INTEGER)")
+_BUMP_DAY = "ON CONFLICT(day, metric) DO UPDATE SET value = value + excluded.value"
+
+# Daily rollup triggers: (name, event, condition, metric SQL)
+_DAILY_TRIGGERS = [
+    ("trg_daily_users_new", "INSERT ON users", "", "'users_new'"),
+    ("trg_daily_users_registered", "UPDATE OF role ON users",
+     "WHEN OLD.role = 'pending' AND NEW.role != 'pending'", "'registered:' || NEW.role"),
+    ("trg_daily_butchers_new", "INSERT ON butchers", "", "'butchers_new'"),
+    ("trg_daily_butchers_approved", "UPDATE OF is_approved ON butchers",
+     "WHEN OLD.is_approved = 0 AND NEW.is_approved = 1", "'approvals'"),
+    ("trg_daily_prices_new", "INSERT ON prices", "", "'price_updates'"),
+    ("trg_daily_prices_changed", "UPDATE OF price ON prices",
+     "WHEN OLD.price IS NOT NEW.price", "'price_updates'"),
+]
+
+
+def _epoch(column: str) -> str:
+    """SQL converting a datetime('now') text column to an integer epoch."""
+    return (
+        f"CASE typeof({column}) WHEN 'integer' THEN {column} "
+        f"ELSE COALESCE(CAST(strftime('%s', {column}) AS INTEGER), CAST(strftime('%s', 'now') AS INTEGER)) END"
+    )
+
+
+async def _migrate_epoch_timestamps(db):
+    """v2: TEXT datetime('now') timestamps -> INTEGER Unix epochs."""
+    await _rebuild_table(db, "users", USERS_DDL, {"created_at": _epoch("created_at")})
+    await _rebuild_table(db, "butchers", BUTCHERS_DDL, {"created_at": _epoch("created_at")})
+    await _rebuild_table(db, "prices", PRICES_DDL, {"updated_at": _epoch("updated_at")})
+    await _rebuild_table(db, "broadcasts", BROADCASTS_DDL, {"created_at": _epoch("created_at")})
+    await _rebuild_table(db, "bot_settings", BOT_SETTINGS_DDL, {"updated_at": _epoch("updated_at")})
+
+
+async def _migrate_counters(db):
+    """v3: fill the trigger-maintained counters for existing rows."""
+    await _recount(db)
+
+
+async def _migrate_daily_backfill(db):
+    """v4: daily new users/butchers from existing created_at values."""
+    await db.execute(f"""
+    INSERT INTO daily_stats (day, metric, value)
+    SELECT {_local_day("created_at")}, 'users_new', COUNT(*) FROM users GROUP BY 1
+    UNION ALL
+    SELECT {_local_day("created_at")}, 'butchers_new', COUNT(*) FROM butchers GROUP BY 1
+    """)
+
+
+async def _migrate_search_index(db):
+    """v5: index existing shops for full-text search."""
+    await db.execute("INSERT INTO butchers_fts (butchers_fts) VALUES ('rebuild')")
+
+
+# Tables with a search_key column: (table, source column, trigram index)
+SEARCH_KEYS = [
+    ("regions", "name_uz", None),
+    ("districts", "name_uz", "districts_trgm"),
+    ("butchers", "shop_name", "butchers_trgm"),
+]
+
+
+async def _migrate_search_keys(db):
+    """v6: folded search_key for regions, districts and shops, plus their trigram indexes."""
+    for table, source, trgm in SEARCH_KEYS:
+        cursor = await db.execute(f"PRAGMA table_info({table})")
+        if "search_key" not in {row[1] for row in await cursor.fetchall()}:
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN search_key TEXT")
+        cursor = await db.execute(f"SELECT id, {source} FROM {table}")
+        keys = [(search_key(name), row_id) for row_id, name in await cursor.fetchall()]
+        await db.executemany(f"UPDATE {table} SET search_key = ? WHERE id = ?", keys)
+        if trgm:
+            await db.execute(f"INSERT INTO {trgm} ({trgm}) VALUES ('rebuild')")
+
+
+async def _migrate_role_reset_trigger(db):
+    """v7: deleting a shop no longer demotes an admin owner (init_db recreates the trigger)."""
+    await db.execute("DROP TRIGGER IF EXISTS trg_butchers_delete_reset_role")
+
+
+# (user_version, step) in order; a new database is created at the latest version
+MIGRATIONS = [
+    (1, _migrate_fk_cascade),
+    (2, _migrate_epoch_timestamps),
+    (3, _migrate_counters),
+    (4, _migrate_daily_backfill),
+    (5, _migrate_search_index),
+    (6, _migrate_search_keys),
+    (7, _migrate_role_reset_trigger),
+]
+
+
+async def _migrate(db, fresh: bool):
+    """Bring the schema up to the latest PRAGMA user_version."""
+    latest = MIGRATIONS[-1][0]
+    cursor = await db.execute("PRAGMA user_version")
+    version = (await cursor.fetchone())[0]
+    await db.commit()
+
+    if fresh:
+        await db.execute(f"PRAGMA user_version = {latest}")
+        return
+
+    for target, step in MIGRATIONS:
+        if version >= target:
+            continue
+        # PRAGMA foreign_keys is ignored inside a transaction
+        await db.execute("PRAGMA foreign_keys=OFF")
+        try:
+            async with db.transaction():
+                await step(db)
+                cursor = await db.execute("PRAGMA foreign_key_check")
+                violations = await cursor.fetchall()
+                if violations:
+                    raise RuntimeError(f"Migration {target}: foreign key violations {violations[:5]}")
+                await db.execute(f"PRAGMA user_version = {target}")
+        finally:
+            await db.execute("PRAGMA foreign_keys=ON")
+        print(f"✅ Database migrated to v{target}")
+        version = target
 
 
 async def init_db():
     """Initialize database with all required tables."""
     db = await get_db()
     try:
+        cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'")
+        fresh = await cursor.fetchone() is None
+
+        # Incremental auto-vacuum lets maintenance return freed pages without a full VACUUM.
+        # Switching takes a VACUUM: instant on a new empty file, but on an existing
+        # database it blocks and needs free disk equal to its size, so that is left
+        # to `check_db.py --vacuum`
+        if fresh:
+            await db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            await db.execute("VACUUM")
+        cursor = await db.execute("PRAGMA auto_vacuum")
+        if (await cursor.fetchone())[0] != 2:
+            print("⚠️ auto_vacuum is not INCREMENTAL: freed pages stay in the file until "
+                  "`python check_db.py --vacuum` is run (bot stopped)")
+
         # Users table with reg_no
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            telegram_id INTEGER UNIQUE NOT NULL,
-            role TEXT NOT NULL DEFAULT 'pending',
-            name TEXT,
-            phone TEXT,
-            lat REAL,
-            lon REAL,
-            language TEXT NOT NULL DEFAULT 'uz',
-            reg_no INTEGER UNIQUE,
-            created_at TEXT NOT NULL DEFAULT (datetime('now'))
-        );
-        """)
+        await db.execute(USERS_DDL.format(table="users"))
         
         # Safe migration for reg_no
         try:
@@ -34,7 +323,8 @@ async def init_db():
         CREATE TABLE IF NOT EXISTS regions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name_uz TEXT NOT NULL,
-            name_ru TEXT
+            name_ru TEXT,
+            search_key TEXT
         );
         """)
 
@@ -45,49 +335,16 @@ async def init_db():
             region_id INTEGER NOT NULL,
             name_uz TEXT NOT NULL,
             name_ru TEXT,
+            search_key TEXT,
             FOREIGN KEY (region_id) REFERENCES regions(id)
         );
         """)
 
         # Butchers table (qassobxonalar)
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS butchers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER UNIQUE NOT NULL,
-            shop_name TEXT NOT NULL,
-            owner_name TEXT,
-            phone TEXT,
-            region_id INTEGER,
-            district_id INTEGER,
-            lat REAL,
-            lon REAL,
-            address_text TEXT,
-            work_time TEXT,
-            image_file_id TEXT,
-            extra_info TEXT,
-            video_file_id TEXT,
-            is_approved INTEGER NOT NULL DEFAULT 0,
-            is_blocked INTEGER NOT NULL DEFAULT 0,
-            is_closed INTEGER NOT NULL DEFAULT 0,
-            created_at TEXT NOT NULL DEFAULT (datetime('now')),
-            FOREIGN KEY (user_id) REFERENCES users(id),
-            FOREIGN KEY (region_id) REFERENCES regions(id),
-            FOREIGN KEY (district_id) REFERENCES districts(id)
-        );
-        """)
+        await db.execute(BUTCHERS_DDL.format(table="butchers"))
 
         # Prices table with UNIQUE constraint for UPSERT
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS prices (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            butcher_id INTEGER NOT NULL,
-            price_type TEXT NOT NULL CHECK(price_type IN ('SELL', 'BUY')),
-            category TEXT NOT NULL,
-            price INTEGER NOT NULL,
-            updated_at TEXT NOT NULL DEFAULT (datetime('now')),
-            FOREIGN KEY (butcher_id) REFERENCES butchers(id)
-        );
-        """)
+        await db.execute(PRICES_DDL.format(table="prices"))
 
         # Create unique index for UPSERT on prices
         await db.execute("""
@@ -96,16 +353,7 @@ async def init_db():
         """)
 
         # Broadcasts table with media support
-        await db.execute("""
-        CREATE TABLE IF NOT EXISTS broadcasts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            role_target TEXT NOT NULL,
-            message TEXT,
-            media_type TEXT,
-            media_file_id TEXT,
-            created_at TEXT NOT NULL DEFAULT (datetime('now'))
-        );
-        """)
+        await db.execute(BROADCASTS_DDL.format(table="broadcasts"))
         
 
         # Safe migration: add columns if they don't exist (for existing databases)
@@ -130,38 +378,266 @@ async def init_db():
 
 
         # Bot settings (Donat info)
+        await db.execute(BOT_SETTINGS_DDL.format(table="bot_settings"))
+
+        # Row counts kept up to date by triggers, so stats never COUNT(*).
+        # Keys: users:all, users:role:<role>, butchers:<all|pending|approved|blocked>[:r<region_id>]
         await db.execute("""
-        CREATE TABLE IF NOT EXISTS bot_settings (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            donate_card_number TEXT,
-            donate_default_amount INTEGER DEFAULT 10000,
-            donate_message_uz TEXT,
-            support_profile TEXT,
-            updated_at TEXT NOT NULL DEFAULT (datetime('now'))
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+        """)
+
+        # Daily activity rollups, bumped at event time; past days are never rewritten
+        await db.execute("""
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            day INTEGER NOT NULL,
+            metric TEXT NOT NULL,
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, metric)
+        ) WITHOUT ROWID;
+        """)
+
+        # Full-text search over shop name/address/extra info. External content:
+        # the text lives only in butchers, the index is kept in sync by triggers.
+        await db.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS butchers_fts USING fts5(
+            shop_name, address_text, extra_info,
+            content='butchers', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
         );
         """)
+        # ORDER BY rank = bm25 with a shop_name hit weighing most; FTS5 returns rows
+        # already in rank order, so LIMIT stops early (no temp B-tree)
+        await db.execute(
+            "INSERT INTO butchers_fts (butchers_fts, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0)')"
+        )
+
+        # Trigram indexes over the folded names: substring and typo-tolerant matching
+        for table, _, trgm in SEARCH_KEYS:
+            if trgm:
+                await db.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {trgm} USING fts5(
+                    search_key, content='{table}', content_rowid='id', tokenize='trigram'
+                );
+                """)
 
         # Seed bot_settings
         cursor = await db.execute("SELECT COUNT(*) FROM bot_settings")
         if (await cursor.fetchone())[0] == 0:
             await db.execute("INSERT INTO bot_settings (donate_card_number) VALUES (NULL)")
 
+        # Versioned schema changes (table rebuilds)
+        await _migrate(db, fresh)
+
         # V8 MANDATORY: Create all required indexes
+        # (users.telegram_id lookups use the UNIQUE constraint's autoindex)
+        # Admin list keyset pages: ORDER BY created_at DESC, id DESC (id is the rowid),
+        # optionally within one region
         await db.execute("""
-        CREATE INDEX IF NOT EXISTS idx_users_telegram_id ON users(telegram_id);
+        CREATE INDEX IF NOT EXISTS idx_butchers_created ON butchers(created_at);
         """)
         await db.execute("""
-        CREATE INDEX IF NOT EXISTS idx_butchers_location ON butchers(lat, lon);
+        CREATE INDEX IF NOT EXISTS idx_butchers_region_created ON butchers(region_id, created_at);
         """)
         await db.execute("""
-        CREATE INDEX IF NOT EXISTS idx_butchers_region ON butchers(region_id);
+        CREATE INDEX IF NOT EXISTS idx_butchers_district ON butchers(district_id);
         """)
+        # FK column; also serves list_districts ORDER BY search_key
         await db.execute("""
-        CREATE INDEX IF NOT EXISTS idx_butchers_district ON butchers(district_id);
+        CREATE INDEX IF NOT EXISTS idx_districts_region_key ON districts(region_id, search_key);
+        """)
+
+        # Hot client queries only ever read approved, unblocked shops:
+        # partial indexes hold just those rows, already in the order we need.
+        # District list: WHERE district_id = ? ... ORDER BY search_key (no temp B-tree);
+        # covers the cheapest-price join (shop_name, phone)
+        await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_butchers_live_district_key
+        ON butchers(district_id, search_key, shop_name, phone)
+        WHERE is_approved = 1 AND is_blocked = 0;
         """)
+        # Radius search: bounding box on lat/lon
         await db.execute("""
-        CREATE INDEX IF NOT EXISTS idx_prices_lookup ON prices(butcher_id, price_type, category);
+        CREATE INDEX IF NOT EXISTS idx_butchers_live_location
+        ON butchers(lat, lon)
+        WHERE is_approved = 1 AND is_blocked = 0;
         """)
+        # Admin registry loaded at startup: only admin rows
+        await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_users_admins
+        ON users(telegram_id)
+        WHERE role = 'admin';
+        """)
+        # Admin pending queue: ORDER BY created_at DESC
+        await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_butchers_pending
+        ON butchers(created_at)
+        WHERE is_approved = 0 AND is_blocked = 0;
+        """)
+        # Cheapest-price join: covers price and updated_at, no prices row lookups
+        await db.execute("""
+        CREATE INDEX IF NOT EXISTS idx_prices_cover
+        ON prices(butcher_id, price_type, category, price, updated_at);
+        """)
+        # Deleting a shop sends its owner back to role selection (admins keep their role)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_butchers_delete_reset_role
+        AFTER DELETE ON butchers
+        BEGIN
+            UPDATE users SET role = 'pending' WHERE id = OLD.user_id AND role = 'butcher';
+        END;
+        """)
+        # Counter triggers
+        await db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_users_count_insert
+        AFTER INSERT ON users
+        BEGIN
+            INSERT INTO counters (name, value)
+            VALUES ('users:all', 1), ('users:role:' || NEW.role, 1) {_BUMP};
+        END;
+        """)
+        await db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_users_count_delete
+        AFTER DELETE ON users
+        BEGIN
+            INSERT INTO counters (name, value)
+            VALUES ('users:all', -1), ('users:role:' || OLD.role, -1) {_BUMP};
+        END;
+        """)
+        await db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_users_count_role
+        AFTER UPDATE OF role ON users
+        WHEN OLD.role IS NOT NEW.role
+        BEGIN
+            INSERT INTO counters (name, value)
+            VALUES ('users:role:' || OLD.role, -1), ('users:role:' || NEW.role, 1) {_BUMP};
+        END;
+        """)
+        await db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_butchers_count_insert
+        AFTER INSERT ON butchers
+        BEGIN
+            INSERT INTO counters (name, value)
+            VALUES ('butchers:all', 1), {_butcher_counter_rows("NEW", 1)} {_BUMP};
+        END;
+        """)
+        await db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_butchers_count_delete
+        AFTER DELETE ON butchers
+        BEGIN
+            INSERT INTO counters (name, value)
+            VALUES ('butchers:all', -1), {_butcher_counter_rows("OLD", -1)} {_BUMP};
+        END;
+        """)
+        await db.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_butchers_count_update
+        AFTER UPDATE OF is_approved, is_blocked, region_id ON butchers
+        WHEN OLD.is_approved IS NOT NEW.is_approved
+          OR OLD.is_blocked IS NOT NEW.is_blocked
+          OR OLD.region_id IS NOT NEW.region_id
+        BEGIN
+            INSERT INTO counters (name, value)
+            VALUES {_butcher_counter_rows("OLD", -1)}, {_butcher_counter_rows("NEW", 1)} {_BUMP};
+        END;
+        """)
+
+        # Search index triggers (external content needs the old values to delete)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_butchers_fts_insert
+        AFTER INSERT ON butchers
+        BEGIN
+            INSERT INTO butchers_fts (rowid, shop_name, address_text, extra_info)
+            VALUES (NEW.id, NEW.shop_name, NEW.address_text, NEW.extra_info);
+        END;
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_butchers_fts_delete
+        AFTER DELETE ON butchers
+        BEGIN
+            INSERT INTO butchers_fts (butchers_fts, rowid, shop_name, address_text, extra_info)
+            VALUES ('delete', OLD.id, OLD.shop_name, OLD.address_text, OLD.extra_info);
+        END;
+        """)
+        await db.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_butchers_fts_update
+        AFTER UPDATE OF shop_name, address_text, extra_info ON butchers
+        WHEN OLD.shop_name IS NOT NEW.shop_name
+          OR OLD.address_text IS NOT NEW.address_text
+          OR OLD.extra_info IS NOT NEW.extra_info
+        BEGIN
+            INSERT INTO butchers_fts (butchers_fts, rowid, shop_name, address_text, extra_info)
+            VALUES ('delete', OLD.id, OLD.shop_name, OLD.address_text, OLD.extra_info);
+            INSERT INTO butchers_fts (rowid, shop_name, address_text, extra_info)
+            VALUES (NEW.id, NEW.shop_name, NEW.address_text, NEW.extra_info);
+        END;
+        """)
+
+        # Trigram index triggers
+        for table, _, trgm in SEARCH_KEYS:
+            if not trgm:
+                continue
+            await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{trgm}_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {trgm} (rowid, search_key) VALUES (NEW.id, NEW.search_key);
+            END;
+            """)
+            await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{trgm}_delete
+            AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {trgm} ({trgm}, rowid, search_key) VALUES ('delete', OLD.id, OLD.search_key);
+            END;
+            """)
+            await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{trgm}_update
+            AFTER UPDATE OF search_key ON {table}
+            WHEN OLD.search_key IS NOT NEW.search_key
+            BEGIN
+                INSERT INTO {trgm} ({trgm}, rowid, search_key) VALUES ('delete', OLD.id, OLD.search_key);
+                INSERT INTO {trgm} (rowid, search_key) VALUES (NEW.id, NEW.search_key);
+            END;
+            """)
+
+        # Daily rollup triggers, recreated so the day boundary follows TIMEZONE_OFFSET
+        for name, event, condition, metric in _DAILY_TRIGGERS:
+            await db.execute(f"DROP TRIGGER IF EXISTS {name}")
+            await db.execute(f"""
+            CREATE TRIGGER {name}
+            AFTER {event}
+            {condition}
+            BEGIN
+                INSERT INTO daily_stats (day, metric, value)
+                VALUES ({_TODAY}, {metric}, 1) {_BUMP_DAY};
+            END;
+            """)
+
+        # Superseded: the full (lat, lon) index by idx_butchers_live_location,
+        # idx_prices_lookup was an exact duplicate of ux_prices
+        await db.execute("DROP INDEX IF EXISTS idx_butchers_location")
+        await db.execute("DROP INDEX IF EXISTS idx_prices_lookup")
+        # ...and idx_butchers_region is a prefix of idx_butchers_region_created
+        await db.execute("DROP INDEX IF EXISTS idx_butchers_region")
+        # Name ordering moved to search_key
+        await db.execute("DROP INDEX IF EXISTS idx_districts_region")
+        await db.execute("DROP INDEX IF EXISTS idx_butchers_live_district")
+        # No query reads prices by updated_at or users by created_at (registrations
+        # per day come from daily_stats); they only slowed every upsert/insert
+        await db.execute("DROP INDEX IF EXISTS idx_prices_updated")
+        await db.execute("DROP INDEX IF EXISTS idx_users_created")
+        # Exact duplicate of the UNIQUE autoindex on users.telegram_id
+        await db.execute("DROP INDEX IF EXISTS idx_users_telegram_id")
+
+        # Planner statistics: a full ANALYZE only if never collected; otherwise
+        # PRAGMA optimize re-analyzes just what changed (maintenance does the rest)
+        cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+        if await cursor.fetchone() is None:
+            await db.execute("ANALYZE")
+        else:
+            await db.execute("PRAGMA optimize")
 
         await db.commit()
     finally:
@@ -218,15 +694,15 @@ async def seed_regions_districts():
 
         for region_name, districts in regions_data.items():
             cursor = await db.execute(
-                "INSERT INTO regions (name_uz) VALUES (?)",
-                (region_name,)
+                "INSERT INTO regions (name_uz, search_key) VALUES (?, ?)",
+                (region_name, search_key(region_name))
             )
             region_id = cursor.lastrowid
             
             for district_name in districts:
                 await db.execute(
-                    "INSERT INTO districts (region_id, name_uz) VALUES (?, ?)",
-                    (region_id, district_name)
+                    "INSERT INTO districts (region_id, name_uz, search_key) VALUES (?, ?, ?)",
+                    (region_id, district_name, search_key(district_name))
                 )
 
         await db.commit()
@@ -1,19 +1,173 @@
+import asyncio
+import logging
+import random
+import re
+import sqlite3
+import sys
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
+
 import aiosqlite
-from app.config import DB_PATH
+from app.config import DB_PATH, SLOW_QUERY_MS, DB_BUSY_TIMEOUT_MS, DB_BUSY_RETRIES, DB_RETRY_BASE_DELAY
+from app.utils.metrics import DB_QUERY_LATENCY, DB_BUSY_RETRIES_TOTAL, DB_BUSY_FAILURES
+
+logger = logging.getLogger(__name__)
+
+_WS = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE")
+
+# When set, every executed (sql, parameters) pair is appended here (used by app.db.audit)
+captured_statements: ContextVar[Optional[list]] = ContextVar("captured_statements", default=None)
+
+
+def statement_label(sql: str, limit: int = 80) -> str:
+    """Compact one-line form of a statement, for logs."""
+    return _WS.sub(" ", sql).strip()[:limit]
+
+
+def query_name() -> str:
+    """
+    Stable metrics label for a statement: the service function that ran it,
+    e.g. "butcher_service.get_butcher_card" (frames of this module and
+    contextlib are skipped, so BEGIN in transaction() counts for its caller).
+    """
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get("__name__") in (__name__, "contextlib"):
+        frame = frame.f_back
+    if frame is None:
+        return "-"
+    module = frame.f_globals.get("__name__", "-").rpartition(".")[2]
+    return f"{module}.{frame.f_code.co_name}"
+
+
+def is_busy(exc: Exception) -> bool:
+    """True for SQLITE_BUSY / SQLITE_LOCKED ("database is locked")."""
+    if not isinstance(exc, sqlite3.OperationalError):
+        return False
+    code = getattr(exc, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(exc) or "busy" in str(exc)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, base * 2**attempt)."""
+    return random.uniform(0, DB_RETRY_BASE_DELAY * (2 ** attempt))
+
 
+class Connection:
+    """
+    Thin wrapper over aiosqlite.Connection that times every statement and
+    retries it on SQLITE_BUSY. Everything except execute/executemany is delegated unchanged.
+    Metrics are labelled by `name`, by default the calling service function;
+    pass it explicitly where one function runs several different statements.
 
-async def get_db() -> aiosqlite.Connection:
+    Only statements that start a transaction are retried: a failed statement
+    has no effect, but inside an open transaction the read snapshot may be stale
+    and the whole transaction has to be redone by the caller.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    async def execute(self, sql: str, parameters=None, *, name: Optional[str] = None) -> aiosqlite.Cursor:
+        name = name or query_name()
+        captured = captured_statements.get()
+        if captured is not None:
+            captured.append((sql, parameters))
+        start = time.perf_counter()
+        try:
+            return await self._retry(self._conn.execute, sql, parameters, name)
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_QUERY_LATENCY.observe(elapsed, query=name)
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                await self._log_slow(sql, parameters, elapsed)
+
+    async def executemany(self, sql: str, parameters, *, name: Optional[str] = None) -> aiosqlite.Cursor:
+        # Iterators are consumed by the first attempt, so only lists are retried
+        name = name or query_name()
+        start = time.perf_counter()
+        try:
+            if isinstance(parameters, (list, tuple)):
+                return await self._retry(self._conn.executemany, sql, parameters, name)
+            return await self._conn.executemany(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            DB_QUERY_LATENCY.observe(elapsed, query=name)
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                await self._log_slow(sql, None, elapsed)
+
+    async def _retry(self, method, sql: str, parameters, name: str):
+        retryable = not self._conn.in_transaction
+        attempt = 0
+        while True:
+            try:
+                return await method(sql, parameters)
+            except sqlite3.OperationalError as e:
+                if not is_busy(e) or not retryable:
+                    raise
+                if attempt >= DB_BUSY_RETRIES:
+                    DB_BUSY_FAILURES.inc(query=name)
+                    raise
+                DB_BUSY_RETRIES_TOTAL.inc(query=name)
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Write transaction opened with BEGIN IMMEDIATE: the write lock is taken
+        up front (retried on SQLITE_BUSY), so a read-then-write flow never fails
+        mid-way on lock upgrade. Commits on success, rolls back on error.
+        """
+        await self.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            await self._conn.rollback()
+            raise
+        else:
+            await self._conn.commit()
+
+    async def explain(self, sql: str, parameters=None) -> list:
+        """EXPLAIN QUERY PLAN detail lines for a statement."""
+        cursor = await self._conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)
+        return [row[3] for row in await cursor.fetchall()]
+
+    async def _log_slow(self, sql: str, parameters, elapsed: float):
+        plan = []
+        if statement_label(sql, 10).upper().startswith(_EXPLAINABLE):
+            try:
+                plan = await self.explain(sql, parameters)
+            except Exception:
+                pass
+        logger.warning(
+            "Slow query %.1f ms: %s | params=%r | plan=%s",
+            elapsed * 1000, statement_label(sql, 500), parameters, " / ".join(plan) or "-"
+        )
+
+
+async def get_db() -> Connection:
     """Get database connection with performance optimizations."""
     # Ensure data directory exists
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    
+
     db = await aiosqlite.connect(str(DB_PATH))
     db.row_factory = aiosqlite.Row
-    
+
     # V8 MANDATORY: PRAGMA optimizations for Google Cloud e2-micro
     await db.execute("PRAGMA journal_mode=WAL;")
     await db.execute("PRAGMA synchronous=NORMAL;")
     await db.execute("PRAGMA temp_store=MEMORY;")
     await db.execute("PRAGMA cache_size=10000;")
-    
-    return db
+    await db.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS};")
+    # Enforce FOREIGN KEY ... ON DELETE CASCADE (off by default, per connection)
+    await db.execute("PRAGMA foreign_keys=ON;")
+
+    return Connection(db)
@@ -1,25 +1,38 @@
 """Admin handlers - management and broadcast."""
+from typing import Optional, Union
+
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, ReplyKeyboardMarkup, KeyboardButton
+from aiogram.filters import Command, Filter, StateFilter
 from aiogram.fsm.context import FSMContext
-from app.config import ADMINS, add_admin
+from app.config import PAGE_SIZE
+from app.utils.metrics import snapshot_text
+from app.utils.timefmt import fmt_ts
+from app.utils.screen import Screen
 
 from app.states import AdminBroadcast, AdminSupport, AdminAddAdmin, AdminButcherMessage, AdminDeleteUser
-from app.services.user_service import get_user_counts, get_user_by_id, get_user, upsert_user, set_role, delete_user_completely
+from app.services.stats_service import get_statistics, get_activity, get_event_total
+from app.services.user_service import get_user, grant_admin, delete_user_completely
 from app.services.butcher_service import (
-    get_butcher_counts, get_pending_butchers, get_butcher_detail,
-    approve_butcher, block_butcher, unblock_butcher, toggle_closed, delete_butcher, get_all_butchers_paginated,
-    get_butcher_by_user
+    get_pending_butchers, get_butcher_detail,
+    approve_butcher, block_butcher, unblock_butcher, toggle_closed, delete_butcher,
+    list_butchers_page, count_butchers, STATUS_FILTERS
 )
+from app.services.region_service import list_regions, get_region
 from app.services.broadcast_service import send_broadcast
+from app.services.backup_service import create_backup, list_backups
 from app.services.donate_service import (
     get_donate_settings, set_donate_card_number,
     get_support_profile, set_support_profile, set_donate_default_amount
 )
 from app.keyboards.reply import admin_main_kb, back_kb
+from app.keyboards.callbacks import (
+    Route, AdminButchersPageCb, AdminButchersRegionsCb, AdminBackToListCb, AdminButcherCb,
+    ApproveCb, BlockCb, UnblockCb, ToggleClosedCb, DeleteCb, AdminMessageCb, ConfirmCb, CancelCb, BroadcastCb
+)
 from app.keyboards.inline import (
     admin_butcher_kb, broadcast_target_kb, confirmation_inline_kb,
-    admin_butchers_list_kb, admin_butcher_detail_kb
+    admin_butchers_list_kb, admin_butcher_detail_kb, admin_butchers_regions_kb, ADMIN_STATUS_LABELS
 )
 
 router = Router()
@@ -27,22 +40,36 @@ router = Router()
 
 # ==================== MIDDLEWARE / FILTER ====================
 
-def is_admin(telegram_id: int) -> bool:
-    return telegram_id in ADMINS
+class IsAdmin(Filter):
+    """Router-level admin check on the flag RoleMiddleware injects (async: sync filters run in a worker thread)."""
 
-@router.message(lambda m: not is_admin(m.from_user.id))
-async def not_admin_handler(message: Message):
-    """Ignore non-admin messages if they reach here."""
-    pass
+    async def __call__(self, event: Union[Message, CallbackQuery], is_admin: bool = False) -> bool:
+        return is_admin
+
+# Every handler below is admin-only; other users' updates skip the whole router
+router.message.filter(IsAdmin())
+router.callback_query.filter(IsAdmin())
 
 
 # ==================== STATISTICS ====================
 
-@router.message(F.text == "📊 Statistika", F.from_user.id.in_(ADMINS))
+ACTIVITY_LABELS = (
+    ("users_new", "🆕 Yangi foydalanuvchilar"),
+    ("registered:client", "👤 Ro'yxatdan o'tgan mijozlar"),
+    ("registered:butcher", "🥩 Ro'yxatdan o'tgan qassoblar"),
+    ("butchers_new", "🏪 Yangi qassobxonalar"),
+    ("approvals", "✅ Tasdiqlangan"),
+    ("price_updates", "💰 Narx yangilanishlari"),
+    ("searches", "🔎 Qidiruvlar"),
+    ("link_opens", "🔗 Havola orqali kirishlar"),
+)
+
+@router.message(F.text == "📊 Statistika")
 async def cmd_statistics(message: Message):
     """Show statistics."""
-    user_counts = await get_user_counts()
-    butcher_counts = await get_butcher_counts()
+    # One read of the trigger-maintained counters
+    stats = await get_statistics()
+    user_counts, butcher_counts = stats["users"], stats["butchers"]
     
     text = (
         "📊 <b>Statistika</b>\n\n"
@@ -57,56 +84,116 @@ async def cmd_statistics(message: Message):
         f"• Kutilmoqda: {butcher_counts['pending']}\n"
         f"• Bloklangan: {butcher_counts['blocked']}"
     )
-    
+
+    # Daily rollups: today / last 7 / last 30 days
+    activity = await get_activity((1, 7, 30))
+    text += "\n\n📈 <b>Faollik</b> (bugun / 7 kun / 30 kun):\n"
+    for metric, label in ACTIVITY_LABELS:
+        values = " / ".join(str(activity[n].get(metric, 0)) for n in (1, 7, 30))
+        text += f"{label}: {values}\n"
+
     await message.answer(text, parse_mode="HTML")
 
 
+@router.message(Command("metrics"))
+async def cmd_metrics(message: Message):
+    """Show handler latency snapshot."""
+    await message.answer(snapshot_text(), parse_mode="HTML")
+
+
+@router.message(Command("backup"))
+async def cmd_backup(message: Message):
+    """Create an online database backup now."""
+    await message.answer("⏳ Zaxira nusxa olinmoqda...")
+    try:
+        result = await create_backup()
+    except Exception as e:
+        await message.answer(f"❌ Zaxira nusxa olinmadi: {e}")
+        return
+
+    size_kb = result["size"] / 1024
+    await message.answer(
+        "✅ <b>Zaxira nusxa tayyor</b>\n\n"
+        f"📁 <code>{result['path']}</code>\n"
+        f"📦 Hajmi: {size_kb:.1f} KB\n"
+        f"⏱ Vaqt: {result['total_seconds']:.1f} s\n"
+        f"🗂 Jami nusxalar: {len(list_backups())}",
+        parse_mode="HTML"
+    )
+
+
 # ==================== BUTCHER MANAGEMENT ====================
 
-@router.message(F.text == "🏪 Qassobxonalar", F.from_user.id.in_(ADMINS))
+async def butchers_list_view(status: str = "all", region_id: int = 0, cursor=None,
+                             direction: str = "next", page: int = 0):
+    """Text and keyboard for one keyset page of the admin butcher list."""
+    result = await list_butchers_page(status, region_id or None, cursor, direction)
+    total = await count_butchers(status, region_id or None)
+    
+    title = "Barcha qassobxonalar" if status == "all" else ADMIN_STATUS_LABELS[status]
+    if region_id:
+        region = await get_region(region_id)
+        if region:
+            title += f" — {region['name_uz']}"
+    
+    text = f"📋 <b>{title} ({total} ta):</b>\n"
+    text += "Batafsil ma'lumot olish uchun tanlang:" if result["items"] else "✅ Qassobxonalar topilmadi."
+    markup = admin_butchers_list_kb(
+        result["items"], page, (total + PAGE_SIZE - 1) // PAGE_SIZE,
+        status=status, region_id=region_id,
+        has_prev=result["has_prev"], has_next=result["has_next"]
+    )
+    return text, markup
+
+
+@router.message(F.text == "🏪 Qassobxonalar")
 async def cmd_manage_butchers(message: Message):
     """Show all butchers list (paginated)."""
-    # Use page 0 by default
-    result = await get_all_butchers_paginated(0)
-    
-    if not result["items"]:
+    if not await count_butchers():
         await message.answer("✅ Qassobxonalar topilmadi.")
         return
-        
-    await message.answer(
-        f"📋 <b>Barcha qassobxonalar ({result['total']} ta):</b>\n"
-        "Batafsil ma'lumot olish uchun tanlang:",
-        reply_markup=admin_butchers_list_kb(result["items"], 0, result["total_pages"]),
-        parse_mode="HTML"
-    )
+    
+    text, markup = await butchers_list_view()
+    await message.answer(text, reply_markup=markup, parse_mode="HTML")
 
 
-@router.callback_query(F.data.startswith("admin_butchers_page:"), F.from_user.id.in_(ADMINS))
-async def process_butchers_page(callback: CallbackQuery):
-    """Handle butcher list pagination."""
-    page = int(callback.data.split(":")[1])
-    result = await get_all_butchers_paginated(page)
+@router.callback_query(Route(AdminButchersPageCb))
+async def process_butchers_page(callback: CallbackQuery, callback_data: AdminButchersPageCb):
+    """Handle butcher list pagination and filters."""
+    status, region_id, cursor, direction, page = "all", 0, None, "next", 0
+    if callback_data.status in STATUS_FILTERS:
+        status, region_id = callback_data.status, callback_data.region
+        if callback_data.direction and callback_data.created_at is not None and callback_data.id is not None:
+            direction = "prev" if callback_data.direction == "p" else "next"
+            cursor = (callback_data.created_at, callback_data.id)
+            page = callback_data.page
     
+    text, markup = await butchers_list_view(status, region_id, cursor, direction, page)
+    await callback.message.edit_text(text, reply_markup=markup, parse_mode="HTML")
+
+
+@router.callback_query(Route(AdminButchersRegionsCb))
+async def process_butchers_regions(callback: CallbackQuery, callback_data: AdminButchersRegionsCb):
+    """Pick a region filter for the butcher list."""
+    regions = await list_regions()
     await callback.message.edit_text(
-        f"📋 <b>Barcha qassobxonalar ({result['total']} ta):</b>\n"
-        "Batafsil ma'lumot olish uchun tanlang:",
-        reply_markup=admin_butchers_list_kb(result["items"], page, result["total_pages"]),
-        parse_mode="HTML"
+        "📍 Viloyatni tanlang:",
+        reply_markup=admin_butchers_regions_kb(regions, callback_data.status)
     )
 
 
-@router.callback_query(F.data.startswith("admin_butcher_view:"), F.from_user.id.in_(ADMINS))
-async def process_butcher_view(callback: CallbackQuery):
+@router.callback_query(Route(AdminButcherCb), flags={"callback_answer": "manual"})
+async def process_butcher_view(callback: CallbackQuery, callback_data: AdminButcherCb, user: Optional[dict]):
     """Show butcher details."""
-    user = await get_user(callback.from_user.id)
     lang = user.get("language", "uz") if user else "uz"
 
-    butcher_id = int(callback.data.split(":")[1])
+    butcher_id = callback_data.id
     butcher = await get_butcher_detail(butcher_id)
     
     if not butcher:
         await callback.answer("❌ Ma'lumot topilmadi", show_alert=True)
         return
+    await callback.answer()
         
     # Construct detail message
     status = "✅ Faol" if butcher['is_approved'] else "⏳ Kutilmoqda"
@@ -121,16 +208,16 @@ async def process_butcher_view(callback: CallbackQuery):
         f"📞 <b>Telefon:</b> {butcher['phone']}\n"
     )
     
-    # Needs to fetch user for TG ID
-    target_user = await get_user_by_id(butcher['user_id'])
-    if target_user:
-        text += f"🆔 <b>Telegram ID:</b> <code>{target_user['telegram_id']}</code>\n"
+    # Owner's TG ID comes joined with the detail row
+    if butcher.get('telegram_id'):
+        text += f"🆔 <b>Telegram ID:</b> <code>{butcher['telegram_id']}</code>\n"
         
     text += (
         f"📍 <b>Manzil:</b> {butcher['region_name']}, {butcher['district_name']}\n"
         f"🕒 <b>Ish vaqti:</b> {butcher['work_time'] or 'Kiritilmagan'}\n"
         f"📊 <b>Holati:</b> {status}\n"
-        f"📅 <b>Ro'yxatdan o'tgan:</b> {butcher['created_at']}"
+        f"📅 <b>Ro'yxatdan o'tgan:</b> {fmt_ts(butcher['created_at'])}\n"
+        f"🔗 <b>Havola orqali (30 kun):</b> {await get_event_total(f'link_opens:{butcher_id}')}"
     )
     
     # V8: Pass all status flags to admin_butcher_kb
@@ -142,90 +229,55 @@ async def process_butcher_view(callback: CallbackQuery):
         lang=lang
     )
     
-    # If image exists, send as photo, otherwise text
-    if butcher.get('image_file_id'):
-        await callback.message.delete() # Delete list message
-        await callback.message.answer_photo(
-            butcher['image_file_id'],
-            caption=text,
-            reply_markup=markup,
-            parse_mode="HTML"
-        )
-    else:
-        await callback.message.edit_text(
-            text,
-            reply_markup=markup,
-            parse_mode="HTML"
-        )
+    # The list message becomes the card: photo with caption if image exists, otherwise text
+    await Screen(text, markup, photo=butcher.get('image_file_id')).show(callback.message)
 
 
-@router.callback_query(F.data == "admin_back_to_list", F.from_user.id.in_(ADMINS))
+@router.callback_query(Route(AdminBackToListCb))
 async def back_to_butcher_list(callback: CallbackQuery):
     """Back to page 0 of butcher list."""
-    # We could try to delete the photo message if it was a photo
-    if callback.message.content_type == "photo":
-        await callback.message.delete()
-        # Send new message with list
-        result = await get_all_butchers_paginated(0)
-        await callback.message.answer(
-            f"📋 <b>Barcha qassobxonalar ({result['total']} ta):</b>\n"
-            "Batafsil ma'lumot olish uchun tanlang:",
-            reply_markup=admin_butchers_list_kb(result["items"], 0, result["total_pages"]),
-            parse_mode="HTML"
-        )
-    else:
-        # Edit text
-        await process_butchers_page(callback) # This won't work because callback data is different.
-        # We need to manually call get_all_butchers_paginated(0) and edit
-        result = await get_all_butchers_paginated(0)
-        await callback.message.edit_text(
-            f"📋 <b>Barcha qassobxonalar ({result['total']} ta):</b>\n"
-            "Batafsil ma'lumot olish uchun tanlang:",
-            reply_markup=admin_butchers_list_kb(result["items"], 0, result["total_pages"]),
-            parse_mode="HTML"
-        )
+    text, markup = await butchers_list_view()
+    # A photo card can't drop its photo: Screen replaces it, a text card is edited
+    await Screen(text, markup).show(callback.message)
 
 
-@router.callback_query(F.data.startswith("approve:"), F.from_user.id.in_(ADMINS))
-async def process_approve(callback: CallbackQuery):
+@router.callback_query(Route(ApproveCb))
+async def process_approve(callback: CallbackQuery, callback_data: ApproveCb):
     """Approve butcher."""
-    butcher_id = int(callback.data.split(":")[1])
-    await approve_butcher(butcher_id)
+    butcher_id = callback_data.id
+    butcher = await approve_butcher(butcher_id)
     
     await callback.message.edit_text(
         f"{callback.message.html_text}\n\n✅ <b>TASDIQLANDI</b>",
         parse_mode="HTML"
     )
     
-    # Notify butcher? (Would need bot instance and user_id)
-    butcher = await get_butcher_detail(butcher_id)
-    if butcher:
-        user = await get_user_by_id(butcher['user_id'])
-        if user:
-            try:
-                await callback.bot.send_message(
-                    user['telegram_id'],
-                    f"✅ Tabriklaymiz! Sizning '{butcher['shop_name']}' do'koningiz tasdiqlandi.\n"
-                    "Endi siz narxlarni boshqarishingiz mumkin."
-                )
-            except:
-                pass
-
-
-@router.callback_query(F.data.startswith("block:"), F.from_user.id.in_(ADMINS))
-async def process_block(callback: CallbackQuery):
+    # Notify butcher (owner's telegram_id is returned with the updated row)
+    if butcher and butcher.get('telegram_id'):
+        try:
+            await callback.bot.send_message(
+                butcher['telegram_id'],
+                f"✅ Tabriklaymiz! Sizning '{butcher['shop_name']}' do'koningiz tasdiqlandi.\n"
+                "Endi siz narxlarni boshqarishingiz mumkin."
+            )
+        except:
+            pass
+
+
+@router.callback_query(Route(BlockCb))
+async def process_block(callback: CallbackQuery, callback_data: BlockCb):
     """Block butcher."""
-    butcher_id = int(callback.data.split(":")[1])
+    butcher_id = callback_data.id
     # Show confirmation
     await callback.message.edit_reply_markup(
         reply_markup=confirmation_inline_kb("block", butcher_id)
     )
 
 
-@router.callback_query(F.data.startswith("confirm_block:"), F.from_user.id.in_(ADMINS))
-async def confirm_block(callback: CallbackQuery):
+@router.callback_query(Route(ConfirmCb, action="block"))
+async def confirm_block(callback: CallbackQuery, callback_data: ConfirmCb):
     """Confirm block."""
-    butcher_id = int(callback.data.split(":")[1])
+    butcher_id = callback_data.id
     await block_butcher(butcher_id)
     
     await callback.message.edit_text(
@@ -234,16 +286,15 @@ async def confirm_block(callback: CallbackQuery):
     )
 
 
-@router.callback_query(F.data.startswith("unblock:"), F.from_user.id.in_(ADMINS))
-async def process_unblock(callback: CallbackQuery):
+@router.callback_query(Route(UnblockCb), flags={"callback_answer": "manual"})
+async def process_unblock(callback: CallbackQuery, callback_data: UnblockCb):
     """Unblock butcher."""
-    butcher_id = int(callback.data.split(":")[1])
-    await unblock_butcher(butcher_id)
+    butcher_id = callback_data.id
+    butcher = await unblock_butcher(butcher_id)
     
     await callback.answer("✅ Blokdan chiqarildi!")
     
     # Refresh the view
-    butcher = await get_butcher_detail(butcher_id)
     if butcher:
         markup = admin_butcher_kb(
             butcher_id, 
@@ -257,17 +308,17 @@ async def process_unblock(callback: CallbackQuery):
             pass
 
 
-@router.callback_query(F.data.startswith("toggle_closed:"), F.from_user.id.in_(ADMINS))
-async def process_toggle_closed(callback: CallbackQuery):
+@router.callback_query(Route(ToggleClosedCb), flags={"callback_answer": "manual"})
+async def process_toggle_closed(callback: CallbackQuery, callback_data: ToggleClosedCb):
     """Toggle closed status."""
-    butcher_id = int(callback.data.split(":")[1])
-    new_status = await toggle_closed(butcher_id)
+    butcher_id = callback_data.id
+    butcher = await toggle_closed(butcher_id)
+    new_status = bool(butcher and butcher['is_closed'])
     
     status_text = "🟠 Yopiq qilindi" if new_status else "🟢 Ochiq qilindi"
     await callback.answer(status_text)
     
     # Refresh the view
-    butcher = await get_butcher_detail(butcher_id)
     if butcher:
         markup = admin_butcher_kb(
             butcher_id, 
@@ -281,10 +332,10 @@ async def process_toggle_closed(callback: CallbackQuery):
             pass
 
 
-@router.callback_query(F.data.startswith("admin_msg:"), F.from_user.id.in_(ADMINS))
-async def start_admin_message(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(Route(AdminMessageCb))
+async def start_admin_message(callback: CallbackQuery, state: FSMContext, callback_data: AdminMessageCb):
     """Start admin message to butcher flow."""
-    butcher_id = int(callback.data.split(":")[1])
+    butcher_id = callback_data.id
     await state.update_data(admin_msg_butcher_id=butcher_id)
     
     await callback.message.answer(
@@ -295,7 +346,7 @@ async def start_admin_message(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@router.message(AdminButcherMessage.waiting_message, F.from_user.id.in_(ADMINS))
+@router.message(AdminButcherMessage.waiting_message)
 async def process_admin_message(message: Message, state: FSMContext):
     """Send admin message to butcher."""
     if message.text == "⬅️ Orqaga":
@@ -318,15 +369,14 @@ async def process_admin_message(message: Message, state: FSMContext):
         await state.clear()
         return
     
-    target_user = await get_user_by_id(butcher['user_id'])
-    if not target_user:
+    if not butcher.get('telegram_id'):
         await message.answer("❌ Foydalanuvchi topilmadi", reply_markup=admin_main_kb())
         await state.clear()
         return
     
     try:
         await message.bot.send_message(
-            target_user['telegram_id'],
+            butcher['telegram_id'],
             f"📩 <b>Admin xabari:</b>\n\n{message.text}",
             parse_mode="HTML"
         )
@@ -339,40 +389,39 @@ async def process_admin_message(message: Message, state: FSMContext):
     
     await state.clear()
 
-@router.callback_query(F.data.startswith("delete:"), F.from_user.id.in_(ADMINS))
-async def process_delete(callback: CallbackQuery):
+@router.callback_query(Route(DeleteCb))
+async def process_delete(callback: CallbackQuery, callback_data: DeleteCb):
     """Delete butcher."""
-    butcher_id = int(callback.data.split(":")[1])
+    butcher_id = callback_data.id
     # Show confirmation
     await callback.message.edit_reply_markup(
         reply_markup=confirmation_inline_kb("delete", butcher_id)
     )
 
-@router.callback_query(F.data.startswith("confirm_delete:"), F.from_user.id.in_(ADMINS))
-async def confirm_delete(callback: CallbackQuery):
+@router.callback_query(Route(ConfirmCb, action="delete"), flags={"callback_answer": "manual"})
+async def confirm_delete(callback: CallbackQuery, callback_data: ConfirmCb):
     """Confirm delete."""
-    butcher_id = int(callback.data.split(":")[1])
+    butcher_id = callback_data.id
     await delete_butcher(butcher_id)
     
     await callback.message.delete()
     await callback.answer("🗑 O'chirildi")
 
-@router.callback_query(F.data.startswith("cancel_"), F.from_user.id.in_(ADMINS))
-async def cancel_action(callback: CallbackQuery):
+@router.callback_query(Route(CancelCb))
+async def cancel_action(callback: CallbackQuery, callback_data: CancelCb):
     """Cancel block/delete."""
-    action, butcher_id = callback.data.split("_")[1].split(":")
     # Restore original markup
     # We don't know if it was pending or approved, assume approved if managing?
     # Actually simpler to just remove the confirm markup and show admin kb
     # But we are editing a message that has text.
     await callback.message.edit_reply_markup(
-        reply_markup=admin_butcher_kb(int(butcher_id))
+        reply_markup=admin_butcher_kb(callback_data.id)
     )
 
 
 # ==================== BROADCAST ====================
 
-@router.message(F.text == "📢 Xabar yuborish", F.from_user.id.in_(ADMINS))
+@router.message(F.text == "📢 Xabar yuborish")
 async def cmd_broadcast(message: Message, state: FSMContext):
     """Start broadcast."""
     await message.answer(
@@ -382,10 +431,10 @@ async def cmd_broadcast(message: Message, state: FSMContext):
     await state.set_state(AdminBroadcast.select_target)
 
 
-@router.callback_query(AdminBroadcast.select_target, F.data.startswith("broadcast:"))
-async def process_broadcast_target(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(Route(BroadcastCb), StateFilter(AdminBroadcast.select_target))
+async def process_broadcast_target(callback: CallbackQuery, state: FSMContext, callback_data: BroadcastCb):
     """Process broadcast target."""
-    target = callback.data.split(":")[1]
+    target = callback_data.target
     
     if target == "cancel":
         await callback.message.delete()
@@ -463,7 +512,7 @@ async def process_broadcast_content(message: Message, state: FSMContext):
 
 # ==================== DONATE SETTINGS ====================
 
-@router.message(F.text == "💳 Donat sozlamalari", F.from_user.id.in_(ADMINS))
+@router.message(F.text == "💳 Donat sozlamalari")
 async def cmd_donate_settings(message: Message):
     """Show donate settings."""
     settings = await get_donate_settings()
@@ -490,7 +539,7 @@ async def cmd_donate_settings(message: Message):
     await message.answer("Tanlang:", reply_markup=markup)
 
 
-@router.message(F.text == "📩 Karta raqamini yangilash", F.from_user.id.in_(ADMINS))
+@router.message(F.text == "📩 Karta raqamini yangilash")
 async def ask_donate_card(message: Message, state: FSMContext):
     await message.answer("Yangi karta raqamini kiriting:", reply_markup=back_kb())
     await state.set_state(AdminBroadcast.donate_card_update_wait)
@@ -513,7 +562,7 @@ async def process_donate_card(message: Message, state: FSMContext):
     await state.clear()
 
 
-@router.message(F.text == "💰 Donat miqdorini yangilash", F.from_user.id.in_(ADMINS))
+@router.message(F.text == "💰 Donat miqdorini yangilash")
 async def ask_donate_amount(message: Message, state: FSMContext):
     await message.answer("Yangi donat miqdorini kiriting (faqat raqam):", reply_markup=back_kb())
     await state.set_state(AdminBroadcast.donate_amount_update_wait)
@@ -546,7 +595,7 @@ async def process_donate_amount(message: Message, state: FSMContext):
 
 # ==================== SUPPORT SETTINGS ====================
 
-@router.message(F.text == "🛠 Qo'llab-quvvatlash", F.from_user.id.in_(ADMINS))
+@router.message(F.text == "🛠 Qo'llab-quvvatlash")
 async def cmd_support_settings(message: Message):
     """Show support settings."""
     profile = await get_support_profile()
@@ -568,7 +617,7 @@ async def cmd_support_settings(message: Message):
     await message.answer("Tanlang:", reply_markup=markup)
 
 
-@router.message(F.text == "📝 Support profilni yangilash", F.from_user.id.in_(ADMINS))
+@router.message(F.text == "📝 Support profilni yangilash")
 async def ask_support_profile(message: Message, state: FSMContext):
     await message.answer(
         "Yangi support profilini kiriting (masalan: @admin yoki telefon raqam):", 
@@ -592,7 +641,7 @@ async def process_support_profile(message: Message, state: FSMContext):
 
 # ==================== ADMIN MANAGEMENT ====================
 
-@router.message(F.text == "➕ Admin qo'shish", F.from_user.id.in_(ADMINS))
+@router.message(F.text == "➕ Admin qo'shish")
 async def cmd_add_admin(message: Message, state: FSMContext):
     """Start add admin flow."""
     await message.answer(
@@ -618,23 +667,9 @@ async def process_add_admin(message: Message, state: FSMContext):
     
     new_admin_id = int(text)
     
-    # Check if user exists, if not create
-    user = await get_user(new_admin_id)
-    if not user:
-        await upsert_user(new_admin_id)
-        user = await get_user(new_admin_id)
-    
-    # If user is a butcher, delete butcher profile
-    if user:
-        butcher = await get_butcher_by_user(user['id'])
-        if butcher:
-            await delete_butcher(butcher['id'])
-    
-    # Set role to admin
-    await set_role(new_admin_id, "admin")
-    
-    # Add to runtime ADMINS list
-    add_admin(new_admin_id)
+    # Drops their shop and sets the role in one transaction;
+    # the registry picks it up without a restart
+    await grant_admin(new_admin_id)
     
     await message.answer(
         f"✅ Yangi admin qo'shildi!\n\n"
@@ -647,7 +682,7 @@ async def process_add_admin(message: Message, state: FSMContext):
 
 # ==================== DELETE USER ====================
 
-@router.message(F.text == "🗑 Foydalanuvchini o'chirish", F.from_user.id.in_(ADMINS))
+@router.message(F.text == "🗑 Foydalanuvchini o'chirish")
 async def cmd_delete_user(message: Message, state: FSMContext):
     """Start delete user flow."""
     await message.answer(
@@ -662,7 +697,7 @@ async def cmd_delete_user(message: Message, state: FSMContext):
     await state.set_state(AdminDeleteUser.waiting_telegram_id)
 
 
-@router.message(AdminDeleteUser.waiting_telegram_id, F.from_user.id.in_(ADMINS))
+@router.message(AdminDeleteUser.waiting_telegram_id)
 async def process_delete_user(message: Message, state: FSMContext):
     """Process delete user by telegram ID."""
     if message.text == "⬅️ Orqaga":
@@ -1,12 +1,15 @@
 """Butcher handlers - registration and profile management."""
 import html
+from typing import Optional
+
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery
+from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
 
 from app.states import ButcherReg, ButcherUpdate
-from app.services.user_service import get_user, set_role
-from app.services.butcher_service import create_butcher, get_butcher_by_user, update_butcher
+from app.services.user_service import set_role
+from app.services.butcher_service import create_butcher, update_butcher
 from app.services.admin_notify_service import notify_new_user
 from app.services.region_service import list_regions, list_districts, get_region, get_district
 from app.services.donate_service import get_donate_message
@@ -16,6 +19,7 @@ from app.keyboards.reply import (
     back_kb, skip_kb, confirm_kb
 )
 from app.keyboards.inline import regions_kb, districts_kb, price_categories_kb
+from app.keyboards.callbacks import Route, RegionCb, DistrictCb, BackToRegionsCb, BackToButcherMenuCb, PriceCategoryCb
 from app.utils.i18n import t
 
 router = Router()
@@ -24,22 +28,18 @@ router = Router()
 # ==================== REGISTRATION ====================
 
 @router.message(F.text == "🥩 Qassob bo'lish")
-async def start_butcher_registration(message: Message, state: FSMContext):
+async def start_butcher_registration(message: Message, state: FSMContext,
+                                     user: Optional[dict], butcher: Optional[dict]):
     """Start butcher registration flow."""
-    telegram_id = message.from_user.id
-    user = await get_user(telegram_id)
     lang = user.get("language", "uz") if user else "uz"
     
     # Check if already a butcher
-    user = await get_user(telegram_id)
-    if user:
-        butcher = await get_butcher_by_user(user["id"])
-        if butcher:
-            await message.answer(
-                "❌ Siz allaqachon qassob sifatida ro'yxatdan o'tgansiz.",
-                reply_markup=butcher_main_kb()
-            )
-            return
+    if butcher:
+        await message.answer(
+            "❌ Siz allaqachon qassob sifatida ro'yxatdan o'tgansiz.",
+            reply_markup=butcher_main_kb()
+        )
+        return
     
     await message.answer(
         "🥩 Qassob ro'yxatdan o'tish\n\n"
@@ -115,10 +115,10 @@ async def process_butcher_phone_text(message: Message, state: FSMContext):
     )
 
 
-@router.callback_query(ButcherReg.region, F.data.startswith("region:"))
-async def process_butcher_region(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(Route(RegionCb), StateFilter(ButcherReg.region))
+async def process_butcher_region(callback: CallbackQuery, state: FSMContext, callback_data: RegionCb):
     """Process region selection."""
-    region_id = int(callback.data.split(":")[1])
+    region_id = callback_data.id
     region = await get_region(region_id)
     
     await state.update_data(region_id=region_id, region_name=region["name_uz"])
@@ -133,7 +133,7 @@ async def process_butcher_region(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@router.callback_query(ButcherReg.district, F.data == "back_to_regions")
+@router.callback_query(Route(BackToRegionsCb), StateFilter(ButcherReg.district))
 async def back_to_regions_butcher(callback: CallbackQuery, state: FSMContext):
     """Go back to region selection."""
     regions = await list_regions()
@@ -145,10 +145,10 @@ async def back_to_regions_butcher(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@router.callback_query(ButcherReg.district, F.data.startswith("district:"))
-async def process_butcher_district(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(Route(DistrictCb), StateFilter(ButcherReg.district))
+async def process_butcher_district(callback: CallbackQuery, state: FSMContext, callback_data: DistrictCb):
     """Process district selection."""
-    district_id = int(callback.data.split(":")[1])
+    district_id = callback_data.id
     district = await get_district(district_id)
     
     await state.update_data(district_id=district_id, district_name=district["name_uz"])
@@ -253,13 +253,11 @@ async def process_registration_image_invalid(message: Message, state: FSMContext
 
 
 @router.message(ButcherReg.confirm, F.text == "✅ Tasdiqlash")
-async def confirm_registration(message: Message, state: FSMContext):
+async def confirm_registration(message: Message, state: FSMContext, user: Optional[dict]):
     """Confirm and save butcher registration."""
     data = await state.get_data()
     telegram_id = message.from_user.id
     
-    # Get user id
-    user = await get_user(telegram_id)
     if not user:
         await message.answer("❌ Xatolik yuz berdi. Iltimos, /start buyrug'ini yuboring.")
         await state.clear()
@@ -303,21 +301,17 @@ async def update_location_start(message: Message, state: FSMContext):
 
 
 @router.message(ButcherUpdate.updating_location, F.location)
-async def update_location_process(message: Message, state: FSMContext):
+async def update_location_process(message: Message, state: FSMContext, butcher: Optional[dict]):
     """Process location update."""
     lat = message.location.latitude
     lon = message.location.longitude
-    telegram_id = message.from_user.id
     
-    user = await get_user(telegram_id)
-    if user:
-        butcher = await get_butcher_by_user(user["id"])
-        if butcher:
-            await update_butcher(butcher["id"], lat=lat, lon=lon)
-            await message.answer(
-                "✅ Lokatsiya yangilandi!",
-                reply_markup=butcher_main_kb()
-            )
+    if butcher:
+        await update_butcher(butcher["id"], lat=lat, lon=lon)
+        await message.answer(
+            "✅ Lokatsiya yangilandi!",
+            reply_markup=butcher_main_kb()
+        )
     
     await state.clear()
 
@@ -333,20 +327,16 @@ async def update_phone_start(message: Message, state: FSMContext):
 
 
 @router.message(ButcherUpdate.updating_phone, F.contact)
-async def update_phone_process(message: Message, state: FSMContext):
+async def update_phone_process(message: Message, state: FSMContext, butcher: Optional[dict]):
     """Process phone update."""
     phone = message.contact.phone_number
-    telegram_id = message.from_user.id
     
-    user = await get_user(telegram_id)
-    if user:
-        butcher = await get_butcher_by_user(user["id"])
-        if butcher:
-            await update_butcher(butcher["id"], phone=phone)
-            await message.answer(
-                "✅ Telefon raqam yangilandi!",
-                reply_markup=butcher_main_kb()
-            )
+    if butcher:
+        await update_butcher(butcher["id"], phone=phone)
+        await message.answer(
+            "✅ Telefon raqam yangilandi!",
+            reply_markup=butcher_main_kb()
+        )
     
     await state.clear()
 
@@ -362,7 +352,7 @@ async def update_work_time_start(message: Message, state: FSMContext):
 
 
 @router.message(ButcherUpdate.updating_work_time)
-async def update_work_time_process(message: Message, state: FSMContext):
+async def update_work_time_process(message: Message, state: FSMContext, butcher: Optional[dict]):
     """Process work time update."""
     if message.text == "⬅️ Orqaga":
         await state.clear()
@@ -370,17 +360,13 @@ async def update_work_time_process(message: Message, state: FSMContext):
         return
     
     work_time = message.text.strip()
-    telegram_id = message.from_user.id
     
-    user = await get_user(telegram_id)
-    if user:
-        butcher = await get_butcher_by_user(user["id"])
-        if butcher:
-            await update_butcher(butcher["id"], work_time=work_time)
-            await message.answer(
-                "✅ Ish vaqti yangilandi!",
-                reply_markup=butcher_main_kb()
-            )
+    if butcher:
+        await update_butcher(butcher["id"], work_time=work_time)
+        await message.answer(
+            "✅ Ish vaqti yangilandi!",
+            reply_markup=butcher_main_kb()
+        )
     
     await state.clear()
 
@@ -396,21 +382,17 @@ async def update_image_start(message: Message, state: FSMContext):
 
 
 @router.message(ButcherUpdate.uploading_image, F.photo)
-async def update_image_process(message: Message, state: FSMContext):
+async def update_image_process(message: Message, state: FSMContext, butcher: Optional[dict]):
     """Process image update."""
     photo = message.photo[-1]  # Largest size
     file_id = photo.file_id
-    telegram_id = message.from_user.id
     
-    user = await get_user(telegram_id)
-    if user:
-        butcher = await get_butcher_by_user(user["id"])
-        if butcher:
-            await update_butcher(butcher["id"], image_file_id=file_id)
-            await message.answer(
-                "✅ Rasm saqlandi!",
-                reply_markup=butcher_main_kb()
-            )
+    if butcher:
+        await update_butcher(butcher["id"], image_file_id=file_id)
+        await message.answer(
+            "✅ Rasm saqlandi!",
+            reply_markup=butcher_main_kb()
+        )
     
     await state.clear()
 
@@ -418,14 +400,9 @@ async def update_image_process(message: Message, state: FSMContext):
 # ==================== PRICE MANAGEMENT ====================
 
 @router.message(F.text == "💰 Sotish narxlari")
-async def manage_sell_prices(message: Message, state: FSMContext):
+async def manage_sell_prices(message: Message, state: FSMContext, butcher: Optional[dict]):
     """Manage sell prices."""
     # Check if approved
-    user = await get_user(message.from_user.id)
-    if not user:
-        return
-        
-    butcher = await get_butcher_by_user(user["id"])
     if not butcher or not butcher["is_approved"]:
         await message.answer("❌ Profilingiz hali tasdiqlanmagan.")
         return
@@ -447,14 +424,9 @@ async def manage_sell_prices(message: Message, state: FSMContext):
 
 
 @router.message(F.text == "🐄 Sotib olish narxlari")
-async def manage_buy_prices(message: Message, state: FSMContext):
+async def manage_buy_prices(message: Message, state: FSMContext, butcher: Optional[dict]):
     """Manage buy prices."""
     # Check if approved
-    user = await get_user(message.from_user.id)
-    if not user:
-        return
-        
-    butcher = await get_butcher_by_user(user["id"])
     if not butcher or not butcher["is_approved"]:
         await message.answer("❌ Profilingiz hali tasdiqlanmagan.")
         return
@@ -475,20 +447,18 @@ async def manage_buy_prices(message: Message, state: FSMContext):
     await message.answer(text, parse_mode="HTML", reply_markup=price_categories_kb("BUY"))
 
 
-@router.callback_query(F.data == "back_to_butcher_menu")
+@router.callback_query(Route(BackToButcherMenuCb))
 async def back_to_butcher_menu(callback: CallbackQuery):
     """Back to main menu from inline."""
     await callback.message.delete()
     await callback.message.answer("🏠 Asosiy menyu", reply_markup=butcher_main_kb())
 
 
-@router.callback_query(F.data.startswith("price_"))
-async def process_price_category(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(Route(PriceCategoryCb))
+async def process_price_category(callback: CallbackQuery, state: FSMContext, callback_data: PriceCategoryCb):
     """Process category selection for price update."""
-    parts = callback.data.split(":")
-    # price_sell:Mol or price_buy:Qo'y
-    price_type = "SELL" if "sell" in parts[0] else "BUY"
-    category = parts[1]
+    price_type = "SELL" if callback_data.price_type == "SELL" else "BUY"
+    category = callback_data.category
     
     await state.update_data(
         price_type=price_type,
@@ -510,7 +480,7 @@ async def process_price_category(callback: CallbackQuery, state: FSMContext):
 
 
 @router.message(ButcherUpdate.price_value)
-async def process_price_value(message: Message, state: FSMContext):
+async def process_price_value(message: Message, state: FSMContext, butcher: Optional[dict]):
     """Process price value input."""
     text = message.text.strip().replace(" ", "")
     
@@ -523,10 +493,6 @@ async def process_price_value(message: Message, state: FSMContext):
     price_type = data.get("price_type")
     category = data.get("price_category")
     
-    telegram_id = message.from_user.id
-    user = await get_user(telegram_id)
-    butcher = await get_butcher_by_user(user["id"])
-    
     if butcher:
         await upsert_price(butcher["id"], price_type, category, price)
         
@@ -572,7 +538,7 @@ async def update_extra_info_start(message: Message, state: FSMContext):
 
 
 @router.message(ButcherUpdate.updating_extra_info)
-async def process_extra_info(message: Message, state: FSMContext):
+async def process_extra_info(message: Message, state: FSMContext, butcher: Optional[dict]):
     """Process extra info text."""
     if message.text == "⬅️ Orqaga":
         await state.clear()
@@ -588,16 +554,12 @@ async def process_extra_info(message: Message, state: FSMContext):
     # Sanitize
     safe_text = html.escape(text)
 
-    telegram_id = message.from_user.id
-    user = await get_user(telegram_id)
-    if user:
-        butcher = await get_butcher_by_user(user["id"])
-        if butcher:
-            await update_butcher(butcher["id"], extra_info=safe_text)
-            await message.answer(
-                "✅ Qo'shimcha ma'lumot saqlandi!",
-                reply_markup=butcher_main_kb()
-            )
+    if butcher:
+        await update_butcher(butcher["id"], extra_info=safe_text)
+        await message.answer(
+            "✅ Qo'shimcha ma'lumot saqlandi!",
+            reply_markup=butcher_main_kb()
+        )
     
     await state.clear()
 
@@ -614,21 +576,17 @@ async def update_video_start(message: Message, state: FSMContext):
 
 
 @router.message(ButcherUpdate.updating_video, F.video)
-async def process_video_upload(message: Message, state: FSMContext):
+async def process_video_upload(message: Message, state: FSMContext, butcher: Optional[dict]):
     """Process video upload."""
     video = message.video
     file_id = video.file_id
     
-    telegram_id = message.from_user.id
-    user = await get_user(telegram_id)
-    if user:
-        butcher = await get_butcher_by_user(user["id"])
-        if butcher:
-            await update_butcher(butcher["id"], video_file_id=file_id)
-            await message.answer(
-                "✅ Video saqlandi! Eski video o'chirildi (agar bo'lsa).",
-                reply_markup=butcher_main_kb()
-            )
+    if butcher:
+        await update_butcher(butcher["id"], video_file_id=file_id)
+        await message.answer(
+            "✅ Video saqlandi! Eski video o'chirildi (agar bo'lsa).",
+            reply_markup=butcher_main_kb()
+        )
     
     await state.clear()
 
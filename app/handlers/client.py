@@ -1,22 +1,38 @@
 """Client handlers - search and price viewing."""
-from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery, ReplyKeyboardRemove
+from typing import Optional
+from urllib.parse import urlencode
+
+from aiogram import Bot, Router, F
+from aiogram.filters import StateFilter
+from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.context import FSMContext
 
 from app.states import ClientSearch
 from app.services.user_service import update_user, get_user
-from app.services.butcher_service import find_nearby_by_radius, find_by_district, get_butcher_detail, find_all_approved
-from app.services.region_service import list_regions, list_districts, get_region
+from app.services.butcher_service import (
+    find_nearby_by_radius, find_by_district, get_butcher_detail, get_butcher_card, find_all_approved, search_butchers
+)
+from app.services.region_service import list_regions, list_districts, get_region, search_districts
 from app.services.geo_service import sort_by_distance
 from app.services.price_service import get_cheapest_prices_by_district, get_prices
+from app.services.stats_service import track_event
 from app.keyboards.reply import (
     search_mode_kb, request_location_kb, client_main_kb, back_kb
 )
 from app.keyboards.inline import (
     regions_kb, districts_kb, butcher_list_kb, butcher_detail_kb,
-    client_menu_kb, client_settings_kb, language_inline_kb
+    client_menu_kb, client_settings_kb, language_inline_kb, search_query_kb,
+    district_results_kb
+)
+from app.keyboards.callbacks import (
+    Route, NoopCb, BackToMenuCb, BackToListCb, BackToRegionsCb, BackToSearchMethodCb,
+    LangCb, ClientMenuCb, SettingsCb, SearchMethodCb, RadiusCb, RegionCb, DistrictCb, PageCb,
+    ButcherCb, ButcherLocationCb, ButcherBuyPricesCb, ButcherVideoCb
 )
 from app.config import PAGE_SIZE, RADIUS_OPTIONS
+from app.utils.timefmt import fmt_ts
+from app.utils.deeplink import butcher_link
+from app.utils.screen import Screen
 
 router = Router()
 
@@ -24,10 +40,8 @@ router = Router()
 # ==================== MAIN MENU & SETTINGS HANDLERS ====================
 
 @router.message(F.text == "🏠 Asosiy menyu")
-async def show_main_menu_text(message: Message, state: FSMContext):
+async def show_main_menu_text(message: Message, state: FSMContext, user: Optional[dict]):
     """Resend main menu."""
-    from app.services.user_service import get_user
-    user = await get_user(message.from_user.id)
     role = user.get("role") if user else "client"
     
     if role == "client":
@@ -36,7 +50,7 @@ async def show_main_menu_text(message: Message, state: FSMContext):
         await state.clear()
 
 
-@router.callback_query(F.data == "client:about")
+@router.callback_query(Route(ClientMenuCb, action="about"))
 async def client_about_handler(callback: CallbackQuery):
     """Show about info."""
     from app.services.donate_service import get_support_profile
@@ -52,20 +66,20 @@ async def client_about_handler(callback: CallbackQuery):
     )
     from app.keyboards.inline import InlineKeyboardBuilder
     builder = InlineKeyboardBuilder()
-    builder.button(text="⬅️ Asosiy menyu", callback_data="back_to_menu")
+    builder.button(text="⬅️ Asosiy menyu", callback_data=BackToMenuCb().pack())
     
     await callback.message.edit_text(text, parse_mode="HTML", reply_markup=builder.as_markup())
     await callback.answer()
 
 
-@router.callback_query(F.data == "client:settings")
+@router.callback_query(Route(ClientMenuCb, action="settings"))
 async def client_settings_handler(callback: CallbackQuery):
     """Show client settings."""
     await callback.message.edit_text("⚙️ Sozlamalar", reply_markup=client_settings_kb())
     await callback.answer()
 
 
-@router.callback_query(F.data == "settings:contact")
+@router.callback_query(Route(SettingsCb, action="contact"))
 async def client_contact_handler(callback: CallbackQuery):
     """Show admin contact."""
     from app.services.donate_service import get_support_profile
@@ -76,23 +90,23 @@ async def client_contact_handler(callback: CallbackQuery):
     )
     from app.keyboards.inline import InlineKeyboardBuilder
     builder = InlineKeyboardBuilder()
-    builder.button(text="⬅️ Orqaga", callback_data="client:settings")
+    builder.button(text="⬅️ Orqaga", callback_data=ClientMenuCb(action="settings").pack())
     
     await callback.message.edit_text(text, reply_markup=builder.as_markup())
     await callback.answer()
 
 
-@router.callback_query(F.data == "settings:lang")
+@router.callback_query(Route(SettingsCb, action="lang"))
 async def client_lang_handler(callback: CallbackQuery):
     """Show language selection."""
     await callback.message.edit_text("🌐 Tilni tanlang:", reply_markup=language_inline_kb())
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("lang:"))
-async def client_lang_process(callback: CallbackQuery):
+@router.callback_query(Route(LangCb), flags={"callback_answer": "manual"})
+async def client_lang_process(callback: CallbackQuery, callback_data: LangCb):
     """Process language selection."""
-    lang = callback.data.split(":")[1]
+    lang = callback_data.code
     await update_user(callback.from_user.id, language=lang)
     
     # Show success alert
@@ -105,7 +119,7 @@ async def client_lang_process(callback: CallbackQuery):
 
 # ==================== NEARBY BUTCHERS ====================
 
-@router.callback_query(F.data == "client:count")
+@router.callback_query(Route(ClientMenuCb, action="count"), flags={"callback_answer": "manual"})
 async def show_user_count_client(callback: CallbackQuery):
     """Show total user count for client."""
     from app.services.user_service import get_all_users_count
@@ -113,25 +127,19 @@ async def show_user_count_client(callback: CallbackQuery):
     await callback.answer(f"👥 Botdagi foydalanuvchilar soni: {count} ta", show_alert=True)
 
 
-@router.callback_query(F.data == "client:nearby")
+@router.callback_query(Route(ClientMenuCb, action="nearby"))
 async def start_nearby_search(callback: CallbackQuery, state: FSMContext):
     """Start nearby search flow - V9 Inline."""
     from app.keyboards.inline import search_method_kb
     
-    # Clean up previous menu
-    await callback.message.delete()
-    
-    await callback.message.answer(
-        "🔎 Qidiruv turini tanlang:",
-        reply_markup=search_method_kb()
-    )
+    await Screen("🔎 Qidiruv turini tanlang:", search_method_kb()).show(callback.message)
     # We don't strictly need a state if we rely on callback data, 
     # but for location message we need state.
     await state.set_state(ClientSearch.waiting_search_mode)
     await callback.answer()
 
 
-@router.callback_query(F.data == "search:req_loc")
+@router.callback_query(Route(SearchMethodCb, method="req_loc"))
 async def ask_for_location_inline(callback: CallbackQuery, state: FSMContext):
     """Ask user to send location (Inline flow)."""
     # Inline buttons cannot request location directly.
@@ -152,16 +160,14 @@ async def ask_for_location_inline(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@router.callback_query(F.data == "search:manual")
+@router.callback_query(Route(SearchMethodCb, method="manual"))
 async def ask_for_region_inline(callback: CallbackQuery, state: FSMContext):
     """Manual region selection (Inline flow)."""
-    await callback.message.delete()
     regions = await list_regions()
-    await callback.message.answer(
-        "Viloyatni tanlang:",
-        reply_markup=regions_kb(regions)
-    )
-    await state.clear() # No state needed for inline navigation usually, or specific state
+    await Screen("Viloyatni tanlang yoki tuman nomini yozing:", regions_kb(regions)).show(callback.message)
+    # Fresh search data; the state only lets a typed district name through
+    await state.clear()
+    await state.set_state(ClientSearch.waiting_region)
     await callback.answer()
 
 
@@ -179,10 +185,11 @@ async def process_search_location(message: Message, state: FSMContext):
     from app.keyboards.inline import radius_kb
     from app.config import RADIUS_OPTIONS
     
-    # Remove the Reply Keyboard (if it was shown as fallback)
+    # Put the main reply keyboard back in place of the location button,
+    # so going back to the menu later is a single edit
     await message.answer(
         "✅ Lokatsiya qabul qilindi.",
-        reply_markup=ReplyKeyboardRemove()
+        reply_markup=client_main_kb()
     )
     
     await message.answer(
@@ -193,10 +200,10 @@ async def process_search_location(message: Message, state: FSMContext):
     await state.set_state(ClientSearch.waiting_radius)
 
 
-@router.callback_query(F.data.startswith("radius:"))
-async def process_radius_selection(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(Route(RadiusCb))
+async def process_radius_selection(callback: CallbackQuery, state: FSMContext, callback_data: RadiusCb):
     """Process radius selection and show results."""
-    radius = int(callback.data.split(":")[1])
+    radius = callback_data.km
     
     data = await state.get_data()
     lat = data.get("lat")
@@ -212,16 +219,15 @@ async def process_radius_selection(callback: CallbackQuery, state: FSMContext):
             await callback.message.answer("❌ Lokatsiya topilmadi. Qaytadan yuboring.")
             return
 
-    await callback.message.delete()
-    await callback.message.answer(f"🔍 {radius} km radiusda qidirilmoqda...")
+    progress = await Screen(f"🔍 {radius} km radiusda qidirilmoqda...").show(callback.message)
     
     butchers = await find_nearby_by_radius(lat, lon, radius)
+    track_event("searches")
     
     if not butchers:
-        await callback.message.answer(
-            f"😔 {radius} km radiusda qassobxonalar topilmadi.",
-            reply_markup=client_menu_kb()
-        )
+        await Screen(
+            f"😔 {radius} km radiusda qassobxonalar topilmadi.", client_menu_kb()
+        ).show(progress)
         return
 
     # Add distance info
@@ -241,32 +247,24 @@ async def process_radius_selection(callback: CallbackQuery, state: FSMContext):
     msg = f"📍 {radius} km atrofida {len(butchers)} ta qassobxona topildi:"
     kb = butcher_list_kb(butchers_with_dist[0:PAGE_SIZE], 0, (len(butchers) + PAGE_SIZE - 1) // PAGE_SIZE, show_distance=True)
     
-    await callback.message.answer(msg, reply_markup=kb)
+    await Screen(msg, kb).show(progress)
 
 
-@router.callback_query(F.data == "back_to_search_method")
+@router.callback_query(Route(BackToSearchMethodCb))
 async def back_to_search_method(callback: CallbackQuery, state: FSMContext):
     """Back to search method selection."""
     from app.keyboards.inline import search_method_kb
-    await callback.message.edit_text(
-        "🔎 Qidiruv turini tanlang:",
-        reply_markup=search_method_kb()
-    )
-        
-    await callback.message.edit_text(
-        "🔎 Qidiruv turini tanlang:",
-        reply_markup=search_method_kb()
-    )
+    await Screen("🔎 Qidiruv turini tanlang:", search_method_kb()).show(callback.message)
 
 
 # ==================== MANUAL SEARCH & CHEAPEST PRICES ====================
 
-@router.callback_query(F.data == "client:prices")
+@router.callback_query(Route(ClientMenuCb, action="prices"))
 async def start_price_search(callback: CallbackQuery, state: FSMContext):
     """Start price search flow."""
     regions = await list_regions()
     await callback.message.edit_text(
-        "Viloyatni tanlang:",
+        "Viloyatni tanlang yoki tuman nomini yozing:",
         reply_markup=regions_kb(regions)
     )
     # Reuse waiting_region state but with a flag
@@ -275,10 +273,10 @@ async def start_price_search(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("region:"))
-async def process_region_selection(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(Route(RegionCb))
+async def process_region_selection(callback: CallbackQuery, state: FSMContext, callback_data: RegionCb):
     """Process region for manual search or price search."""
-    region_id = int(callback.data.split(":")[1])
+    region_id = callback_data.id
     districts = await list_districts(region_id)
     
     await state.update_data(region_id=region_id)
@@ -290,28 +288,40 @@ async def process_region_selection(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@router.callback_query(F.data == "back_to_regions")
+@router.callback_query(Route(BackToRegionsCb))
 async def back_to_regions_client(callback: CallbackQuery, state: FSMContext):
     """Back to region list."""
     regions = await list_regions()
     await callback.message.edit_text(
-        "Viloyatni tanlang:",
+        "Viloyatni tanlang yoki tuman nomini yozing:",
         reply_markup=regions_kb(regions)
     )
     await state.set_state(ClientSearch.waiting_region)
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("district:"))
-async def process_district_selection(callback: CallbackQuery, state: FSMContext):
+@router.message(StateFilter(ClientSearch.waiting_region, ClientSearch.waiting_district), F.text)
+async def process_district_name(message: Message, state: FSMContext):
+    """Typed district name: apostrophe/script-tolerant match instead of browsing regions."""
+    districts = await search_districts(message.text)
+    if not districts:
+        await message.answer("😕 Bunday tuman topilmadi. Qaytadan yozing yoki ro'yxatdan tanlang.")
+        return
+    await message.answer("Tuman/shaharni tanlang:", reply_markup=district_results_kb(districts))
+    await state.set_state(ClientSearch.waiting_district)
+
+
+@router.callback_query(Route(DistrictCb))
+async def process_district_selection(callback: CallbackQuery, state: FSMContext, callback_data: DistrictCb):
     """Process district selection."""
-    district_id = int(callback.data.split(":")[1])
+    district_id = callback_data.id
     data = await state.get_data()
     search_type = data.get("search_type")
     
     if search_type == "prices":
         # Show cheapest prices
         prices = await get_cheapest_prices_by_district(district_id)
+        track_event("searches")
         
         if not prices:
             # Delete inline message first, then send new message with ReplyKeyboard
@@ -328,19 +338,20 @@ async def process_district_selection(callback: CallbackQuery, state: FSMContext)
             price_fmt = f"{info['price']:,}".replace(",", " ")
             text += f"🥩 <b>{cat}</b>: {price_fmt} so'm\n"
             text += f"🏪 {info['shop_name']} ({info['phone']})\n"
-            text += f"🕒 {info['updated_at'][:16]}\n\n"
+            text += f"🕒 {fmt_ts(info['updated_at'])}\n\n"
         
         await callback.message.edit_text(text, parse_mode="HTML")
         # Give back button to menu
         from app.keyboards.inline import InlineKeyboardBuilder
         builder = InlineKeyboardBuilder()
-        builder.button(text="⬅️ Asosiy menyu", callback_data="back_to_menu")
+        builder.button(text="⬅️ Asosiy menyu", callback_data=BackToMenuCb().pack())
         await callback.message.edit_reply_markup(reply_markup=builder.as_markup())
         await state.clear()
         
     else:
         # Manual search - show butchers in district
         butchers = await find_by_district(district_id)
+        track_event("searches")
         
         if not butchers:
             await callback.message.edit_text(
@@ -365,12 +376,51 @@ async def process_district_selection(callback: CallbackQuery, state: FSMContext)
         )
 
 
+# ==================== NAME SEARCH ====================
+
+@router.callback_query(Route(ClientMenuCb, action="search"))
+async def start_name_search(callback: CallbackQuery, state: FSMContext):
+    """Ask for a shop name or address."""
+    await callback.message.edit_text(
+        "🔎 Qassobxona nomi yoki manzilini yozing:",
+        reply_markup=search_query_kb()
+    )
+    await state.set_state(ClientSearch.waiting_query)
+    await callback.answer()
+
+
+@router.message(ClientSearch.waiting_query, F.text)
+async def process_name_search(message: Message, state: FSMContext):
+    """Full-text search; the user stays in this state to refine the query."""
+    butchers = await search_butchers(message.text)
+    track_event("searches")
+
+    if not butchers:
+        await message.answer(
+            "😕 Hech narsa topilmadi. Boshqa so'z bilan urinib ko'ring:",
+            reply_markup=search_query_kb()
+        )
+        return
+
+    total_pages = (len(butchers) + PAGE_SIZE - 1) // PAGE_SIZE
+    await state.update_data(
+        search_results=butchers,
+        total_pages=total_pages,
+        current_page=0,
+        show_distance=False
+    )
+    await message.answer(
+        f"🔎 {len(butchers)} ta qassobxona topildi:",
+        reply_markup=butcher_list_kb(butchers[:PAGE_SIZE], 0, total_pages, show_distance=False)
+    )
+
+
 # ==================== PAGINATION & DETAIL ====================
 
-@router.callback_query(F.data.startswith("page:"))
-async def process_pagination(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(Route(PageCb))
+async def process_pagination(callback: CallbackQuery, state: FSMContext, callback_data: PageCb):
     """Handle pagination."""
-    page = int(callback.data.split(":")[1])
+    page = callback_data.page
     data = await state.get_data()
     butchers = data.get("search_results", [])
     show_distance = data.get("show_distance", False)
@@ -388,33 +438,29 @@ async def process_pagination(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
 
 
-@router.callback_query(F.data == "noop")
+@router.callback_query(Route(NoopCb))
 async def noop_handler(callback: CallbackQuery):
     """Do nothing."""
     await callback.answer()
 
 
-@router.callback_query(F.data == "back_to_menu")
+@router.callback_query(Route(BackToMenuCb))
 async def back_to_main_menu(callback: CallbackQuery, state: FSMContext):
-    """Go back to main reply menu."""
-    await callback.message.delete()
-    await callback.message.answer("🏠 Asosiy menyu", reply_markup=client_main_kb())
-    await callback.message.answer("Bo'limni tanlang:", reply_markup=client_menu_kb())
+    """Go back to the main menu (redrawn in place)."""
+    # Reply keyboards can't be set by an edit; resend the main one only while
+    # the location button still replaces it
+    if await state.get_state() == ClientSearch.waiting_location:
+        await callback.message.answer("🏠 Asosiy menyu", reply_markup=client_main_kb())
+    await Screen("Bo'limni tanlang:", client_menu_kb()).show(callback.message)
     await state.clear()
 
 
-@router.callback_query(F.data.startswith("butcher:"))
-async def show_butcher_detail(callback: CallbackQuery, state: FSMContext):
-    """Show butcher detail with photo."""
-    butcher_id = int(callback.data.split(":")[1])
-    butcher = await get_butcher_detail(butcher_id)
-    
-    if not butcher:
-        await callback.answer("❌ Qassobxona topilmadi")
-        return
-    
-    # Get prices
-    prices = await get_prices(butcher_id, "SELL")
+async def butcher_card(bot: Bot, butcher: dict) -> Screen:
+    """Shop card screen (row from get_butcher_card): photo with caption if there is one, text otherwise."""
+    butcher_id = butcher["id"]
+
+    # SELL prices come with the row
+    prices = butcher["sell_prices"]
     price_text = ""
     if prices:
         price_text = "\n💰 <b>Narxlar:</b>\n"
@@ -423,7 +469,7 @@ async def show_butcher_detail(callback: CallbackQuery, state: FSMContext):
             price_text += f"- {cat}: {price_fmt} so'm\n"
     
     work_time_str = butcher['work_time'] or "Ko'rsatilmagan"
-    
+
     # V8: Show closed status if applicable
     status_line = ""
     if butcher.get('is_closed'):
@@ -451,35 +497,51 @@ async def show_butcher_detail(callback: CallbackQuery, state: FSMContext):
         # So treating it as plain text is safer.
         detail_text += f"\n\n📝 <b>Qo'shimcha ma'lumot:</b>\n{butcher['extra_info']}"
 
-    
-    # Delete the list message
-    await callback.message.delete()
-    
-    # Send photo with caption if image exists
-    if butcher.get('image_file_id'):
-        sent_msg = await callback.message.answer_photo(
-            photo=butcher['image_file_id'],
-            caption=detail_text,
-            reply_markup=butcher_detail_kb(butcher_id),
-            parse_mode="HTML"
-        )
-    else:
-        # Fallback to text if no image
-        sent_msg = await callback.message.answer(
-            detail_text,
-            reply_markup=butcher_detail_kb(butcher_id),
-            parse_mode="HTML"
-        )
-    
+    # Share button: signed deep link straight to this card
+    me = await bot.me()
+    share_url = "https://t.me/share/url?" + urlencode(
+        {"url": butcher_link(me.username, butcher_id), "text": butcher["shop_name"]}
+    )
+    markup = butcher_detail_kb(butcher_id, share_url=share_url)
+    return Screen(detail_text, markup, photo=butcher.get('image_file_id'))
+
+
+async def send_butcher_detail(message: Message, butcher: dict, state: FSMContext) -> Message:
+    """Send the shop card to the chat of `message`."""
+    card = await butcher_card(message.bot, butcher)
+    sent_msg = await card.send(message)
+
     # Store message id for back navigation
     await state.update_data(detail_message_id=sent_msg.message_id)
+    return sent_msg
+
+
+@router.callback_query(Route(ButcherCb), flags={"callback_answer": "manual"})
+async def show_butcher_detail(callback: CallbackQuery, state: FSMContext, callback_data: ButcherCb):
+    """Show butcher detail with photo."""
+    butcher_id = callback_data.id
+    butcher = await get_butcher_card(butcher_id)
+    
+    if not butcher:
+        await callback.answer("❌ Qassobxona topilmadi")
+        return
     await callback.answer()
 
-@router.callback_query(F.data == "back_to_list")
+    # The list message becomes the card (editMessageMedia when it has a photo)
+    card = await butcher_card(callback.bot, butcher)
+    shown = await card.show(callback.message)
+    await state.update_data(detail_message_id=shown.message_id)
+
+@router.callback_query(Route(BackToListCb))
 async def back_to_list(callback: CallbackQuery, state: FSMContext):
     """Back to list view."""
     data = await state.get_data()
-    butchers = data.get("search_results", [])
+    butchers = data.get("search_results")
+    if not butchers:
+        # Card opened from a shared link: there is no list to go back to
+        await Screen("Bo'limni tanlang:", client_menu_kb()).show(callback.message)
+        await callback.answer()
+        return
     page = data.get("current_page", 0)
     show_distance = data.get("show_distance", False)
     
@@ -487,33 +549,29 @@ async def back_to_list(callback: CallbackQuery, state: FSMContext):
     start = page * PAGE_SIZE
     page_butchers = butchers[start:start+PAGE_SIZE]
     
-    # Delete current message (photo or text)
-    await callback.message.delete()
-    
-    # Send new list message
-    await callback.message.answer(
-        "Natijalar:",
-        reply_markup=butcher_list_kb(page_butchers, page, total_pages, show_distance=show_distance)
-    )
+    # Edited in place from a text card; a photo card can't drop its photo and is replaced
+    await Screen(
+        "Natijalar:", butcher_list_kb(page_butchers, page, total_pages, show_distance=show_distance)
+    ).show(callback.message)
     await callback.answer()
 
-@router.callback_query(F.data.startswith("butcher_loc:"))
-async def send_location(callback: CallbackQuery):
+@router.callback_query(Route(ButcherLocationCb), flags={"callback_answer": "manual"})
+async def send_location(callback: CallbackQuery, callback_data: ButcherLocationCb):
     """Send location pin."""
-    butcher_id = int(callback.data.split(":")[1])
+    butcher_id = callback_data.id
     butcher = await get_butcher_detail(butcher_id)
     
     if butcher and butcher['lat'] and butcher['lon']:
-        await callback.message.answer_location(butcher['lat'], butcher['lon'])
         await callback.answer()
+        await callback.message.answer_location(butcher['lat'], butcher['lon'])
     else:
         await callback.answer("❌ Lokatsiya topilmadi")
 
 
-@router.callback_query(F.data.startswith("butcher_buy:"))
-async def send_buy_prices(callback: CallbackQuery):
+@router.callback_query(Route(ButcherBuyPricesCb))
+async def send_buy_prices(callback: CallbackQuery, callback_data: ButcherBuyPricesCb):
     """Send buy prices."""
-    butcher_id = int(callback.data.split(":")[1])
+    butcher_id = callback_data.id
     prices = await get_prices(butcher_id, "BUY")
     
     text = "🐄 <b>So'yib olish narximiz (aholining mol/qo'yini so'yib sotib olish narxi):</b>\n\n"
@@ -529,10 +587,10 @@ async def send_buy_prices(callback: CallbackQuery):
     await callback.answer()
 
 
-@router.callback_query(F.data.startswith("butcher_video:"))
-async def show_butcher_video(callback: CallbackQuery):
+@router.callback_query(Route(ButcherVideoCb), flags={"callback_answer": "manual"})
+async def show_butcher_video(callback: CallbackQuery, callback_data: ButcherVideoCb):
     """Show butcher product video."""
-    butcher_id = int(callback.data.split(":")[1])
+    butcher_id = callback_data.id
     butcher = await get_butcher_detail(butcher_id)
     
     if butcher and butcher.get('video_file_id'):
@@ -1,28 +1,35 @@
 """Common handlers - /start, settings, about."""
+from typing import Optional
+
 from aiogram import Router, F
 from aiogram.types import Message, ContentType, ReplyKeyboardMarkup, KeyboardButton, CallbackQuery
-from aiogram.filters import Command, CommandStart
+from aiogram.filters import Command, CommandStart, CommandObject
 from aiogram.fsm.context import FSMContext
 
 from app.states import ClientReg, RoleSelect, ButcherReg, Settings
-from app.services.user_service import upsert_user, get_user, is_registered, update_user, set_role
+from app.services.user_service import ensure_user, is_registered, update_user, set_role
 from app.services.admin_notify_service import notify_new_user
 from app.services.donate_service import get_support_profile
+from app.services.butcher_service import get_butcher_card
+from app.services.stats_service import track_event
+from app.handlers.client import send_butcher_detail
 from app.keyboards.reply import (
     client_main_kb, butcher_main_kb, admin_main_kb,
     request_contact_kb, request_location_kb, settings_kb, butcher_settings_kb,
     role_picker_kb, back_kb
 )
 from app.keyboards.inline import client_menu_kb, client_settings_kb
-from app.config import ADMINS, add_admin
+from app.keyboards.callbacks import Route, RoleCb
+from app.services.role_service import is_admin
 from app.utils.i18n import t
+from app.utils.deeplink import parse_butcher_payload
 
 router = Router()
 
 
 def get_main_kb_for_role(role: str, telegram_id: int):
     """Get appropriate main keyboard based on role."""
-    if telegram_id in ADMINS:
+    if is_admin(telegram_id):
         return admin_main_kb()
     if role == "butcher":
         return butcher_main_kb()
@@ -30,32 +37,33 @@ def get_main_kb_for_role(role: str, telegram_id: int):
 
 
 @router.message(CommandStart())
-async def cmd_start(message: Message, state: FSMContext):
-    """Handle /start command."""
+async def cmd_start(message: Message, state: FSMContext, command: CommandObject):
+    """Handle /start command (optionally with a shop deep link)."""
     telegram_id = message.from_user.id
     
-    # Check user
-    user = await get_user(telegram_id)
-    
-    # If new user, create with pending role
-    if not user:
-        await upsert_user(telegram_id=telegram_id, name=message.from_user.full_name)
-        user = {"role": "pending", "name": message.from_user.full_name}
-    
-    role = user.get("role", "pending")
-    
+    # Get or create user (pending role) in one round trip;
+    # config admins already have the admin role (role_service.load_admins)
+    user = await ensure_user(telegram_id, name=message.from_user.full_name)
+    role = user.get("role") or "pending"
+
+    # Shared shop link (start=b_<id>_<sig>): open the card right away instead of
+    # menu -> search -> region -> district -> list -> detail
+    butcher_id = parse_butcher_payload(command.args)
+    if butcher_id is not None:
+        await state.clear()
+        butcher = await get_butcher_card(butcher_id)
+        if butcher and butcher["is_approved"] and not butcher["is_blocked"]:
+            track_event("link_opens")
+            track_event(f"link_opens:{butcher_id}")
+            await send_butcher_detail(message, butcher, state)
+        else:
+            await message.answer("❌ Qassobxona topilmadi")
+        # New users still pick a role below
+        if role != "pending":
+            return
+
     # ADMIN CHECK - both from config and database
-    is_admin = telegram_id in ADMINS or role == "admin"
-    
-    if is_admin:
-        # Ensure role is set to admin in database
-        if role != "admin":
-            await set_role(telegram_id, "admin")
-        
-        # Ensure in ADMINS list
-        if telegram_id not in ADMINS:
-            add_admin(telegram_id)
-        
+    if role == "admin":
         await message.answer(
             f"👑 Xush kelibsiz, Admin {message.from_user.first_name}!", 
             reply_markup=admin_main_kb()
@@ -98,10 +106,10 @@ async def cmd_start(message: Message, state: FSMContext):
         await state.clear()
 
 
-@router.callback_query(F.data.startswith("role:"))
-async def process_role_selection_inline(callback: CallbackQuery, state: FSMContext):
+@router.callback_query(Route(RoleCb))
+async def process_role_selection_inline(callback: CallbackQuery, state: FSMContext, callback_data: RoleCb):
     """Process role selection from inline keyboard."""
-    role_type = callback.data.split(":")[1]
+    role_type = callback_data.role
     telegram_id = callback.from_user.id
     name = callback.from_user.full_name
     
@@ -109,8 +117,7 @@ async def process_role_selection_inline(callback: CallbackQuery, state: FSMConte
     await callback.message.delete()
     
     if role_type == "client":
-        await update_user(telegram_id, name=name)
-        await set_role(telegram_id, "client")
+        await update_user(telegram_id, name=name, role="client")
         await notify_new_user(callback.bot, telegram_id)
 
         await callback.message.answer(
@@ -188,9 +195,7 @@ async def process_location(message: Message, state: FSMContext):
     lon = message.location.longitude
     telegram_id = message.from_user.id
     
-    await update_user(telegram_id, lat=lat, lon=lon)
-    
-    user = await get_user(telegram_id)
+    user = await update_user(telegram_id, lat=lat, lon=lon)
     role = user.get("role", "client") if user else "client"
     
     # V8: Notify admins about new registration
@@ -216,9 +221,8 @@ async def process_location_invalid(message: Message, state: FSMContext):
 # ==================== SETTINGS ====================
 
 @router.message(F.text == "⚙️ Sozlamalar")
-async def show_settings(message: Message):
+async def show_settings(message: Message, user: Optional[dict]):
     """Show settings menu."""
-    user = await get_user(message.from_user.id)
     role = user.get("role") if user else "client"
     
     if role == "butcher":
@@ -228,11 +232,10 @@ async def show_settings(message: Message):
 
 
 @router.message(F.text == "⬅️ Orqaga")
-async def go_back(message: Message, state: FSMContext):
+async def go_back(message: Message, state: FSMContext, user: Optional[dict]):
     """Go back to main menu."""
     await state.clear()
     telegram_id = message.from_user.id
-    user = await get_user(telegram_id)
     role = user.get("role", "client") if user else "client"
     
     await message.answer(
@@ -289,9 +292,8 @@ def language_kb() -> ReplyKeyboardMarkup:
 
 
 @router.message(F.text == "👤 Ismni o'zgartirish")
-async def edit_name_start(message: Message, state: FSMContext):
+async def edit_name_start(message: Message, state: FSMContext, user: Optional[dict]):
     """Start name edit."""
-    user = await get_user(message.from_user.id)
     lang = user.get("language", "uz") if user else "uz"
     
     await message.answer(
@@ -302,11 +304,10 @@ async def edit_name_start(message: Message, state: FSMContext):
 
 
 @router.message(Settings.edit_name_wait)
-async def edit_name_process(message: Message, state: FSMContext):
+async def edit_name_process(message: Message, state: FSMContext, user: Optional[dict]):
     """Process name edit."""
     if message.text == "⬅️ Orqaga":
         await state.clear()
-        user = await get_user(message.from_user.id)
         role = user.get("role", "client") if user else "client"
         if role == "butcher":
             await message.answer("⚙️ Sozlamalar", reply_markup=butcher_settings_kb())
@@ -319,8 +320,7 @@ async def edit_name_process(message: Message, state: FSMContext):
         await message.answer("❌ Ism juda qisqa. Iltimos, to'liq ismingizni kiriting:")
         return
     
-    await update_user(message.from_user.id, name=name)
-    user = await get_user(message.from_user.id)
+    user = await update_user(message.from_user.id, name=name)
     lang = user.get("language", "uz") if user else "uz"
     
     await message.answer(t(lang, "name_updated"))
@@ -334,9 +334,8 @@ async def edit_name_process(message: Message, state: FSMContext):
 
 
 @router.message(F.text == "📱 Telefonni o'zgartirish")
-async def edit_phone_start(message: Message, state: FSMContext):
+async def edit_phone_start(message: Message, state: FSMContext, user: Optional[dict]):
     """Start phone edit."""
-    user = await get_user(message.from_user.id)
     lang = user.get("language", "uz") if user else "uz"
     
     await message.answer(
@@ -350,9 +349,7 @@ async def edit_phone_start(message: Message, state: FSMContext):
 async def edit_phone_process(message: Message, state: FSMContext):
     """Process phone edit."""
     phone = message.contact.phone_number
-    await update_user(message.from_user.id, phone=phone)
-    
-    user = await get_user(message.from_user.id)
+    user = await update_user(message.from_user.id, phone=phone)
     lang = user.get("language", "uz") if user else "uz"
     
     await message.answer(t(lang, "phone_updated"))
@@ -366,11 +363,10 @@ async def edit_phone_process(message: Message, state: FSMContext):
 
 
 @router.message(Settings.edit_phone_wait)
-async def edit_phone_invalid(message: Message, state: FSMContext):
+async def edit_phone_invalid(message: Message, state: FSMContext, user: Optional[dict]):
     """Handle invalid phone input."""
     if message.text == "⬅️ Orqaga":
         await state.clear()
-        user = await get_user(message.from_user.id)
         role = user.get("role", "client") if user else "client"
         if role == "butcher":
             await message.answer("⚙️ Sozlamalar", reply_markup=butcher_settings_kb())
@@ -385,9 +381,8 @@ async def edit_phone_invalid(message: Message, state: FSMContext):
 
 
 @router.message(F.text == "🌐 Tilni o'zgartirish")
-async def edit_language_start(message: Message, state: FSMContext):
+async def edit_language_start(message: Message, state: FSMContext, user: Optional[dict]):
     """Start language edit."""
-    user = await get_user(message.from_user.id)
     lang = user.get("language", "uz") if user else "uz"
     
     await message.answer(
@@ -398,11 +393,10 @@ async def edit_language_start(message: Message, state: FSMContext):
 
 
 @router.message(Settings.edit_language_wait)
-async def edit_language_process(message: Message, state: FSMContext):
+async def edit_language_process(message: Message, state: FSMContext, user: Optional[dict]):
     """Process language selection."""
     if message.text == "⬅️ Orqaga":
         await state.clear()
-        user = await get_user(message.from_user.id)
         role = user.get("role", "client") if user else "client"
         if role == "butcher":
             await message.answer("⚙️ Sozlamalar", reply_markup=butcher_settings_kb())
@@ -417,11 +411,10 @@ async def edit_language_process(message: Message, state: FSMContext):
         lang = "ru"
     
     if lang:
-        await update_user(message.from_user.id, language=lang)
+        user = await update_user(message.from_user.id, language=lang)
         await message.answer(t(lang, "language_updated"))
         await state.clear()
         
-        user = await get_user(message.from_user.id)
         role = user.get("role", "client") if user else "client"
         if role == "butcher":
             await message.answer("⚙️ Sozlamalar", reply_markup=butcher_settings_kb())
@@ -0,0 +1,86 @@
+"""Inline mode - @bot <shop or district> search from any chat."""
+import html
+
+from aiogram import Bot, Router
+from aiogram.types import (
+    InlineQuery, InlineQueryResultArticle, InlineQueryResultCachedPhoto,
+    InputTextMessageContent, InlineKeyboardMarkup, InlineKeyboardButton
+)
+
+from app.config import INLINE_PAGE_SIZE, INLINE_CACHE_TIME
+from app.services.inline_service import inline_search
+from app.services.stats_service import track_event
+from app.utils.deeplink import butcher_link
+
+router = Router()
+
+
+def _card_text(card: dict) -> str:
+    """Message sent to the chat when a result is picked."""
+    place = ", ".join(html.escape(x) for x in (card["region_name"], card["district_name"]) if x)
+    lines = [f"🥩 <b>{html.escape(card['shop_name'])}</b>"]
+    if card.get("is_closed"):
+        lines.append("🟠 <b>Vaqtincha yopiq</b>")
+    if place:
+        lines.append(f"📍 {place}")
+    if card.get("phone"):
+        lines.append(f"📞 {html.escape(card['phone'])}")
+    if card.get("work_time"):
+        lines.append(f"🕒 {html.escape(card['work_time'])}")
+    if card.get("price"):
+        price_fmt = f"{card['price']:,}".replace(",", " ")
+        lines.append(f"💰 {html.escape(card['category'])}: {price_fmt} so'm dan")
+    return "\n".join(lines)
+
+
+def _description(card: dict) -> str:
+    """Second line of the result in the inline list."""
+    parts = [card["district_name"] or ""]
+    if card.get("price"):
+        price_fmt = f"{card['price']:,}".replace(",", " ")
+        parts.append(f"{card['category']}: {price_fmt} so'm")
+    return " • ".join(p for p in parts if p)
+
+
+def _result(card: dict, bot_username: str):
+    """Photo result when the shop has one (Telegram serves the thumbnail), text otherwise."""
+    markup = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🤖 Botda ochish", url=butcher_link(bot_username, card["id"]))]
+    ])
+    if card.get("image_file_id"):
+        return InlineQueryResultCachedPhoto(
+            id=f"b{card['id']}",
+            photo_file_id=card["image_file_id"],
+            title=card["shop_name"],
+            description=_description(card),
+            caption=_card_text(card),
+            parse_mode="HTML",
+            reply_markup=markup
+        )
+    return InlineQueryResultArticle(
+        id=f"b{card['id']}",
+        title=card["shop_name"],
+        description=_description(card),
+        input_message_content=InputTextMessageContent(message_text=_card_text(card), parse_mode="HTML"),
+        reply_markup=markup
+    )
+
+
+@router.inline_query()
+async def inline_butcher_search(inline_query: InlineQuery, bot: Bot):
+    """Shop name or district search; answers are the same for everyone, so Telegram may cache them."""
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    cards = await inline_search(inline_query.query)
+    if offset == 0 and inline_query.query.strip():
+        track_event("searches")
+
+    page = cards[offset:offset + INLINE_PAGE_SIZE]
+    next_offset = str(offset + INLINE_PAGE_SIZE) if offset + INLINE_PAGE_SIZE < len(cards) else ""
+
+    me = await bot.me()
+    await inline_query.answer(
+        [_result(card, me.username) for card in page],
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=False,
+        next_offset=next_offset
+    )
@@ -0,0 +1,196 @@
+"""
+Callback data schemes: `prefix[:arg...]`, one CallbackData factory per prefix.
+
+Keyboards build buttons with `.pack()`, handlers match them with `Route(...)`
+and receive the parsed object as `callback_data`.
+"""
+from typing import Any, Dict, Optional, Type, Union
+
+from aiogram.filters import Filter
+from aiogram.filters.callback_data import CallbackData
+from aiogram.types import CallbackQuery
+
+
+# --- Navigation (no arguments) ---
+
+class NoopCb(CallbackData, prefix="noop"):
+    pass
+
+
+class BackToMenuCb(CallbackData, prefix="back_to_menu"):
+    pass
+
+
+class BackToListCb(CallbackData, prefix="back_to_list"):
+    pass
+
+
+class BackToRegionsCb(CallbackData, prefix="back_to_regions"):
+    pass
+
+
+class BackToSearchMethodCb(CallbackData, prefix="back_to_search_method"):
+    pass
+
+
+class BackToButcherMenuCb(CallbackData, prefix="back_to_butcher_menu"):
+    pass
+
+
+# --- Registration / settings ---
+
+class RoleCb(CallbackData, prefix="role"):
+    role: str
+
+
+class LangCb(CallbackData, prefix="lang"):
+    code: str
+
+
+class ClientMenuCb(CallbackData, prefix="client"):
+    action: str
+
+
+class SettingsCb(CallbackData, prefix="settings"):
+    action: str
+
+
+# --- Client search ---
+
+class SearchMethodCb(CallbackData, prefix="search"):
+    method: str
+
+
+class RadiusCb(CallbackData, prefix="radius"):
+    km: int
+
+
+class RegionCb(CallbackData, prefix="region"):
+    id: int
+
+
+class DistrictCb(CallbackData, prefix="district"):
+    id: int
+
+
+class PageCb(CallbackData, prefix="page"):
+    page: int
+
+
+class ButcherCb(CallbackData, prefix="butcher"):
+    id: int
+
+
+class ButcherLocationCb(CallbackData, prefix="butcher_loc"):
+    id: int
+
+
+class ButcherBuyPricesCb(CallbackData, prefix="butcher_buy"):
+    id: int
+
+
+class ButcherVideoCb(CallbackData, prefix="butcher_video"):
+    id: int
+
+
+# --- Butcher cabinet ---
+
+class PriceCategoryCb(CallbackData, prefix="price"):
+    price_type: str
+    category: str
+
+
+# --- Admin ---
+
+class BroadcastCb(CallbackData, prefix="broadcast"):
+    target: str
+
+
+class AdminButchersPageCb(CallbackData, prefix="admin_butchers_page"):
+    """Butcher list page; direction/created_at/id form the keyset cursor (empty on the first page)."""
+    status: str
+    region: int
+    direction: Optional[str] = None
+    created_at: Optional[int] = None
+    id: Optional[int] = None
+    page: int = 0
+
+
+class AdminButchersRegionsCb(CallbackData, prefix="admin_butchers_regions"):
+    status: str
+
+
+class AdminBackToListCb(CallbackData, prefix="admin_back_to_list"):
+    pass
+
+
+class AdminButcherCb(CallbackData, prefix="admin_butcher_view"):
+    id: int
+
+
+class ApproveCb(CallbackData, prefix="approve"):
+    id: int
+
+
+class BlockCb(CallbackData, prefix="block"):
+    id: int
+
+
+class UnblockCb(CallbackData, prefix="unblock"):
+    id: int
+
+
+class ToggleClosedCb(CallbackData, prefix="toggle_closed"):
+    id: int
+
+
+class DeleteCb(CallbackData, prefix="delete"):
+    id: int
+
+
+class AdminMessageCb(CallbackData, prefix="admin_msg"):
+    id: int
+
+
+class ConfirmCb(CallbackData, prefix="confirm"):
+    action: str
+    id: int
+
+
+class CancelCb(CallbackData, prefix="cancel"):
+    action: str
+    id: int
+
+
+class Route(Filter):
+    """
+    Handler filter for one callback factory, optionally with fixed field values.
+    Compares the prefix split once by CallbackRouteMiddleware; the data is only
+    parsed when the prefix matches, and is passed on as `callback_data`.
+    """
+    __slots__ = ("factory", "prefix", "values")
+
+    def __init__(self, factory: Type[CallbackData], **values: Any):
+        self.factory = factory
+        self.prefix = factory.__prefix__
+        self.values = values
+
+    def __str__(self) -> str:
+        values = "".join(f", {k}={v!r}" for k, v in self.values.items())
+        return f"Route({self.factory.__name__}{values})"
+
+    async def __call__(self, callback: CallbackQuery,
+                       callback_prefix: Optional[str] = None) -> Union[bool, Dict[str, Any]]:
+        if callback_prefix is None:
+            # Router used without the middleware
+            callback_prefix = (callback.data or "").partition(self.factory.__separator__)[0]
+        if callback_prefix != self.prefix:
+            return False
+        try:
+            callback_data = self.factory.unpack(callback.data)
+        except (TypeError, ValueError):
+            return False
+        for name, value in self.values.items():
+            if getattr(callback_data, name) != value:
+                return False
+        return {"callback_data": callback_data}
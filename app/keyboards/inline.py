@@ -1,7 +1,15 @@
 """Inline keyboards for the bot."""
+from typing import Optional
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from app.config import PAGE_SIZE, MEAT_SELL_CATEGORIES, MEAT_BUY_CATEGORIES
+from app.keyboards.callbacks import (
+    NoopCb, BackToMenuCb, BackToListCb, BackToRegionsCb, BackToSearchMethodCb, BackToButcherMenuCb,
+    RoleCb, LangCb, ClientMenuCb, SettingsCb, SearchMethodCb, RadiusCb, RegionCb, DistrictCb, PageCb,
+    ButcherCb, ButcherLocationCb, ButcherBuyPricesCb, ButcherVideoCb, PriceCategoryCb, BroadcastCb,
+    AdminButchersPageCb, AdminButchersRegionsCb, AdminBackToListCb, AdminButcherCb,
+    ApproveCb, BlockCb, UnblockCb, ToggleClosedCb, DeleteCb, AdminMessageCb, ConfirmCb, CancelCb
+)
 from app.utils.i18n import t
 
 
@@ -9,11 +17,12 @@ def client_menu_kb() -> InlineKeyboardMarkup:
     """Client main menu (Inline)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="📍 Yaqin qassobxonalar", callback_data="client:nearby")],
-            [InlineKeyboardButton(text="🥩 Go'sht narxlari", callback_data="client:prices"),
-             InlineKeyboardButton(text="👥 Foydalanuvchilar soni", callback_data="client:count")],
-            [InlineKeyboardButton(text="ℹ️ Bot haqida", callback_data="client:about"),
-             InlineKeyboardButton(text="⚙️ Sozlamalar", callback_data="client:settings")]
+            [InlineKeyboardButton(text="📍 Yaqin qassobxonalar", callback_data=ClientMenuCb(action="nearby").pack())],
+            [InlineKeyboardButton(text="🔎 Nomi bo'yicha qidirish", callback_data=ClientMenuCb(action="search").pack())],
+            [InlineKeyboardButton(text="🥩 Go'sht narxlari", callback_data=ClientMenuCb(action="prices").pack()),
+             InlineKeyboardButton(text="👥 Foydalanuvchilar soni", callback_data=ClientMenuCb(action="count").pack())],
+            [InlineKeyboardButton(text="ℹ️ Bot haqida", callback_data=ClientMenuCb(action="about").pack()),
+             InlineKeyboardButton(text="⚙️ Sozlamalar", callback_data=ClientMenuCb(action="settings").pack())]
         ]
     )
 
@@ -22,9 +31,9 @@ def client_settings_kb() -> InlineKeyboardMarkup:
     """Client settings (Inline)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="🌐 Tilni o'zgartirish", callback_data="settings:lang")],
-            [InlineKeyboardButton(text="📩 Adminga murojaat", callback_data="settings:contact")],
-            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_menu")]
+            [InlineKeyboardButton(text="🌐 Tilni o'zgartirish", callback_data=SettingsCb(action="lang").pack())],
+            [InlineKeyboardButton(text="📩 Adminga murojaat", callback_data=SettingsCb(action="contact").pack())],
+            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data=BackToMenuCb().pack())]
         ]
     )
 
@@ -33,9 +42,9 @@ def language_inline_kb() -> InlineKeyboardMarkup:
     """Language selection (Inline)."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="🇺🇿 O'zbek", callback_data="lang:uz"),
-             InlineKeyboardButton(text="🇷🇺 Русский", callback_data="lang:ru")],
-            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="client:settings")]
+            [InlineKeyboardButton(text="🇺🇿 O'zbek", callback_data=LangCb(code="uz").pack()),
+             InlineKeyboardButton(text="🇷🇺 Русский", callback_data=LangCb(code="ru").pack())],
+            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data=ClientMenuCb(action="settings").pack())]
         ]
     )
 
@@ -53,7 +62,7 @@ def regions_kb(regions: list, lang: str = "uz") -> InlineKeyboardMarkup:
         text = region.get("name_uz", "Region") # Fallback
         builder.button(
             text=text,
-            callback_data=f"region:{region['id']}"
+            callback_data=RegionCb(id=region["id"]).pack()
         )
     builder.adjust(2)  # 2 columns
     return builder.as_markup()
@@ -66,10 +75,23 @@ def districts_kb(districts: list, region_id: int, lang: str = "uz") -> InlineKey
         text = district.get("name_uz", "District")
         builder.button(
             text=text,
-            callback_data=f"district:{district['id']}"
+            callback_data=DistrictCb(id=district["id"]).pack()
         )
     builder.adjust(2)
-    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data=f"back_to_regions"))
+    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data=BackToRegionsCb().pack()))
+    return builder.as_markup()
+
+
+def district_results_kb(districts: list) -> InlineKeyboardMarkup:
+    """Districts found by name, labelled with their region."""
+    builder = InlineKeyboardBuilder()
+    for district in districts:
+        builder.button(
+            text=f"{district['name_uz']} ({district['region_name']})",
+            callback_data=DistrictCb(id=district["id"]).pack()
+        )
+    builder.adjust(1)
+    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data=BackToRegionsCb().pack()))
     return builder.as_markup()
 
 
@@ -82,22 +104,22 @@ def butcher_list_kb(butchers: list, page: int = 0, total_pages: int = 1, show_di
             text = f"🥩 {b['shop_name']} ({b['distance']:.1f} km)"
         else:
             text = f"🥩 {b['shop_name']}"
-        builder.button(text=text, callback_data=f"butcher:{b['id']}")
+        builder.button(text=text, callback_data=ButcherCb(id=b["id"]).pack())
     
     builder.adjust(1)  # 1 column
     
     # Pagination buttons
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton(text="⬅️", callback_data=f"page:{page-1}"))
-    nav_buttons.append(InlineKeyboardButton(text=f"{page+1}/{total_pages}", callback_data="noop"))
+        nav_buttons.append(InlineKeyboardButton(text="⬅️", callback_data=PageCb(page=page - 1).pack()))
+    nav_buttons.append(InlineKeyboardButton(text=f"{page+1}/{total_pages}", callback_data=NoopCb().pack()))
     if page < total_pages - 1:
-        nav_buttons.append(InlineKeyboardButton(text="➡️", callback_data=f"page:{page+1}"))
+        nav_buttons.append(InlineKeyboardButton(text="➡️", callback_data=PageCb(page=page + 1).pack()))
     
     if len(nav_buttons) > 1:
         builder.row(*nav_buttons)
     
-    builder.row(InlineKeyboardButton(text=t(lang, "back"), callback_data="back_to_menu"))
+    builder.row(InlineKeyboardButton(text=t(lang, "back"), callback_data=BackToMenuCb().pack()))
     return builder.as_markup()
 
 
@@ -106,8 +128,8 @@ def role_select_kb() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="👤 Mijoz", callback_data="role:client"),
-                InlineKeyboardButton(text="🥩 Qassob", callback_data="role:butcher")
+                InlineKeyboardButton(text="👤 Mijoz", callback_data=RoleCb(role="client").pack()),
+                InlineKeyboardButton(text="🥩 Qassob", callback_data=RoleCb(role="butcher").pack())
             ]
         ]
     )
@@ -117,9 +139,18 @@ def search_method_kb() -> InlineKeyboardMarkup:
     """Search method selection inline keyboard."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="📍 Lokatsiya yuborish", callback_data="search:req_loc")],
-            [InlineKeyboardButton(text="🗺 Qo'lda tanlash", callback_data="search:manual")],
-            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_menu")]
+            [InlineKeyboardButton(text="📍 Lokatsiya yuborish", callback_data=SearchMethodCb(method="req_loc").pack())],
+            [InlineKeyboardButton(text="🗺 Qo'lda tanlash", callback_data=SearchMethodCb(method="manual").pack())],
+            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data=BackToMenuCb().pack())]
+        ]
+    )
+
+
+def search_query_kb() -> InlineKeyboardMarkup:
+    """Back button under the name search prompt."""
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data=BackToMenuCb().pack())]
         ]
     )
 
@@ -128,22 +159,24 @@ def radius_kb(radii: list) -> InlineKeyboardMarkup:
     """Radius selection inline keyboard."""
     builder = InlineKeyboardBuilder()
     for r in radii:
-        builder.button(text=f"{r} km", callback_data=f"radius:{r}")
+        builder.button(text=f"{r} km", callback_data=RadiusCb(km=r).pack())
     
     builder.adjust(3)
-    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_search_method"))
+    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data=BackToSearchMethodCb().pack()))
     return builder.as_markup()
     return builder.as_markup()
 
 
-def butcher_detail_kb(butcher_id: int, lang: str = "uz") -> InlineKeyboardMarkup:
-    """Butcher detail view keyboard."""
+def butcher_detail_kb(butcher_id: int, lang: str = "uz", share_url: Optional[str] = None) -> InlineKeyboardMarkup:
+    """Butcher detail view keyboard; `share_url` adds a share button for the shop's deep link."""
     builder = InlineKeyboardBuilder()
     
-    builder.button(text="📍 Lokatsiyani ko'rish", callback_data=f"butcher_loc:{butcher_id}")
-    builder.button(text="🐄 So'yib olish narxlari", callback_data=f"butcher_buy:{butcher_id}")
-    builder.button(text="🎥 Mahsulotlar videosi", callback_data=f"butcher_video:{butcher_id}")
-    builder.button(text="⬅️ Orqaga", callback_data="back_to_list")
+    builder.button(text="📍 Lokatsiyani ko'rish", callback_data=ButcherLocationCb(id=butcher_id).pack())
+    builder.button(text="🐄 So'yib olish narxlari", callback_data=ButcherBuyPricesCb(id=butcher_id).pack())
+    builder.button(text="🎥 Mahsulotlar videosi", callback_data=ButcherVideoCb(id=butcher_id).pack())
+    if share_url:
+        builder.button(text="📤 Ulashish", url=share_url)
+    builder.button(text="⬅️ Orqaga", callback_data=BackToListCb().pack())
     builder.adjust(1)
     return builder.as_markup()
 
@@ -154,23 +187,23 @@ def admin_butcher_kb(butcher_id: int, is_approved: bool = False, is_blocked: boo
     
     # Approve button (only if not approved)
     if not is_approved:
-        builder.button(text="✅ Tasdiqlash", callback_data=f"approve:{butcher_id}")
+        builder.button(text="✅ Tasdiqlash", callback_data=ApproveCb(id=butcher_id).pack())
     
     # Block/Unblock toggle
     if is_blocked:
-        builder.button(text="🔓 Blokdan chiqarish", callback_data=f"unblock:{butcher_id}")
+        builder.button(text="🔓 Blokdan chiqarish", callback_data=UnblockCb(id=butcher_id).pack())
     else:
-        builder.button(text="🚫 Bloklash", callback_data=f"block:{butcher_id}")
+        builder.button(text="🚫 Bloklash", callback_data=BlockCb(id=butcher_id).pack())
     
     # Closed/Open toggle
     if is_closed:
-        builder.button(text="🟢 Ochiq qilish", callback_data=f"toggle_closed:{butcher_id}")
+        builder.button(text="🟢 Ochiq qilish", callback_data=ToggleClosedCb(id=butcher_id).pack())
     else:
-        builder.button(text="🟠 Yopiq qilish", callback_data=f"toggle_closed:{butcher_id}")
+        builder.button(text="🟠 Yopiq qilish", callback_data=ToggleClosedCb(id=butcher_id).pack())
     
-    builder.button(text="🗑 O'chirish", callback_data=f"delete:{butcher_id}")
-    builder.button(text="📩 Xabar yuborish", callback_data=f"admin_msg:{butcher_id}")
-    builder.button(text="⬅️ Orqaga", callback_data="admin_back_to_list")
+    builder.button(text="🗑 O'chirish", callback_data=DeleteCb(id=butcher_id).pack())
+    builder.button(text="📩 Xabar yuborish", callback_data=AdminMessageCb(id=butcher_id).pack())
+    builder.button(text="⬅️ Orqaga", callback_data=AdminBackToListCb().pack())
     builder.adjust(2)
     return builder.as_markup()
 
@@ -183,10 +216,10 @@ def price_categories_kb(price_type: str = "SELL") -> InlineKeyboardMarkup:
     categories = MEAT_SELL_CATEGORIES if price_type == "SELL" else MEAT_BUY_CATEGORIES
     
     for cat in categories:
-        builder.button(text=f"🥩 {cat}", callback_data=f"price_{price_type.lower()}:{cat}")
+        builder.button(text=f"🥩 {cat}", callback_data=PriceCategoryCb(price_type=price_type, category=cat).pack())
     
     builder.adjust(2)
-    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_butcher_menu"))
+    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data=BackToButcherMenuCb().pack()))
     return builder.as_markup()
 
 
@@ -194,10 +227,10 @@ def broadcast_target_kb() -> InlineKeyboardMarkup:
     """Broadcast target selection."""
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="👥 Barcha mijozlar", callback_data="broadcast:client")],
-            [InlineKeyboardButton(text="🥩 Barcha qassoblar", callback_data="broadcast:butcher")],
-            [InlineKeyboardButton(text="📢 Hammaga", callback_data="broadcast:all")],
-            [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="broadcast:cancel")]
+            [InlineKeyboardButton(text="👥 Barcha mijozlar", callback_data=BroadcastCb(target="client").pack())],
+            [InlineKeyboardButton(text="🥩 Barcha qassoblar", callback_data=BroadcastCb(target="butcher").pack())],
+            [InlineKeyboardButton(text="📢 Hammaga", callback_data=BroadcastCb(target="all").pack())],
+            [InlineKeyboardButton(text="❌ Bekor qilish", callback_data=BroadcastCb(target="cancel").pack())]
         ]
     )
 
@@ -207,54 +240,101 @@ def confirmation_inline_kb(action: str, item_id: int, lang: str = "uz") -> Inlin
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text=t(lang, "cancel"), callback_data=f"cancel_{action}:{item_id}")
+                InlineKeyboardButton(text=t(lang, "confirm"), callback_data=ConfirmCb(action=action, id=item_id).pack()),
+                InlineKeyboardButton(text=t(lang, "cancel"), callback_data=CancelCb(action=action, id=item_id).pack())
             ]
         ]
     )
 
 
-def admin_butchers_list_kb(butchers: list, page: int = 0, total_pages: int = 1) -> InlineKeyboardMarkup:
-    """Admin: Paginated list of all butchers."""
+ADMIN_STATUS_LABELS = {
+    "all": "Hammasi",
+    "pending": "⏳ Kutilmoqda",
+    "approved": "✅ Tasdiqlangan",
+    "blocked": "🚫 Bloklangan",
+}
+
+
+def admin_butchers_list_kb(butchers: list, page: int = 0, total_pages: int = 1,
+                           status: str = "all", region_id: int = 0,
+                           has_prev: bool = False, has_next: bool = False) -> InlineKeyboardMarkup:
+    """
+    Admin: Paginated list of all butchers.
+    Page buttons carry the keyset cursor (see AdminButchersPageCb).
+    """
     builder = InlineKeyboardBuilder()
     
     for b in butchers:
         # Shop name + Approval status maybe?
-        status = "✅" if b.get('is_approved') else "⏳"
+        status_icon = "✅" if b.get('is_approved') else "⏳"
         if b.get('is_blocked'):
-            status = "🚫"
+            status_icon = "🚫"
             
-        text = f"{status} {b['shop_name']}"
-        builder.button(text=text, callback_data=f"admin_butcher_view:{b['id']}")
+        text = f"{status_icon} {b['shop_name']}"
+        builder.button(text=text, callback_data=AdminButcherCb(id=b["id"]).pack())
     
     builder.adjust(1)
     
     # Pagination
     nav_buttons = []
-    if page > 0:
-        nav_buttons.append(InlineKeyboardButton(text="⬅️ Oldingi", callback_data=f"admin_butchers_page:{page-1}"))
+    if has_prev and butchers:
+        first = butchers[0]
+        nav_buttons.append(InlineKeyboardButton(
+            text="⬅️ Oldingi",
+            callback_data=AdminButchersPageCb(
+                status=status, region=region_id, direction="p",
+                created_at=first["created_at"], id=first["id"], page=page - 1
+            ).pack()
+        ))
     
-    nav_buttons.append(InlineKeyboardButton(text=f"{page+1}/{total_pages}", callback_data="noop"))
+    nav_buttons.append(InlineKeyboardButton(text=f"{page+1}/{max(total_pages, 1)}", callback_data=NoopCb().pack()))
     
-    if page < total_pages - 1:
-        nav_buttons.append(InlineKeyboardButton(text="Keyingi ➡️", callback_data=f"admin_butchers_page:{page+1}"))
+    if has_next and butchers:
+        last = butchers[-1]
+        nav_buttons.append(InlineKeyboardButton(
+            text="Keyingi ➡️",
+            callback_data=AdminButchersPageCb(
+                status=status, region=region_id, direction="n",
+                created_at=last["created_at"], id=last["id"], page=page + 1
+            ).pack()
+        ))
     
     if len(nav_buttons) > 1:
         builder.row(*nav_buttons)
-        
-    # No back button here? Or back to main admin menu?
-    # Usually admin menu is reply keyboard, so this inline is triggered by a reply button.
-    # No "Back" needed if message is fresh, but if editing we might want to close?
-    # Let's keep it simple.
+
+    # Filters (current one marked)
+    filters = [
+        InlineKeyboardButton(
+            text=f"• {label}" if key == status else label,
+            callback_data=AdminButchersPageCb(status=key, region=region_id).pack()
+        )
+        for key, label in ADMIN_STATUS_LABELS.items()
+    ]
+    builder.row(*filters[:2])
+    builder.row(*filters[2:])
+    builder.row(InlineKeyboardButton(
+        text="📍 Viloyat bo'yicha", callback_data=AdminButchersRegionsCb(status=status).pack()
+    ))
     
     return builder.as_markup()
 
 
+def admin_butchers_regions_kb(regions: list, status: str = "all") -> InlineKeyboardMarkup:
+    """Admin: Region filter for the butcher list."""
+    builder = InlineKeyboardBuilder()
+    builder.button(text="🌍 Barcha viloyatlar", callback_data=AdminButchersPageCb(status=status, region=0).pack())
+    for region in regions:
+        builder.button(text=region["name_uz"], callback_data=AdminButchersPageCb(status=status, region=region["id"]).pack())
+    builder.adjust(1, 2)
+    return builder.as_markup()
+
+
 def admin_butcher_detail_kb(butcher_id: int, page: int = 0) -> InlineKeyboardMarkup:
     """Admin: Butcher detail view."""
     builder = InlineKeyboardBuilder()
     
     # Actions
-    builder.button(text="⬅️ Orqaga", callback_data=f"admin_butchers_page:{page}")
+    builder.button(text="⬅️ Orqaga", callback_data=AdminButchersPageCb(status="all", region=0).pack())
     builder.adjust(1)
     
     return builder.as_markup()
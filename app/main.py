@@ -2,29 +2,117 @@ import asyncio
 from aiogram import Bot, Dispatcher
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from app.config import BOT_TOKEN
+from app.config import BOT_TOKEN, UPDATE_CONCURRENCY, METRICS_HOST, METRICS_PORT, BACKUP_INTERVAL
 from app.db.models import init_db, seed_regions_districts
-from app.handlers import common, client, butcher, admin
+from app.handlers import common, client, butcher, admin, inline
+from app.middlewares.scheduler import UpdateScheduler
+from app.middlewares.throttling import ThrottlingMiddleware
+from app.middlewares.debounce import CallbackDebounceMiddleware
+from app.middlewares.callback_route import CallbackRouteMiddleware
+from app.middlewares.callback_ack import CallbackAckMiddleware, CallbackAnswerDedupMiddleware
+from app.middlewares.user_loader import UserLoaderMiddleware
+from app.middlewares.role import RoleMiddleware
+from app.middlewares.metrics import UpdateTypeMiddleware, HandlerMetricsMiddleware
+from app.services.maintenance_service import maintenance_loop
+from app.services.backup_service import backup_loop
+from app.services.stats_service import flush_events
+from app.services.role_service import load_admins
+from app.utils.metrics import REGISTRY, start_metrics_server
 
 
-async def main():
-    # Initialize database
-    await init_db()
-    await seed_regions_districts()
+def build_dispatcher(bot: Bot, **kwargs) -> Dispatcher:
+    """Dispatcher with the bot's middlewares and routers; `kwargs` go to Dispatcher."""
+    dp = Dispatcher(**kwargs)
 
-    # Create bot and dispatcher with FSM storage
-    bot = Bot(token=BOT_TOKEN)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+    # Metrics: update types (outer), per-handler latency/errors (inner)
+    dp.update.outer_middleware(UpdateTypeMiddleware())
+    # `is_admin` for every update, from the in-memory role registry
+    dp.update.outer_middleware(RoleMiddleware())
+    handler_metrics = HandlerMetricsMiddleware()
+    dp.message.middleware(handler_metrics)
+    dp.callback_query.middleware(handler_metrics)
+    dp.inline_query.middleware(handler_metrics)
+
+    # Outer middlewares run before filters, so flooded updates cost nothing.
+    # Debounce goes first: a repeated tap must not spend the user's throttle budget.
+    debounce = CallbackDebounceMiddleware()
+    dp.callback_query.outer_middleware(debounce)
+    throttling = ThrottlingMiddleware()
+    dp.message.outer_middleware(throttling)
+    dp.callback_query.outer_middleware(throttling)
+
+    # Ack callbacks before the handler does its DB/media work;
+    # the session middleware drops the handlers' now-redundant answers
+    answer_dedup = CallbackAnswerDedupMiddleware()
+    bot.session.middleware(answer_dedup)
+    dp.callback_query.middleware(CallbackAckMiddleware())
+
+    # `user` / `butcher` handler arguments: one joined query, only for handlers that ask
+    user_loader = UserLoaderMiddleware()
+    dp.message.middleware(user_loader)
+    dp.callback_query.middleware(user_loader)
+
+    REGISTRY.gauge(
+        "bot_dropped_updates", "Updates short-circuited by middlewares.",
+        lambda: {
+            (("reason", "throttled"),): throttling.throttled,
+            (("reason", "debounced"),): debounce.dropped,
+            (("reason", "duplicate_answer"),): answer_dedup.dropped,
+        }
+    )
 
     # Include routers
     dp.include_router(common.router)
     dp.include_router(butcher.router)
     dp.include_router(client.router)
     dp.include_router(admin.router)
+    dp.include_router(inline.router)
+
+    # Callbacks: prefix split once, routers without a handler for it are skipped
+    dp.callback_query.outer_middleware(
+        CallbackRouteMiddleware(common.router, butcher.router, client.router, admin.router)
+    )
+    return dp
+
+
+async def main():
+    # Initialize database
+    await init_db()
+    await seed_regions_districts()
+    # Admins: config IDs promoted in the DB, then every admin loaded into memory
+    await load_admins()
+
+    # Create bot and dispatcher with FSM storage.
+    # Scheduler runs different chats concurrently but one chat strictly in order,
+    # so read-modify-write handlers never interleave for the same user.
+    bot = Bot(token=BOT_TOKEN)
+    scheduler = UpdateScheduler(max_concurrency=UPDATE_CONCURRENCY)
+    dp = build_dispatcher(bot, storage=MemoryStorage(), events_isolation=scheduler)
+    dp["scheduler"] = scheduler
+    REGISTRY.gauge(
+        "bot_scheduler", "Update scheduler state (active, waiting, queue depths).",
+        lambda: {(("stat", k),): v for k, v in scheduler.stats().items()}
+    )
+
+    metrics_runner = None
+    if METRICS_PORT:
+        metrics_runner = await start_metrics_server(METRICS_HOST, METRICS_PORT)
+
+    # Periodic WAL checkpoint / optimize / incremental vacuum
+    background = [asyncio.create_task(maintenance_loop())]
+    if BACKUP_INTERVAL:
+        background.append(asyncio.create_task(backup_loop()))
 
     print("🥩 Qassobxona Bot ishga tushdi!")
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot, handle_as_tasks=True)
+    finally:
+        for task in background:
+            task.cancel()
+        # Buffered activity counts (searches) would be lost otherwise
+        await flush_events()
+        if metrics_runner:
+            await metrics_runner.cleanup()
 
 
 if __name__ == "__main__":
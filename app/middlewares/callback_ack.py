@@ -0,0 +1,112 @@
+"""Immediate callback acknowledgement."""
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.dispatcher.flags import get_flag
+from aiogram.methods import AnswerCallbackQuery, TelegramMethod
+from aiogram.types import CallbackQuery, TelegramObject
+
+
+class UnseenCallbackAnswer(RuntimeError):
+    """A handler answered a callback with text after it was already acked."""
+
+
+class AnsweredCallbacks:
+    """Bounded set of callback query ids that already got an answer."""
+
+    def __init__(self, size: int = 4096):
+        self.size = size
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+
+    def claim(self, callback_query_id: str) -> bool:
+        """Mark id as answered. Returns False if it was answered before."""
+        if callback_query_id in self._ids:
+            return False
+        self._ids[callback_query_id] = None
+        if len(self._ids) > self.size:
+            self._ids.popitem(last=False)
+        return True
+
+    def __contains__(self, callback_query_id: str) -> bool:
+        return callback_query_id in self._ids
+
+
+answered_callbacks = AnsweredCallbacks()
+
+
+class CallbackAnswerDedupMiddleware(BaseRequestMiddleware):
+    """
+    Bot session middleware: only the first answerCallbackQuery per query is sent.
+
+    Telegram rejects a second answer, so later ones (the handler's trailing
+    `callback.answer()` after an early ack) are dropped without an API call.
+    A dropped answer with text, alert or url means the user never saw it
+    (the handler lacks the manual flag), so it raises instead.
+    """
+
+    def __init__(self, registry: AnsweredCallbacks = answered_callbacks):
+        self.registry = registry
+        self.dropped = 0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ):
+        if isinstance(method, AnswerCallbackQuery) and not self.registry.claim(method.callback_query_id):
+            self.dropped += 1
+            if method.text or method.show_alert or method.url:
+                raise UnseenCallbackAnswer(
+                    f"callback answer {method.text!r} dropped: the query was already acked; "
+                    'declare flags={"callback_answer": "manual"} on its handler'
+                )
+            return True
+        return await make_request(bot, method)
+
+
+class CallbackAckMiddleware(BaseMiddleware):
+    """
+    Inner callback middleware that acks the query before the handler runs.
+
+    The empty ack is sent concurrently with the handler, so the client
+    spinner stops after one round trip instead of after DB work and media
+    sends. Handlers that answer with their own text or alert declare
+    `flags={"callback_answer": "manual"}`; they are acked only afterwards,
+    and only if they did not answer themselves.
+    """
+
+    def __init__(self, registry: AnsweredCallbacks = answered_callbacks):
+        self.registry = registry
+
+    @staticmethod
+    async def _ack(event: CallbackQuery):
+        try:
+            await event.answer()
+        except Exception:
+            pass
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, CallbackQuery):
+            return await handler(event, data)
+
+        if get_flag(data, "callback_answer") == "manual":
+            try:
+                return await handler(event, data)
+            finally:
+                if event.id not in self.registry:
+                    await self._ack(event)
+
+        ack = asyncio.create_task(self._ack(event))
+        try:
+            return await handler(event, data)
+        finally:
+            await ack
@@ -0,0 +1,54 @@
+"""Prefix dispatch of callback queries."""
+from typing import Any, Awaitable, Callable, Dict, FrozenSet
+
+from aiogram import BaseMiddleware, Router
+from aiogram.filters import Filter
+from aiogram.types import CallbackQuery, TelegramObject
+
+from app.keyboards.callbacks import Route
+
+
+class RouterGate(Filter):
+    """Root filter of a router: passes callbacks whose prefix the router handles."""
+    __slots__ = ("router",)
+
+    def __init__(self, router: Router):
+        self.router = router
+
+    async def __call__(self, callback: CallbackQuery,
+                       callback_routers: FrozenSet[Router] = frozenset()) -> bool:
+        return self.router in callback_routers
+
+
+class CallbackRouteMiddleware(BaseMiddleware):
+    """
+    Outer callback middleware with a prefix -> routers table.
+
+    The table is built once from the `Route` filters of the routers' handlers.
+    Each callback's prefix is split once and looked up in it (a dict hit), and
+    every router gets a root filter that lets the update in only when it has a
+    handler for that prefix. Routers without one are skipped without running
+    a single handler filter.
+    """
+
+    def __init__(self, *routers: Router):
+        table: Dict[str, set] = {}
+        for router in routers:
+            for handler in router.callback_query.handlers:
+                for flt in handler.filters or ():
+                    if isinstance(flt.callback, Route):
+                        table.setdefault(flt.callback.prefix, set()).add(router)
+            router.callback_query.filter(RouterGate(router))
+        self.table: Dict[str, FrozenSet[Router]] = {k: frozenset(v) for k, v in table.items()}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, CallbackQuery):
+            prefix = (event.data or "").partition(":")[0]
+            data["callback_prefix"] = prefix
+            data["callback_routers"] = self.table.get(prefix, frozenset())
+        return await handler(event, data)
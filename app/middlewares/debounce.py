@@ -0,0 +1,60 @@
+"""Duplicate-callback debouncing middleware."""
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, TelegramObject
+
+from app.config import DEBOUNCE_WINDOW
+
+
+class CallbackDebounceMiddleware(BaseMiddleware):
+    """
+    Outer callback middleware that drops identical rapid taps.
+
+    A tap is identical when (user, message_id, callback_data) matches a tap
+    whose handler finished less than `window` seconds ago. Duplicates are
+    answered at once and never reach the handler. A repeat that arrives while
+    the first tap still runs waits on the per-chat lock (see UpdateScheduler)
+    and lands in the window once the first one is done.
+    """
+
+    def __init__(self, window: float = DEBOUNCE_WINDOW):
+        self.window = window
+        self._recent: Dict[Tuple[int, int, str], float] = {}
+        self.dropped = 0
+
+    def _sweep(self, now: float):
+        stale = [k for k, ts in self._recent.items() if now - ts > self.window]
+        for k in stale:
+            del self._recent[k]
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, CallbackQuery) or not event.message or not event.data:
+            return await handler(event, data)
+
+        key = (event.from_user.id, event.message.message_id, event.data)
+        now = time.monotonic()
+        seen = self._recent.get(key)
+        if seen is not None and now - seen <= self.window:
+            self.dropped += 1
+            try:
+                await event.answer()
+            except Exception:
+                pass
+            return None
+
+        if len(self._recent) > 1024:
+            self._sweep(now)
+
+        self._recent[key] = now
+        try:
+            return await handler(event, data)
+        finally:
+            # Window starts when the handler finishes, not when the tap arrived
+            self._recent[key] = time.monotonic()
@@ -0,0 +1,48 @@
+"""Handler latency / error / update-type metrics."""
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from app.utils.metrics import HANDLER_LATENCY, HANDLER_ERRORS, UPDATES_TOTAL
+
+
+class UpdateTypeMiddleware(BaseMiddleware):
+    """Outer update middleware: counts updates by type."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            UPDATES_TOTAL.inc(type=event.event_type)
+        return await handler(event, data)
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware: per-handler latency histogram and error counter."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_obj = data.get("handler")
+        callback = getattr(handler_obj, "callback", None)
+        name = getattr(callback, "__qualname__", None) or "unknown"
+        module = getattr(callback, "__module__", "")
+        if module.startswith("app.handlers."):
+            name = f"{module[len('app.handlers.'):]}.{name}"
+
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            HANDLER_ERRORS.inc(handler=name, error=type(e).__name__)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - start, handler=name)
@@ -0,0 +1,26 @@
+"""Admin flag from the in-memory role registry."""
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.services.role_service import is_admin
+
+
+class RoleMiddleware(BaseMiddleware):
+    """
+    Outer update middleware that injects `is_admin` for the sender.
+
+    A set lookup in the role_service snapshot, no DB access; filters,
+    middlewares and handlers read the flag instead of checking again.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        data["is_admin"] = user is not None and is_admin(user.id)
+        return await handler(event, data)
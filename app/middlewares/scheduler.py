@@ -0,0 +1,86 @@
+"""Update scheduler - concurrent across users, serialized per chat."""
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Dict, Hashable
+
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+
+
+class _KeyQueue:
+    """Lock for one chat plus the number of updates queued on it."""
+    __slots__ = ("lock", "depth")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.depth = 0
+
+
+class UpdateScheduler(BaseEventIsolation):
+    """
+    Event isolation used by the dispatcher FSM middleware.
+
+    Updates of one chat run strictly one after another (per-key lock),
+    updates of different chats run concurrently up to `max_concurrency`.
+    Unused per-key locks are dropped as soon as their queue drains.
+    """
+
+    def __init__(self, max_concurrency: int = 32):
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queues: Dict[Hashable, _KeyQueue] = {}
+        self._active = 0
+        self._waiting = 0
+        self._max_depth = 0
+        self._processed = 0
+
+    @staticmethod
+    def _key(key: StorageKey) -> Hashable:
+        # Destiny is not part of the ordering guarantee: one chat = one queue
+        return (key.bot_id, key.chat_id, key.user_id, key.thread_id)
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        k = self._key(key)
+        queue = self._queues.get(k)
+        if queue is None:
+            queue = self._queues[k] = _KeyQueue()
+
+        queue.depth += 1
+        if queue.depth > self._max_depth:
+            self._max_depth = queue.depth
+        self._waiting += 1
+        waiting = True
+        try:
+            # Per-chat lock first, so a busy chat never holds a global slot while waiting
+            async with queue.lock:
+                async with self._semaphore:
+                    self._waiting -= 1
+                    waiting = False
+                    self._active += 1
+                    try:
+                        yield
+                    finally:
+                        self._active -= 1
+                        self._processed += 1
+        finally:
+            if waiting:
+                self._waiting -= 1
+            queue.depth -= 1
+            if queue.depth == 0:
+                self._queues.pop(k, None)
+
+    def stats(self) -> dict:
+        """Snapshot of scheduler queues for metrics."""
+        depths = [q.depth for q in self._queues.values()]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "waiting": self._waiting,
+            "chats": len(depths),
+            "deepest_queue": max(depths, default=0),
+            "max_depth_seen": self._max_depth,
+            "processed": self._processed,
+        }
+
+    async def close(self) -> None:
+        self._queues.clear()
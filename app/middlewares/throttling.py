@@ -0,0 +1,93 @@
+"""Per-user throttling middleware (token bucket)."""
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, TelegramObject
+
+from app.config import (
+    THROTTLE_MESSAGE_RATE, THROTTLE_MESSAGE_BURST,
+    THROTTLE_CALLBACK_RATE, THROTTLE_CALLBACK_BURST,
+    THROTTLE_CACHE_SIZE,
+)
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `burst`."""
+    __slots__ = ("tokens", "updated", "warned")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens = burst
+        self.updated = now
+        self.warned = False
+
+    def consume(self, rate: float, burst: float, now: float) -> bool:
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.warned = False
+            return True
+        return False
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Outer middleware for messages and callbacks.
+
+    Every user has separate buckets for messages and callback taps. Buckets
+    live in a bounded LRU, so memory stays flat whatever the number of users.
+    Excess callbacks get a silent answer, excess messages one warning per burst.
+    """
+
+    def __init__(self, cache_size: int = THROTTLE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.limits = {
+            "message": (THROTTLE_MESSAGE_RATE, THROTTLE_MESSAGE_BURST),
+            "callback": (THROTTLE_CALLBACK_RATE, THROTTLE_CALLBACK_BURST),
+        }
+        self._buckets: "OrderedDict[Tuple[int, str], TokenBucket]" = OrderedDict()
+        self.throttled = 0
+
+    def _bucket(self, user_id: int, kind: str, now: float) -> TokenBucket:
+        key = (user_id, kind)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.limits[kind][1], now)
+            if len(self._buckets) > self.cache_size:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is None or data.get("is_admin"):
+            return await handler(event, data)
+
+        kind = "callback" if isinstance(event, CallbackQuery) else "message"
+        rate, burst = self.limits[kind]
+        now = time.monotonic()
+        bucket = self._bucket(user.id, kind, now)
+        if bucket.consume(rate, burst, now):
+            return await handler(event, data)
+
+        self.throttled += 1
+        if isinstance(event, CallbackQuery):
+            try:
+                await event.answer()
+            except Exception:
+                pass
+        elif isinstance(event, Message) and not bucket.warned:
+            bucket.warned = True
+            try:
+                await event.answer("⏳ Juda tez! Iltimos, biroz kuting.")
+            except Exception:
+                pass
+        return None
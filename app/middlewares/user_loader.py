@@ -0,0 +1,33 @@
+"""Per-update loading of the sender's user and shop rows."""
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from app.services.user_service import get_user_context
+
+# Handler arguments this middleware provides
+CONTEXT_ARGS = frozenset(("user", "butcher"))
+
+
+class UserLoaderMiddleware(BaseMiddleware):
+    """
+    Inner message/callback middleware that injects `user` and `butcher`.
+
+    Both rows come from one joined query (`butcher` is None when the user
+    has no shop, both are None for unknown users). Inner middlewares run
+    after the handler is picked, so the query only runs when that handler
+    declares a `user` or `butcher` argument; the others pay nothing.
+    """
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        from_user = data.get("event_from_user")
+        if from_user and handler_object and not CONTEXT_ARGS.isdisjoint(handler_object.params):
+            data["user"], data["butcher"] = await get_user_context(from_user.id)
+        return await handler(event, data)
@@ -1,8 +1,8 @@
 """Admin notification service."""
 from datetime import datetime
 from aiogram import Bot
-from app.config import ADMINS
-from app.services.user_service import assign_reg_no, get_user
+from app.services.role_service import is_admin, admin_ids
+from app.services.user_service import assign_reg_no
 
 
 async def notify_new_user(bot: Bot, telegram_id: int):
@@ -11,24 +11,22 @@ async def notify_new_user(bot: Bot, telegram_id: int):
     Only notifies if user gets a NEW reg_no.
     """
     # 1. Skip if admin (optional per requirements, but good practice)
-    if telegram_id in ADMINS:
+    if is_admin(telegram_id):
          # Check if we should assign reg_no anyway? 
          # User said: "Default: DO NOT spam admins about admins."
          # And admin bypasses reg flow usually. 
          # Safest is to just return if admin.
          return
 
-    # 2. Assign reg_no
-    reg_no, is_new = await assign_reg_no(telegram_id)
+    # 2. Assign reg_no (returns the fresh user row)
+    user, is_new = await assign_reg_no(telegram_id)
     
     # 3. If not new (already assigned), do not notify
-    if not is_new:
+    if not is_new or not user:
         return
 
-    # 4. Get latest user data
-    user = await get_user(telegram_id)
-    if not user:
-        return
+    # 4. Latest user data comes with the assignment
+    reg_no = user["reg_no"]
 
     # 5. Prepare message
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -47,7 +45,7 @@ async def notify_new_user(bot: Bot, telegram_id: int):
     )
 
     # 6. Notify all admins
-    for admin_id in ADMINS:
+    for admin_id in admin_ids():
         try:
             await bot.send_message(chat_id=admin_id, text=text, parse_mode="HTML")
         except Exception:
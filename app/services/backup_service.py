@@ -0,0 +1,129 @@
+"""Online hot backups using the SQLite backup API."""
+import asyncio
+import gzip
+import logging
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from app.config import BACKUP_DIR, BACKUP_KEEP, BACKUP_INTERVAL, BACKUP_PAGES_PER_STEP
+from app.db import session
+
+logger = logging.getLogger(__name__)
+
+_lock = asyncio.Lock()
+
+
+def _copy_online(src_path: Path, dst_path: Path, pages: int) -> int:
+    """
+    Copy the live database page by page.
+    Between steps the source lock is released, so writers wait at most one step.
+    Returns the number of pages copied.
+    """
+    src = sqlite3.connect(f"file:{src_path}?mode=ro", uri=True)
+    dst = sqlite3.connect(str(dst_path))
+    copied = 0
+
+    def progress(status, remaining, total):
+        nonlocal copied
+        copied = total
+
+    try:
+        src.backup(dst, pages=pages, progress=progress, sleep=0.005)
+        # Self-contained file: no -wal sidecar in the snapshot
+        dst.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        dst.close()
+        src.close()
+    return copied
+
+
+def _verify(path: Path) -> str:
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _compress(path: Path) -> Path:
+    gz_path = path.with_suffix(path.suffix + ".gz")
+    with open(path, "rb") as src, gzip.open(gz_path, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    path.unlink()
+    return gz_path
+
+
+def _rotate(backup_dir: Path, keep: int) -> int:
+    snapshots = sorted(backup_dir.glob("bot-*.db.gz"))
+    removed = 0
+    for old in snapshots[:-keep] if keep > 0 else []:
+        old.unlink()
+        removed += 1
+    return removed
+
+
+def _backup_sync(src_path: Path, backup_dir: Path, keep: int, pages: int) -> dict:
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    tmp_path = backup_dir / f"bot-{stamp}.db"
+
+    start = time.perf_counter()
+    page_count = _copy_online(src_path, tmp_path, pages)
+    copy_seconds = time.perf_counter() - start
+
+    integrity = _verify(tmp_path)
+    if integrity != "ok":
+        tmp_path.rename(tmp_path.with_suffix(".db.corrupt"))
+        raise RuntimeError(f"Backup integrity check failed: {integrity}")
+
+    gz_path = _compress(tmp_path)
+    removed = _rotate(backup_dir, keep)
+    return {
+        "path": str(gz_path),
+        "pages": page_count,
+        "size": gz_path.stat().st_size,
+        "copy_seconds": copy_seconds,
+        "total_seconds": time.perf_counter() - start,
+        "rotated": removed,
+    }
+
+
+async def create_backup() -> dict:
+    """
+    Snapshot the database into BACKUP_DIR (gzip), verify it, rotate old ones.
+    Runs in a worker thread so the event loop (user traffic) is never blocked.
+    """
+    async with _lock:
+        result = await asyncio.to_thread(
+            _backup_sync, session.DB_PATH, BACKUP_DIR, BACKUP_KEEP, BACKUP_PAGES_PER_STEP
+        )
+    logger.info(
+        "Backup %s: %d pages, %.1f KB, copy %.2fs, total %.2fs",
+        result["path"], result["pages"], result["size"] / 1024,
+        result["copy_seconds"], result["total_seconds"]
+    )
+    return result
+
+
+def list_backups() -> list:
+    """Existing snapshots, newest first."""
+    if not BACKUP_DIR.exists():
+        return []
+    return sorted(BACKUP_DIR.glob("bot-*.db.gz"), reverse=True)
+
+
+async def backup_loop(interval: Optional[int] = None):
+    """Create a backup every BACKUP_INTERVAL seconds until cancelled."""
+    interval = interval or BACKUP_INTERVAL
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await create_backup()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Scheduled backup failed")
@@ -1,6 +1,7 @@
 """Broadcast service with media support."""
 import asyncio
 from aiogram import Bot
+from app.config import THROTTLE_BATCH, THROTTLE_SLEEP
 from app.db.session import get_db
 from app.services.user_service import get_all_users_by_role
 
@@ -45,7 +46,7 @@ async def send_broadcast(
     # 2. Log to DB
     await log_broadcast(role_target, message, media_type, media_file_id)
     
-    # 3. Send messages with throttling: 25 msg then 1 sec pause
+    # 3. Send messages with throttling: THROTTLE_BATCH msg then THROTTLE_SLEEP sec pause
     stats = {"total": len(users), "success": 0, "failed": 0}
     batch_count = 0
     
@@ -79,9 +80,9 @@ async def send_broadcast(
         
         batch_count += 1
         
-        # Throttling: 25 messages then 1 second pause
-        if batch_count >= 25:
-            await asyncio.sleep(1)
+        # Throttling: THROTTLE_BATCH messages then THROTTLE_SLEEP second pause
+        if batch_count >= THROTTLE_BATCH:
+            await asyncio.sleep(THROTTLE_SLEEP)
             batch_count = 0
         
     return stats
@@ -1,6 +1,34 @@
-from typing import Optional, List, Dict
+import json
+import re
+from typing import Optional, List, Dict, Tuple
+from app.config import PAGE_SIZE, SEARCH_LIMIT
 from app.db.session import get_db
 from app.services.geo_service import haversine, bounding_box
+from app.services.stats_service import get_counters, get_statistics
+from app.utils.textnorm import search_key, substring_query, fuzzy_query, best_fuzzy
+
+# Row shape of get_butcher_detail, for UPDATE/DELETE ... RETURNING on butchers
+_RETURNING_DETAIL = """
+RETURNING *,
+    (SELECT name_uz FROM regions WHERE id = butchers.region_id) AS region_name,
+    (SELECT name_uz FROM districts WHERE id = butchers.district_id) AS district_name,
+    (SELECT telegram_id FROM users WHERE id = butchers.user_id) AS telegram_id
+"""
+
+# Admin list filters
+STATUS_FILTERS = {
+    "all": "1",
+    "pending": "b.is_approved = 0 AND b.is_blocked = 0",
+    "approved": "b.is_approved = 1 AND b.is_blocked = 0",
+    "blocked": "b.is_blocked = 1",
+}
+
+
+def _shops_changed():
+    """A shop's card changed or went away: drop cached inline results."""
+    # Imported here: inline_service builds on this module
+    from app.services.inline_service import invalidate
+    invalidate()
 
 
 async def create_butcher(user_id: int, data: dict) -> int:
@@ -12,8 +40,8 @@ async def create_butcher(user_id: int, data: dict) -> int:
             user_id, shop_name, owner_name, phone,
             region_id, district_id, lat, lon,
             address_text, work_time, image_file_id,
-            extra_info, video_file_id
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            extra_info, video_file_id, search_key
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             user_id,
             data.get("shop_name"),
@@ -27,7 +55,8 @@ async def create_butcher(user_id: int, data: dict) -> int:
             data.get("work_time"),
             data.get("image_file_id"),
             data.get("extra_info"),
-            data.get("video_file_id")
+            data.get("video_file_id"),
+            search_key(data.get("shop_name"))
         ))
         await db.commit()
         return cursor.lastrowid
@@ -35,20 +64,26 @@ async def create_butcher(user_id: int, data: dict) -> int:
         await db.close()
 
 
-async def update_butcher(butcher_id: int, **kwargs):
-    """Update butcher fields."""
+async def update_butcher(butcher_id: int, **kwargs) -> Optional[dict]:
+    """Update butcher fields. Returns the fresh detail row (None if not found)."""
     if not kwargs:
-        return
-    
+        return await get_butcher_detail(butcher_id)
+    if "shop_name" in kwargs:
+        kwargs["search_key"] = search_key(kwargs["shop_name"])
+
     db = await get_db()
     try:
         set_clause = ", ".join(f"{k} = ?" for k in kwargs.keys())
         values = list(kwargs.values()) + [butcher_id]
-        await db.execute(
-            f"UPDATE butchers SET {set_clause} WHERE id = ?",
+        cursor = await db.execute(
+            f"UPDATE butchers SET {set_clause} WHERE id = ? {_RETURNING_DETAIL}",
             values
         )
+        row = await cursor.fetchone()
         await db.commit()
+        if row:
+            _shops_changed()
+        return dict(row) if row else None
     finally:
         await db.close()
 
@@ -70,14 +105,15 @@ async def get_butcher_by_user(user_id: int) -> Optional[dict]:
 
 
 async def get_butcher_detail(butcher_id: int) -> Optional[dict]:
-    """Get full butcher info."""
+    """Get full butcher info, including the owner's telegram_id."""
     db = await get_db()
     try:
         cursor = await db.execute("""
-        SELECT b.*, r.name_uz as region_name, d.name_uz as district_name
+        SELECT b.*, r.name_uz as region_name, d.name_uz as district_name, u.telegram_id
         FROM butchers b
         LEFT JOIN regions r ON b.region_id = r.id
         LEFT JOIN districts d ON b.district_id = d.id
+        LEFT JOIN users u ON b.user_id = u.id
         WHERE b.id = ?
         """, (butcher_id,))
         row = await cursor.fetchone()
@@ -88,6 +124,30 @@ async def get_butcher_detail(butcher_id: int) -> Optional[dict]:
         await db.close()
 
 
+async def get_butcher_card(butcher_id: int) -> Optional[dict]:
+    """get_butcher_detail plus `sell_prices` ({category: price}) for the shop card, in one statement."""
+    db = await get_db()
+    try:
+        cursor = await db.execute("""
+        SELECT b.*, r.name_uz as region_name, d.name_uz as district_name, u.telegram_id,
+               (SELECT json_group_object(category, price) FROM prices
+                WHERE butcher_id = b.id AND price_type = 'SELL') AS sell_prices
+        FROM butchers b
+        LEFT JOIN regions r ON b.region_id = r.id
+        LEFT JOIN districts d ON b.district_id = d.id
+        LEFT JOIN users u ON b.user_id = u.id
+        WHERE b.id = ?
+        """, (butcher_id,))
+        row = await cursor.fetchone()
+    finally:
+        await db.close()
+    if not row:
+        return None
+    butcher = dict(row)
+    butcher["sell_prices"] = json.loads(butcher["sell_prices"])
+    return butcher
+
+
 async def find_by_district(district_id: int) -> list:
     """Find approved butchers in a district."""
     db = await get_db()
@@ -95,7 +155,7 @@ async def find_by_district(district_id: int) -> list:
         cursor = await db.execute("""
         SELECT * FROM butchers
         WHERE district_id = ? AND is_approved = 1 AND is_blocked = 0
-        ORDER BY shop_name
+        ORDER BY search_key
         """, (district_id,))
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
@@ -117,10 +177,58 @@ async def find_all_approved() -> list:
         await db.close()
 
 
+def _fts_query(text: str) -> str:
+    """User text -> FTS5 query: every word must match, as a prefix ("ali qas" finds "Ali Qassob")."""
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+
+async def _match_live(db, index: str, query: str, limit: int, step: str) -> list:
+    """
+    Approved, unblocked shops matching an FTS5 query on `index`, best rank first.
+    `step` names the search step in query metrics.
+    CROSS JOIN pins the FTS lookup as the outer loop; the planner would otherwise
+    walk the live-butchers index and run MATCH once per shop.
+    """
+    cursor = await db.execute(f"""
+    SELECT b.* FROM {index}
+    CROSS JOIN butchers b ON b.id = {index}.rowid
+    WHERE {index} MATCH ? AND b.is_approved = 1 AND b.is_blocked = 0
+    ORDER BY rank
+    LIMIT ?
+    """, (query, limit), name=f"butcher_service.search_butchers.{step}")
+    return [dict(row) for row in await cursor.fetchall()]
+
+
+async def search_butchers(text: str, limit: int = SEARCH_LIMIT) -> list:
+    """
+    Approved, unblocked shops for a client's query; the first step with hits wins:
+    1. shop name contains every word, apostrophe/case/script-folded (trigram index)
+    2. word prefixes in name, address or extra info (bm25 weighted towards shop_name)
+    3. fuzzy: shop names sharing most of the query's trigrams (typos)
+    """
+    key = search_key(text)
+    db = await get_db()
+    try:
+        if substring_query(key):
+            rows = await _match_live(db, "butchers_trgm", substring_query(key), limit, "substring")
+            if rows:
+                return rows
+        if _fts_query(text):
+            rows = await _match_live(db, "butchers_fts", _fts_query(text), limit, "prefix")
+            if rows:
+                return rows
+        if not fuzzy_query(key):
+            return []
+        rows = await _match_live(db, "butchers_trgm", fuzzy_query(key), limit, "fuzzy")
+    finally:
+        await db.close()
+    return best_fuzzy(key, rows)
+
+
 async def find_nearby_by_radius(lat: float, lon: float, radius_km: int) -> list:
     """
     Find butchers within radius using V8 optimized approach:
-    1. SQL bounding-box filter first (uses idx_butchers_location index)
+    1. SQL bounding-box filter first (uses the partial idx_butchers_live_location index)
     2. Haversine only on filtered results (CPU efficient)
     """
     # Get bounding box for SQL pre-filter
@@ -173,127 +281,105 @@ async def get_pending_butchers() -> list:
         await db.close()
 
 
-async def approve_butcher(butcher_id: int):
-    """Approve butcher."""
-    await update_butcher(butcher_id, is_approved=1)
+async def approve_butcher(butcher_id: int) -> Optional[dict]:
+    """Approve butcher. Returns the fresh detail row."""
+    return await update_butcher(butcher_id, is_approved=1)
 
 
-async def block_butcher(butcher_id: int):
-    """Block butcher."""
-    await update_butcher(butcher_id, is_blocked=1)
+async def block_butcher(butcher_id: int) -> Optional[dict]:
+    """Block butcher. Returns the fresh detail row."""
+    return await update_butcher(butcher_id, is_blocked=1)
 
 
-async def unblock_butcher(butcher_id: int):
-    """Unblock butcher."""
-    await update_butcher(butcher_id, is_blocked=0)
+async def unblock_butcher(butcher_id: int) -> Optional[dict]:
+    """Unblock butcher. Returns the fresh detail row."""
+    return await update_butcher(butcher_id, is_blocked=0)
 
 
-async def toggle_closed(butcher_id: int) -> bool:
-    """Toggle is_closed status. Returns new status."""
+async def toggle_closed(butcher_id: int) -> Optional[dict]:
+    """Toggle is_closed status. Returns the fresh detail row (None if not found)."""
     db = await get_db()
     try:
-        cursor = await db.execute(
-            "SELECT is_closed FROM butchers WHERE id = ?", (butcher_id,)
-        )
+        cursor = await db.execute(f"""
+        UPDATE butchers SET is_closed = CASE WHEN is_closed THEN 0 ELSE 1 END
+        WHERE id = ? {_RETURNING_DETAIL}
+        """, (butcher_id,))
         row = await cursor.fetchone()
+        await db.commit()
         if row:
-            new_status = 0 if row[0] else 1
-            await db.execute(
-                "UPDATE butchers SET is_closed = ? WHERE id = ?",
-                (new_status, butcher_id)
-            )
-            await db.commit()
-            return bool(new_status)
-        return False
+            _shops_changed()
+        return dict(row) if row else None
     finally:
         await db.close()
 
 
-async def delete_butcher(butcher_id: int):
-    """Delete butcher and reset user role to pending."""
+async def delete_butcher(butcher_id: int) -> Optional[dict]:
+    """
+    Delete butcher. Returns the deleted row.
+    Prices go with it (ON DELETE CASCADE); a trigger resets the user role to pending.
+    """
     db = await get_db()
     try:
-        # 1. Get user_id before deleting
         cursor = await db.execute(
-            "SELECT user_id FROM butchers WHERE id = ?", 
+            "DELETE FROM butchers WHERE id = ? RETURNING *",
             (butcher_id,)
         )
         row = await cursor.fetchone()
-        
-        if not row:
-            return  # Butcher not found
-        
-        user_id = row[0]
-        
-        # 2. Delete prices
-        await db.execute("DELETE FROM prices WHERE butcher_id = ?", (butcher_id,))
-        
-        # 3. Delete butcher
-        await db.execute("DELETE FROM butchers WHERE id = ?", (butcher_id,))
-        
-        # 4. Reset user role to 'pending' so they can re-register
-        await db.execute(
-            "UPDATE users SET role = 'pending' WHERE id = ?", 
-            (user_id,)
-        )
-        
         await db.commit()
+        if row:
+            _shops_changed()
+        return dict(row) if row else None
     finally:
         await db.close()
 
 
 async def get_butcher_counts() -> dict:
-    """Get butcher statistics."""
-    db = await get_db()
-    try:
-        counts = {"total": 0, "approved": 0, "pending": 0, "blocked": 0}
-        
-        cursor = await db.execute("SELECT COUNT(*) FROM butchers")
-        counts["total"] = (await cursor.fetchone())[0]
-        
-        cursor = await db.execute("SELECT COUNT(*) FROM butchers WHERE is_approved = 1 AND is_blocked = 0")
-        counts["approved"] = (await cursor.fetchone())[0]
-        
-        cursor = await db.execute("SELECT COUNT(*) FROM butchers WHERE is_approved = 0 AND is_blocked = 0")
-        counts["pending"] = (await cursor.fetchone())[0]
-        
-        cursor = await db.execute("SELECT COUNT(*) FROM butchers WHERE is_blocked = 1")
-        counts["blocked"] = (await cursor.fetchone())[0]
-        
-        return counts
-    finally:
-        await db.close()
+    """Get butcher statistics (from trigger-maintained counters)."""
+    return (await get_statistics())["butchers"]
+
+
+async def count_butchers(status: str = "all", region_id: Optional[int] = None) -> int:
+    """Number of butchers matching an admin list filter (one counter read)."""
+    name = f"butchers:{status}" + (f":r{region_id}" if region_id else "")
+    return (await get_counters(name))[name]
 
 
-async def get_all_butchers_paginated(page: int = 0, page_size: int = 8) -> dict:
-    """Get all butchers with pagination."""
+async def list_butchers_page(status: str = "all", region_id: Optional[int] = None,
+                             cursor: Optional[Tuple[int, int]] = None, direction: str = "next",
+                             page_size: int = PAGE_SIZE) -> dict:
+    """
+    Keyset page of the admin butcher list, newest first.
+    `cursor` is (created_at, id) of the last row shown ("next") or the first one ("prev");
+    every page is an index range read, however deep.
+    Returns {"items", "has_prev", "has_next"}.
+    """
+    where = [STATUS_FILTERS[status]]
+    params = []
+    if region_id:
+        where.append("b.region_id = ?")
+        params.append(region_id)
+    backward = direction == "prev"
+    if cursor:
+        where.append(f"(b.created_at, b.id) {'>' if backward else '<'} (?, ?)")
+        params.extend(cursor)
+    order = "ASC" if backward else "DESC"
+
     db = await get_db()
     try:
-        offset = page * page_size
-        
-        # Get total count
-        cursor = await db.execute("SELECT COUNT(*) FROM butchers")
-        total_count = (await cursor.fetchone())[0]
-        
-        # Get items
-        cursor = await db.execute("""
-            SELECT b.*, r.name_uz as region_name, d.name_uz as district_name
-            FROM butchers b
-            LEFT JOIN regions r ON b.region_id = r.id
-            LEFT JOIN districts d ON b.district_id = d.id
-            ORDER BY b.created_at DESC
-            LIMIT ? OFFSET ?
-        """, (page_size, offset))
-        
-        rows = await cursor.fetchall()
-        items = [dict(row) for row in rows]
-        
-        return {
-            "items": items,
-            "total": total_count,
-            "page": page,
-            "page_size": page_size,
-            "total_pages": (total_count + page_size - 1) // page_size
-        }
+        cur = await db.execute(f"""
+        SELECT b.id, b.shop_name, b.is_approved, b.is_blocked, b.created_at
+        FROM butchers b
+        WHERE {' AND '.join(where)}
+        ORDER BY b.created_at {order}, b.id {order}
+        LIMIT ?
+        """, params + [page_size + 1])
+        rows = [dict(row) for row in await cur.fetchall()]
     finally:
         await db.close()
+
+    more = len(rows) > page_size
+    items = rows[:page_size]
+    if backward:
+        items.reverse()
+        return {"items": items, "has_prev": more, "has_next": True}
+    return {"items": items, "has_prev": cursor is not None, "has_next": more}
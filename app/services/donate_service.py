@@ -20,7 +20,7 @@ async def set_donate_card_number(card_number: str):
     db = await get_db()
     try:
         await db.execute(
-            "UPDATE bot_settings SET donate_card_number = ?, updated_at = datetime('now')",
+            "UPDATE bot_settings SET donate_card_number = ?, updated_at = CAST(strftime('%s', 'now') AS INTEGER)",
             (card_number,)
         )
         await db.commit()
@@ -54,7 +54,7 @@ async def set_donate_default_amount(amount: int):
     db = await get_db()
     try:
         await db.execute(
-            "UPDATE bot_settings SET donate_default_amount = ?, updated_at = datetime('now')",
+            "UPDATE bot_settings SET donate_default_amount = ?, updated_at = CAST(strftime('%s', 'now') AS INTEGER)",
             (amount,)
         )
         await db.commit()
@@ -73,7 +73,7 @@ async def set_support_profile(text: str):
     db = await get_db()
     try:
         await db.execute(
-            "UPDATE bot_settings SET support_profile = ?, updated_at = datetime('now')",
+            "UPDATE bot_settings SET support_profile = ?, updated_at = CAST(strftime('%s', 'now') AS INTEGER)",
             (text,)
         )
         await db.commit()
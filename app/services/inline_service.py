@@ -0,0 +1,86 @@
+"""Inline-mode search results with a short-lived cache keyed by the folded query."""
+import time
+from collections import OrderedDict
+from typing import List, Tuple
+
+from app.config import INLINE_MAX_RESULTS, INLINE_RESULT_TTL, INLINE_RESULT_CACHE_SIZE
+from app.db.session import get_db
+from app.services.butcher_service import search_butchers
+from app.services.region_service import search_districts
+from app.utils.textnorm import search_key
+
+# search_key -> (expires at, cards); LRU-bounded
+_cache: "OrderedDict[str, Tuple[float, List[dict]]]" = OrderedDict()
+
+
+
+def invalidate():
+    """Drop all cached results; called when a shop is edited, blocked, closed or deleted."""
+    _cache.clear()
+
+
+# Districts whose shops are appended after the name matches
+_DISTRICTS_PER_QUERY = 2
+
+
+async def _cards(name_ids: list, district_ids: list) -> list:
+    """
+    Shop cards in result order: name matches, then live shops of the matched
+    districts. Each card carries district/region names and the cheapest SELL price.
+    """
+    db = await get_db()
+    try:
+        ordered = list(name_ids)
+        if district_ids:
+            marks = ",".join("?" * len(district_ids))
+            cursor = await db.execute(f"""
+            SELECT id FROM butchers
+            WHERE district_id IN ({marks}) AND is_approved = 1 AND is_blocked = 0
+            ORDER BY search_key
+            """, district_ids)
+            ordered += [row[0] for row in await cursor.fetchall()]
+        ordered = list(dict.fromkeys(ordered))[:INLINE_MAX_RESULTS]
+        if not ordered:
+            return []
+
+        marks = ",".join("?" * len(ordered))
+        cursor = await db.execute(f"""
+        SELECT b.id, b.shop_name, b.phone, b.work_time, b.image_file_id, b.is_closed,
+               d.name_uz AS district_name, r.name_uz AS region_name,
+               p.category, p.price
+        FROM butchers b
+        LEFT JOIN districts d ON d.id = b.district_id
+        LEFT JOIN regions r ON r.id = b.region_id
+        LEFT JOIN (
+            SELECT butcher_id, category, MIN(price) AS price FROM prices
+            WHERE price_type = 'SELL' AND butcher_id IN ({marks})
+            GROUP BY butcher_id
+        ) p ON p.butcher_id = b.id
+        WHERE b.id IN ({marks})
+        """, ordered + ordered)
+        by_id = {row["id"]: dict(row) for row in await cursor.fetchall()}
+    finally:
+        await db.close()
+    return [by_id[i] for i in ordered if i in by_id]
+
+
+async def inline_search(text: str) -> list:
+    """Cards for an inline query by shop name or district; repeated queries come from the cache."""
+    key = search_key(text)
+    if not key:
+        return []
+    now = time.monotonic()
+    cached = _cache.get(key)
+    if cached and cached[0] > now:
+        _cache.move_to_end(key)
+        return cached[1]
+
+    shops = await search_butchers(text, INLINE_MAX_RESULTS)
+    districts = await search_districts(text, _DISTRICTS_PER_QUERY)
+    cards = await _cards([b["id"] for b in shops], [d["id"] for d in districts])
+
+    _cache[key] = (now + INLINE_RESULT_TTL, cards)
+    _cache.move_to_end(key)
+    if len(_cache) > INLINE_RESULT_CACHE_SIZE:
+        _cache.popitem(last=False)
+    return cards
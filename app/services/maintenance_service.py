@@ -0,0 +1,97 @@
+"""Background database maintenance: WAL checkpoint, ANALYZE/optimize, incremental vacuum."""
+import asyncio
+import logging
+import time
+
+from app.config import (
+    MAINTENANCE_INTERVAL, MAINTENANCE_WAL_MAX_MB,
+    MAINTENANCE_OPTIMIZE_INTERVAL, MAINTENANCE_FREELIST_PAGES,
+)
+from app.db import session
+from app.db.session import get_db
+from app.services.stats_service import flush_events
+
+logger = logging.getLogger(__name__)
+
+_last_optimize = 0.0
+
+
+def wal_size_bytes() -> int:
+    """Current size of the -wal file (0 if absent)."""
+    wal = session.DB_PATH.with_name(session.DB_PATH.name + "-wal")
+    try:
+        return wal.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+async def run_maintenance(force: bool = False) -> dict:
+    """
+    Run whatever maintenance is due. Returns {step: seconds} for steps that ran.
+    `force` runs every step regardless of thresholds.
+    """
+    global _last_optimize
+    timings = {}
+    db = await get_db()
+    try:
+        # 1. Checkpoint and truncate the WAL once it grows past the threshold
+        if force or wal_size_bytes() > MAINTENANCE_WAL_MAX_MB * 1024 * 1024:
+            start = time.perf_counter()
+            await db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            timings["wal_checkpoint"] = time.perf_counter() - start
+
+        # 2. Planner statistics: full ANALYZE if never collected, otherwise PRAGMA optimize
+        now = time.monotonic()
+        if force or not _last_optimize or now - _last_optimize >= MAINTENANCE_OPTIMIZE_INTERVAL:
+            start = time.perf_counter()
+            cursor = await db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            )
+            if await cursor.fetchone() is None:
+                await db.execute("ANALYZE")
+                timings["analyze"] = time.perf_counter() - start
+            else:
+                await db.execute("PRAGMA optimize")
+                timings["optimize"] = time.perf_counter() - start
+            await db.commit()
+            _last_optimize = now
+
+        # 3. Give pages freed by mass deletes back to the filesystem
+        # (a no-op until auto_vacuum is INCREMENTAL, see check_db.py --vacuum)
+        cursor = await db.execute("PRAGMA auto_vacuum")
+        incremental = (await cursor.fetchone())[0] == 2
+        cursor = await db.execute("PRAGMA freelist_count")
+        free_pages = (await cursor.fetchone())[0]
+        if incremental and free_pages and (force or free_pages >= MAINTENANCE_FREELIST_PAGES):
+            start = time.perf_counter()
+            # The pragma frees one page per step and execute() steps it once;
+            # executescript() runs it to completion
+            await db.executescript("PRAGMA incremental_vacuum;")
+            timings["incremental_vacuum"] = time.perf_counter() - start
+            cursor = await db.execute("PRAGMA freelist_count")
+            left = (await cursor.fetchone())[0]
+            logger.info("DB maintenance: incremental_vacuum freed %d of %d pages", free_pages - left, free_pages)
+    finally:
+        await db.close()
+
+    for step, seconds in timings.items():
+        logger.info("DB maintenance: %s took %.1f ms", step, seconds * 1000)
+    return timings
+
+
+async def maintenance_loop():
+    """Run maintenance every MAINTENANCE_INTERVAL seconds until cancelled."""
+    while True:
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
+        try:
+            await flush_events()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Flushing activity stats failed")
+        try:
+            await run_maintenance()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("DB maintenance failed")
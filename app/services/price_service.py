@@ -12,7 +12,7 @@ async def upsert_price(butcher_id: int, price_type: str, category: str, price: i
     try:
         await db.execute("""
         INSERT INTO prices (butcher_id, price_type, category, price, updated_at)
-        VALUES (?, ?, ?, ?, datetime('now'))
+        VALUES (?, ?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER))
         ON CONFLICT(butcher_id, price_type, category) DO UPDATE SET
             price = excluded.price,
             updated_at = excluded.updated_at
@@ -1,12 +1,13 @@
 from typing import Optional
 from app.db.session import get_db
+from app.utils.textnorm import search_key, substring_query, fuzzy_query, best_fuzzy
 
 
 async def list_regions() -> list:
     """Get all regions."""
     db = await get_db()
     try:
-        cursor = await db.execute("SELECT * FROM regions ORDER BY name_uz")
+        cursor = await db.execute("SELECT * FROM regions ORDER BY search_key")
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
     finally:
@@ -18,7 +19,7 @@ async def list_districts(region_id: int) -> list:
     db = await get_db()
     try:
         cursor = await db.execute(
-            "SELECT * FROM districts WHERE region_id = ? ORDER BY name_uz",
+            "SELECT * FROM districts WHERE region_id = ? ORDER BY search_key",
             (region_id,)
         )
         rows = await cursor.fetchall()
@@ -57,3 +58,35 @@ async def get_district(district_id: int) -> Optional[dict]:
         return None
     finally:
         await db.close()
+
+
+async def _match_districts(db, query: str, limit: int, step: str) -> list:
+    """Districts (with region_name) matching a trigram FTS5 query, best rank first; `step` names it in metrics."""
+    cursor = await db.execute("""
+    SELECT d.*, r.name_uz AS region_name FROM districts_trgm
+    CROSS JOIN districts d ON d.id = districts_trgm.rowid
+    LEFT JOIN regions r ON r.id = d.region_id
+    WHERE districts_trgm MATCH ?
+    ORDER BY rank
+    LIMIT ?
+    """, (query, limit), name=f"region_service.search_districts.{step}")
+    return [dict(row) for row in await cursor.fetchall()]
+
+
+async def search_districts(text: str, limit: int = 10) -> list:
+    """
+    Districts whose name contains the typed words (apostrophe/case/script-folded),
+    else the closest fuzzy matches.
+    """
+    key = search_key(text)
+    if not fuzzy_query(key):
+        return []
+    db = await get_db()
+    try:
+        rows = await _match_districts(db, substring_query(key), limit, "substring")
+        if rows:
+            return rows
+        rows = await _match_districts(db, fuzzy_query(key), limit, "fuzzy")
+    finally:
+        await db.close()
+    return best_fuzzy(key, rows)
@@ -0,0 +1,53 @@
+"""Admin registry: users with role 'admin', kept in memory as a frozenset snapshot."""
+from typing import FrozenSet, Optional
+
+from app.config import ADMINS
+from app.db.session import get_db
+
+# Replaced (never mutated) on every change, so readers need no locking
+_admins: FrozenSet[int] = frozenset()
+
+
+def is_admin(telegram_id: int) -> bool:
+    """O(1) admin check against the current snapshot."""
+    return telegram_id in _admins
+
+
+def admin_ids() -> FrozenSet[int]:
+    """Telegram IDs of all admins."""
+    return _admins
+
+
+def observe(user: Optional[dict]) -> Optional[dict]:
+    """Bring the snapshot in line with a freshly written users row; returns the row."""
+    global _admins
+    if user:
+        telegram_id = user["telegram_id"]
+        admin = user.get("role") == "admin"
+        if admin != (telegram_id in _admins):
+            _admins = _admins | {telegram_id} if admin else _admins - {telegram_id}
+    return user
+
+
+def forget(telegram_id: int):
+    """Drop a deleted user from the snapshot."""
+    global _admins
+    if telegram_id in _admins:
+        _admins = _admins - {telegram_id}
+
+
+async def load_admins() -> FrozenSet[int]:
+    """Promote the config (env) admins in the DB, then load every admin into the snapshot."""
+    global _admins
+    db = await get_db()
+    try:
+        await db.executemany("""
+        INSERT INTO users (telegram_id, role) VALUES (?, 'admin')
+        ON CONFLICT(telegram_id) DO UPDATE SET role = 'admin' WHERE users.role IS NOT 'admin'
+        """, [(telegram_id,) for telegram_id in ADMINS])
+        await db.commit()
+        cursor = await db.execute("SELECT telegram_id FROM users WHERE role = 'admin'")
+        _admins = frozenset(row[0] for row in await cursor.fetchall())
+        return _admins
+    finally:
+        await db.close()
@@ -0,0 +1,110 @@
+"""Statistics: trigger-maintained counters and daily activity rollups."""
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from app.db.session import get_db
+from app.utils.timefmt import local_day
+
+USER_ROLES = ("client", "butcher", "admin", "pending")
+BUTCHER_STATES = ("all", "approved", "pending", "blocked")
+
+# Events without a table row (e.g. searches) are buffered here and written
+# to daily_stats in one batch by flush_events(); (day, metric) -> count
+_pending_events: Dict[Tuple[int, str], int] = defaultdict(int)
+
+
+async def get_counters(*names: str) -> dict:
+    """Values of the given counters in one primary-key read (missing ones are 0)."""
+    db = await get_db()
+    try:
+        marks = ", ".join("?" * len(names))
+        cursor = await db.execute(
+            f"SELECT name, value FROM counters WHERE name IN ({marks})", names
+        )
+        values = {row[0]: row[1] for row in await cursor.fetchall()}
+        return {name: values.get(name, 0) for name in names}
+    finally:
+        await db.close()
+
+
+async def get_statistics() -> dict:
+    """User and butcher totals for the admin Statistika screen."""
+    counters = await get_counters(
+        "users:all", *(f"users:role:{r}" for r in USER_ROLES),
+        *(f"butchers:{s}" for s in BUTCHER_STATES)
+    )
+    users = {"total": counters["users:all"]}
+    users.update({r: counters[f"users:role:{r}"] for r in USER_ROLES})
+    butchers = {s: counters[f"butchers:{s}"] for s in BUTCHER_STATES}
+    butchers["total"] = butchers.pop("all")
+    return {"users": users, "butchers": butchers}
+
+
+def track_event(metric: str, amount: int = 1):
+    """Count an application event in today's rollup (no DB write here)."""
+    _pending_events[(local_day(), metric)] += amount
+
+
+async def flush_events():
+    """Write buffered events to daily_stats."""
+    if not _pending_events:
+        return
+    batch = [(day, metric, value) for (day, metric), value in _pending_events.items()]
+    _pending_events.clear()
+    db = await get_db()
+    try:
+        await db.executemany("""
+        INSERT INTO daily_stats (day, metric, value) VALUES (?, ?, ?)
+        ON CONFLICT(day, metric) DO UPDATE SET value = value + excluded.value
+        """, batch)
+        await db.commit()
+    except Exception:
+        # Keep the counts for the next flush
+        for day, metric, value in batch:
+            _pending_events[(day, metric)] += value
+        raise
+    finally:
+        await db.close()
+
+
+async def get_activity(periods: Tuple[int, ...] = (1, 7, 30)) -> Dict[int, Dict[str, int]]:
+    """
+    Activity totals for the last N days (today included), per period:
+    {7: {"users_new": 12, "searches": 340, ...}, ...}. One range read of daily_stats.
+    """
+    today = local_day()
+    longest = max(periods)
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT day, metric, value FROM daily_stats WHERE day > ?",
+            (today - longest,)
+        )
+        rows = [tuple(row) for row in await cursor.fetchall()]
+    finally:
+        await db.close()
+    rows.extend((day, metric, value) for (day, metric), value in _pending_events.items())
+
+    result = {n: defaultdict(int) for n in periods}
+    for day, metric, value in rows:
+        for n in periods:
+            if day > today - n:
+                result[n][metric] += value
+    return {n: dict(totals) for n, totals in result.items()}
+
+
+async def get_event_total(metric: str, days: int = 30) -> int:
+    """Total of one daily metric over the last `days` days (today included)."""
+    today = local_day()
+    db = await get_db()
+    try:
+        cursor = await db.execute(
+            "SELECT COALESCE(SUM(value), 0) FROM daily_stats WHERE day > ? AND metric = ?",
+            (today - days, metric)
+        )
+        total = (await cursor.fetchone())[0]
+    finally:
+        await db.close()
+    return total + sum(
+        value for (day, name), value in _pending_events.items() if name == metric and day > today - days
+    )
@@ -1,13 +1,16 @@
 from typing import Optional, Union, Tuple
 from app.db.session import get_db
+from app.services.stats_service import get_counters, get_statistics
+from app.services.role_service import observe, forget
+from app.services.inline_service import invalidate as invalidate_inline
 
 
 async def upsert_user(telegram_id: int, name: Optional[str] = None, phone: Optional[str] = None,
-                      lat: Optional[float] = None, lon: Optional[float] = None):
-    """Insert or update user in database."""
+                      lat: Optional[float] = None, lon: Optional[float] = None) -> dict:
+    """Insert or update user in database. Returns the fresh row."""
     db = await get_db()
     try:
-        await db.execute("""
+        cursor = await db.execute("""
         INSERT INTO users (telegram_id, name, phone, lat, lon)
         VALUES (?, ?, ?, ?, ?)
         ON CONFLICT(telegram_id) DO UPDATE SET
@@ -15,8 +18,32 @@ async def upsert_user(telegram_id: int, name: Optional[str] = None, phone: Optio
             phone = COALESCE(excluded.phone, users.phone),
             lat = COALESCE(excluded.lat, users.lat),
             lon = COALESCE(excluded.lon, users.lon)
+        RETURNING *
         """, (telegram_id, name, phone, lat, lon))
+        row = await cursor.fetchone()
+        await db.commit()
+        return observe(dict(row))
+    finally:
+        await db.close()
+
+
+async def ensure_user(telegram_id: int, name: Optional[str] = None, role: Optional[str] = None) -> dict:
+    """
+    Get user, creating it (role 'pending') if missing, in one statement.
+    An existing name is kept; `role` overrides the stored role when given.
+    """
+    db = await get_db()
+    try:
+        cursor = await db.execute("""
+        INSERT INTO users (telegram_id, name, role)
+        VALUES (?, ?, COALESCE(?, 'pending'))
+        ON CONFLICT(telegram_id) DO UPDATE SET
+            role = COALESCE(?, users.role)
+        RETURNING *
+        """, (telegram_id, name, role, role))
+        row = await cursor.fetchone()
         await db.commit()
+        return observe(dict(row))
     finally:
         await db.close()
 
@@ -37,27 +64,79 @@ async def get_user(telegram_id: int) -> Optional[dict]:
         await db.close()
 
 
-async def update_user(telegram_id: int, **kwargs):
-    """Update user fields."""
+async def get_user_context(telegram_id: int) -> Tuple[Optional[dict], Optional[dict]]:
+    """User row and the user's shop row (None if no shop), in one joined statement."""
+    db = await get_db()
+    try:
+        cursor = await db.execute("""
+        SELECT u.*, NULL AS _butcher, b.*
+        FROM users u
+        LEFT JOIN butchers b ON b.user_id = u.id
+        WHERE u.telegram_id = ?
+        """, (telegram_id,))
+        row = await cursor.fetchone()
+        names = [d[0] for d in cursor.description]
+    finally:
+        await db.close()
+
+    if not row:
+        return None, None
+    split = names.index("_butcher")
+    user = dict(zip(names[:split], row[:split]))
+    butcher = dict(zip(names[split + 1:], row[split + 1:])) if row[split + 1] is not None else None
+    return user, butcher
+
+
+async def update_user(telegram_id: int, **kwargs) -> Optional[dict]:
+    """Update user fields. Returns the fresh row (None if user not found)."""
     if not kwargs:
-        return
+        return await get_user(telegram_id)
     
     db = await get_db()
     try:
         set_clause = ", ".join(f"{k} = ?" for k in kwargs.keys())
         values = list(kwargs.values()) + [telegram_id]
-        await db.execute(
-            f"UPDATE users SET {set_clause} WHERE telegram_id = ?",
+        cursor = await db.execute(
+            f"UPDATE users SET {set_clause} WHERE telegram_id = ? RETURNING *",
             values
         )
+        row = await cursor.fetchone()
         await db.commit()
+        return observe(dict(row)) if row else None
     finally:
         await db.close()
 
 
-async def set_role(telegram_id: int, role: str):
-    """Change user role."""
-    await update_user(telegram_id, role=role)
+async def set_role(telegram_id: int, role: str) -> Optional[dict]:
+    """Change user role. Returns the fresh row."""
+    return await update_user(telegram_id, role=role)
+
+
+async def grant_admin(telegram_id: int) -> dict:
+    """
+    Make the user an admin (creating the row if missing), dropping their shop,
+    in one transaction. Returns the fresh row.
+    """
+    db = await get_db()
+    try:
+        # Delete first: the shop delete trigger resets a 'butcher' role to pending
+        cursor = await db.execute(
+            "DELETE FROM butchers WHERE user_id = (SELECT id FROM users WHERE telegram_id = ?)",
+            (telegram_id,)
+        )
+        had_shop = cursor.rowcount > 0
+        cursor = await db.execute("""
+        INSERT INTO users (telegram_id, role) VALUES (?, 'admin')
+        ON CONFLICT(telegram_id) DO UPDATE SET role = 'admin'
+        RETURNING *
+        """, (telegram_id,))
+        row = await cursor.fetchone()
+        await db.commit()
+    finally:
+        await db.close()
+    if had_shop:
+        invalidate_inline()
+    return observe(dict(row))
 
 
 async def get_user_by_id(user_id: int) -> Optional[dict]:
@@ -77,22 +156,8 @@ async def get_user_by_id(user_id: int) -> Optional[dict]:
 
 
 async def get_user_counts() -> dict:
-    """Get user statistics."""
-    db = await get_db()
-    try:
-        counts = {"total": 0, "client": 0, "butcher": 0, "admin": 0}
-        
-        cursor = await db.execute("SELECT COUNT(*) FROM users")
-        counts["total"] = (await cursor.fetchone())[0]
-        
-        cursor = await db.execute("SELECT role, COUNT(*) FROM users GROUP BY role")
-        rows = await cursor.fetchall()
-        for row in rows:
-            counts[row[0]] = row[1]
-        
-        return counts
-    finally:
-        await db.close()
+    """Get user statistics (from trigger-maintained counters)."""
+    return (await get_statistics())["users"]
 
 
 async def get_all_users_by_role(role: Optional[str] = None) -> list:
@@ -121,31 +186,28 @@ async def is_registered(telegram_id: int) -> bool:
     return bool(user.get("name") and user.get("phone"))
 
 
-async def assign_reg_no(telegram_id: int) -> Tuple[int, bool]:
+async def assign_reg_no(telegram_id: int) -> Tuple[Optional[dict], bool]:
     """
     Assign registration number to user if not exists.
-    Returns (reg_no, is_newly_assigned).
+    Returns (user row, is_newly_assigned).
     """
     db = await get_db()
     try:
-        # Check if already has reg_no
-        cursor = await db.execute("SELECT reg_no FROM users WHERE telegram_id = ?", (telegram_id,))
+        # Single statement: MAX(reg_no) and the write are atomic
+        cursor = await db.execute("""
+        UPDATE users SET reg_no = (SELECT COALESCE(MAX(reg_no), 0) + 1 FROM users)
+        WHERE telegram_id = ? AND reg_no IS NULL
+        RETURNING *
+        """, (telegram_id,))
         row = await cursor.fetchone()
-        if row and row[0]:
-            return row[0], False
-
-        # Assign new reg_no atomically
-        # Get max reg_no
-        cursor = await db.execute("SELECT COALESCE(MAX(reg_no), 0) FROM users")
-        max_reg = (await cursor.fetchone())[0]
-        new_reg = max_reg + 1
-        
-        await db.execute(
-            "UPDATE users SET reg_no = ? WHERE telegram_id = ?",
-            (new_reg, telegram_id)
-        )
         await db.commit()
-        return new_reg, True
+        if row:
+            return dict(row), True
+
+        # Already numbered (or unknown user)
+        cursor = await db.execute("SELECT * FROM users WHERE telegram_id = ?", (telegram_id,))
+        row = await cursor.fetchone()
+        return (dict(row) if row else None), False
     finally:
         await db.close()
 
@@ -153,40 +215,22 @@ async def assign_reg_no(telegram_id: int) -> Tuple[int, bool]:
 async def delete_user_completely(telegram_id: int) -> bool:
     """
     Delete user and all related data from database.
+    Butcher profile and prices are removed by ON DELETE CASCADE.
     Returns True if user was found and deleted, False otherwise.
     """
     db = await get_db()
     try:
-        # 1. Get user by telegram_id
         cursor = await db.execute(
-            "SELECT id FROM users WHERE telegram_id = ?",
+            "DELETE FROM users WHERE telegram_id = ? RETURNING id",
             (telegram_id,)
         )
         row = await cursor.fetchone()
-        
-        if not row:
-            return False  # User not found
-        
-        user_id = row[0]
-        
-        # 2. Check if user is a butcher and delete related data
-        cursor = await db.execute(
-            "SELECT id FROM butchers WHERE user_id = ?",
-            (user_id,)
-        )
-        butcher_row = await cursor.fetchone()
-        
-        if butcher_row:
-            butcher_id = butcher_row[0]
-            # Delete prices
-            await db.execute("DELETE FROM prices WHERE butcher_id = ?", (butcher_id,))
-            # Delete butcher
-            await db.execute("DELETE FROM butchers WHERE id = ?", (butcher_id,))
-        
-        # 3. Delete user
-        await db.execute("DELETE FROM users WHERE id = ?", (user_id,))
-        
         await db.commit()
+        if row is None:
+            return False
+        forget(telegram_id)
+        # Their shop, if any, went with them
+        invalidate_inline()
         return True
     finally:
         await db.close()
@@ -194,10 +238,4 @@ async def delete_user_completely(telegram_id: int) -> bool:
 
 async def get_all_users_count() -> int:
     """Get total number of users."""
-    db = await get_db()
-    try:
-        cursor = await db.execute("SELECT COUNT(*) FROM users")
-        result = await cursor.fetchone()
-        return result[0] if result else 0
-    finally:
-        await db.close()
+    return (await get_counters("users:all"))["users:all"]
@@ -21,6 +21,7 @@ class ClientSearch(StatesGroup):
     waiting_radius = State()
     waiting_region = State()
     waiting_district = State()
+    waiting_query = State()
 
 
 class ButcherReg(StatesGroup):
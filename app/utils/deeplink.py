@@ -0,0 +1,37 @@
+"""Signed /start payloads: t.me/<bot>?start=b_<id>_<sig> opens a shop card."""
+import base64
+import hashlib
+import hmac
+import re
+from typing import Optional
+
+from app.config import DEEPLINK_SECRET
+
+_BUTCHER_PAYLOAD = re.compile(r"^b_(\d+)_([A-Za-z0-9_-]{8})$")
+
+
+def _sign(kind: str, object_id: int) -> str:
+    """8 url-safe chars of HMAC-SHA256: enough against guessing, short enough for start (64 max)."""
+    digest = hmac.new(DEEPLINK_SECRET.encode(), f"{kind}:{object_id}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest)[:8].decode()
+
+
+def butcher_payload(butcher_id: int) -> str:
+    """Start payload for a shop card."""
+    return f"b_{butcher_id}_{_sign('b', butcher_id)}"
+
+
+def butcher_link(bot_username: str, butcher_id: int) -> str:
+    """Deep link that opens the shop card in the bot."""
+    return f"https://t.me/{bot_username}?start={butcher_payload(butcher_id)}"
+
+
+def parse_butcher_payload(payload: Optional[str]) -> Optional[int]:
+    """Shop id from a start payload; None if it is not a (validly signed) shop link."""
+    match = _BUTCHER_PAYLOAD.match(payload or "")
+    if not match:
+        return None
+    butcher_id = int(match.group(1))
+    if not hmac.compare_digest(match.group(2), _sign("b", butcher_id)):
+        return None
+    return butcher_id
@@ -0,0 +1,192 @@
+"""In-process metrics with Prometheus text exposition."""
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in items
+    )
+    return "{" + body + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, doc: str):
+        self.name = name
+        self.doc = doc
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_fmt_labels(key)} {_fmt_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with labels."""
+
+    def __init__(self, name: str, doc: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _labels(labels)
+        series = self.values.get(key)
+        if series is None:
+            # [bucket counts..., +Inf count, sum]
+            series = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def summary(self, **labels) -> Tuple[int, float]:
+        """(count, sum) for one label set."""
+        series = self.values.get(_labels(labels))
+        if not series:
+            return 0, 0.0
+        return series[-2], series[-1]
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.values.items()):
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                lines.append(f"{self.name}_bucket{_fmt_labels(key, ('le', _fmt_value(bound)))} {count}")
+            lines.append(f"{self.name}_count{_fmt_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(series[-1])}")
+        return lines
+
+
+class Registry:
+    """Holds metrics and gauge callbacks, renders Prometheus text format."""
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+        self.gauges: Dict[str, Tuple[str, Callable[[], Dict[LabelKey, float]]]] = {}
+
+    def counter(self, name: str, doc: str) -> Counter:
+        if name not in self.metrics:
+            self.metrics[name] = Counter(name, doc)
+        return self.metrics[name]
+
+    def histogram(self, name: str, doc: str, buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        if name not in self.metrics:
+            self.metrics[name] = Histogram(name, doc, buckets)
+        return self.metrics[name]
+
+    def gauge(self, name: str, doc: str, read: Callable[[], object]):
+        """
+        Register a gauge read at scrape time.
+        `read` returns a number or a {label_dict_tuple: number} mapping.
+        """
+        self.gauges[name] = (doc, read)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.collect())
+        for name, (doc, read) in self.gauges.items():
+            try:
+                value = read()
+            except Exception:
+                continue
+            lines.append(f"# HELP {name} {doc}")
+            lines.append(f"# TYPE {name} gauge")
+            if isinstance(value, dict):
+                for key, v in sorted(value.items()):
+                    lines.append(f"{name}{_fmt_labels(key)} {_fmt_value(v)}")
+            else:
+                lines.append(f"{name} {_fmt_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HANDLER_LATENCY = REGISTRY.histogram(
+    "bot_handler_latency_seconds", "Handler execution time."
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "bot_handler_errors_total", "Exceptions raised by handlers."
+)
+UPDATES_TOTAL = REGISTRY.counter(
+    "bot_updates_total", "Updates received, by type."
+)
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "bot_db_query_seconds", "SQL statement execution time."
+)
+DB_BUSY_RETRIES_TOTAL = REGISTRY.counter(
+    "bot_db_busy_retries_total", "Statements retried after SQLITE_BUSY."
+)
+DB_BUSY_FAILURES = REGISTRY.counter(
+    "bot_db_busy_failures_total", "Statements that stayed locked after all retries."
+)
+
+
+def snapshot_text(limit: int = 10) -> str:
+    """Short human-readable summary of the slowest handlers for admins."""
+    rows = []
+    for key, series in HANDLER_LATENCY.values.items():
+        count, total = series[-2], series[-1]
+        if count:
+            rows.append((total / count, count, dict(key).get("handler", "?")))
+    rows.sort(reverse=True)
+
+    lines = ["📈 <b>Handler latency (avg)</b>"]
+    for avg, count, name in rows[:limit]:
+        lines.append(f"• <code>{name}</code>: {avg * 1000:.1f} ms × {count}")
+    if not rows:
+        lines.append("• hali ma'lumot yo'q")
+
+    errors = sum(HANDLER_ERRORS.values.values())
+    updates = sum(UPDATES_TOTAL.values.values())
+    queries = sum(series[-2] for series in DB_QUERY_LATENCY.values.values())
+    lines.append("")
+    lines.append(f"Updates: {int(updates)} | Errors: {int(errors)} | SQL: {queries}")
+    return "\n".join(lines)
+
+
+async def _metrics_view(request: web.Request) -> web.Response:
+    return web.Response(text=REGISTRY.render(), content_type="text/plain", charset="utf-8")
+
+
+async def start_metrics_server(host: str, port: int) -> web.AppRunner:
+    """Serve /metrics on host:port. Returns the runner for cleanup."""
+    app = web.Application()
+    app.router.add_get("/metrics", _metrics_view)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner
@@ -0,0 +1,83 @@
+"""Edit-in-place navigation: an inline menu message is redrawn on each tap instead of resent."""
+from typing import Optional
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, InputMediaPhoto, MaybeInaccessibleMessage, Message
+
+
+def _markup_key(markup: Optional[InlineKeyboardMarkup]) -> Optional[dict]:
+    # Received markups carry the bot in a private attribute, so == never matches
+    return markup.model_dump(exclude_none=True) if markup else None
+
+
+class Screen:
+    """One navigation view: text (or a photo with caption) and its inline keyboard."""
+    __slots__ = ("text", "reply_markup", "photo", "parse_mode")
+
+    def __init__(self, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None,
+                 photo: Optional[str] = None, parse_mode: Optional[str] = "HTML"):
+        self.text = text
+        self.reply_markup = reply_markup
+        self.photo = photo
+        self.parse_mode = parse_mode
+
+    def _shown_on(self, message: Message) -> bool:
+        """Whether `message` already shows exactly this screen."""
+        shown_photo = message.photo[-1].file_id if message.photo else None
+        if shown_photo != self.photo:
+            return False
+        if self.parse_mode == "HTML":
+            shown = message.html_text  # caption of a photo message, too
+        else:
+            shown = message.caption if self.photo else message.text
+        return shown == self.text and _markup_key(message.reply_markup) == _markup_key(self.reply_markup)
+
+    async def send(self, message: MaybeInaccessibleMessage) -> Message:
+        """Send the screen as a new message to the chat of `message`."""
+        if self.photo:
+            return await message.answer_photo(
+                self.photo, caption=self.text, parse_mode=self.parse_mode, reply_markup=self.reply_markup
+            )
+        return await message.answer(self.text, parse_mode=self.parse_mode, reply_markup=self.reply_markup)
+
+    async def _edit(self, message: Message):
+        if not self.photo:
+            return await message.edit_text(self.text, parse_mode=self.parse_mode, reply_markup=self.reply_markup)
+        if message.photo and message.photo[-1].file_id == self.photo:
+            return await message.edit_caption(
+                caption=self.text, parse_mode=self.parse_mode, reply_markup=self.reply_markup
+            )
+        # Text -> photo and photo -> another photo are both one editMessageMedia
+        return await message.edit_media(
+            InputMediaPhoto(media=self.photo, caption=self.text, parse_mode=self.parse_mode),
+            reply_markup=self.reply_markup,
+        )
+
+    async def show(self, message: MaybeInaccessibleMessage) -> Message:
+        """
+        Redraw `message` as this screen; returns the message now showing it.
+
+        One API call per step: nothing if the message already shows the screen,
+        otherwise one edit. Only when Telegram cannot edit the message (photo ->
+        text, since media can't be removed; deleted or inaccessible messages)
+        the screen is sent anew and the old message deleted after it, so the
+        chat never flashes empty.
+        """
+        if isinstance(message, Message):
+            if self._shown_on(message):
+                return message
+            # A photo message can't lose its photo; don't spend a call on the error
+            if not (message.photo and not self.photo):
+                try:
+                    edited = await self._edit(message)
+                    return edited if isinstance(edited, Message) else message
+                except TelegramBadRequest as e:
+                    if "message is not modified" in e.message:
+                        return message
+        sent = await self.send(message)
+        try:
+            await message.bot.delete_message(message.chat.id, message.message_id)
+        except TelegramBadRequest:
+            # Gone already or older than 48h: leave it
+            pass
+        return sent
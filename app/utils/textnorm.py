@@ -0,0 +1,61 @@
+"""Search keys for Uzbek names: one spelling for every way the name is typed."""
+import re
+import unicodedata
+
+# Uzbek/Russian Cyrillic -> Uzbek Latin (apostrophes are dropped afterwards)
+_CYRILLIC = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "д": "d", "е": "e", "ё": "yo", "ж": "j",
+    "з": "z", "и": "i", "й": "y", "к": "k", "л": "l", "м": "m", "н": "n", "о": "o",
+    "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f", "х": "x", "ц": "ts",
+    "ч": "ch", "ш": "sh", "щ": "sh", "ъ": "", "ы": "i", "ь": "", "э": "e", "ю": "yu",
+    "я": "ya", "ў": "o", "қ": "q", "ғ": "g", "ҳ": "h",
+}
+_TRANSLIT = str.maketrans(_CYRILLIC)
+
+# o' / g' and the tutuq belgisi, however they were typed
+_APOSTROPHES = re.compile("['‘’ʻʼ`´′]")
+_NON_WORD = re.compile(r"[\W_]+")
+
+# Fuzzy matches must share at least this share of the query's trigrams
+FUZZY_MIN_SIMILARITY = 0.5
+
+
+def search_key(text: str) -> str:
+    """Case-, apostrophe- and script-folded form: "Qo‘qon", "QO'QON", "Қўқон" -> "qoqon"."""
+    if not text:
+        return ""
+    text = text.casefold().translate(_TRANSLIT)
+    text = _APOSTROPHES.sub("", text)
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def trigrams(key: str) -> set:
+    """Trigrams of each word of a search key (words shorter than 3 are skipped)."""
+    return {word[i:i + 3] for word in key.split() for i in range(len(word) - 2)}
+
+
+def substring_query(key: str) -> str:
+    """FTS5 trigram query: every word (3+ chars) of the key occurs as a substring."""
+    return " AND ".join(f'"{word}"' for word in key.split() if len(word) >= 3)
+
+
+def fuzzy_query(key: str) -> str:
+    """FTS5 trigram query matching anything that shares a trigram with the key."""
+    return " OR ".join(f'"{gram}"' for gram in sorted(trigrams(key)))
+
+
+def similarity(query_key: str, key: str) -> float:
+    """Share of the query's trigrams found in `key` (1.0 = all of them)."""
+    wanted = trigrams(query_key)
+    if not wanted:
+        return 0.0
+    return len(wanted & trigrams(key or "")) / len(wanted)
+
+
+def best_fuzzy(query_key: str, rows: list) -> list:
+    """Rows (dicts with search_key) similar enough to the query, most similar first."""
+    scored = [(similarity(query_key, row["search_key"]), row) for row in rows]
+    scored = [item for item in scored if item[0] >= FUZZY_MIN_SIMILARITY]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [row for _, row in scored]
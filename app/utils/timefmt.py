@@ -0,0 +1,23 @@
+"""Render stored epoch timestamps."""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.config import TIMEZONE_OFFSET
+
+_TZ = timezone(timedelta(hours=TIMEZONE_OFFSET))
+
+
+def fmt_ts(ts: Optional[int], fmt: str = "%Y-%m-%d %H:%M") -> str:
+    """Format a Unix epoch (UTC) in the bot's timezone; '—' when missing."""
+    if ts is None or ts == "":
+        return "—"
+    return datetime.fromtimestamp(int(ts), _TZ).strftime(fmt)
+
+
+def local_day(ts: Optional[int] = None) -> int:
+    """Day number (days since epoch) in the bot's timezone; same formula as the rollup triggers."""
+    if ts is None:
+        ts = int(time.time())
+    return (int(ts) + TIMEZONE_OFFSET * 3600) // 86400
+
@@ -0,0 +1,268 @@
+"""
+Database inspection and health check.
+
+Opens the bot database read-only and reports row counts, table/index sizes
+and page usage, WAL size, fragmentation and data anomalies (orphaned
+prices/butchers, duplicate telegram_id). Sizes and row counts come from
+the dbstat virtual table (page headers only); anomaly checks on large
+tables are sampled unless --full is given.
+
+Usage:
+    python check_db.py [--db PATH] [--full] [--sample N] [--fix] [--vacuum]
+
+--fix deletes orphaned rows in a single transaction. --vacuum switches the
+file to incremental auto-vacuum with one full VACUUM (stop the bot first:
+it locks the database and needs free disk equal to its size).
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_DB = Path(__file__).resolve().parent / "data" / "bot.db"
+FULL_CHECK_ROWS = 200_000  # below this, anomaly checks are exhaustive anyway
+
+
+def connect_ro(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def human(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+
+
+def btree_stats(conn: sqlite3.Connection) -> dict:
+    """{name: {rows, pages, size, used}} for every table and index, via dbstat."""
+    stats = {}
+    try:
+        rows = conn.execute("""
+        SELECT name,
+               SUM(CASE WHEN pagetype = 'leaf' THEN ncell ELSE 0 END),
+               COUNT(*), SUM(pgsize), SUM(pgsize - unused)
+        FROM dbstat
+        GROUP BY name
+        """).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    for name, cells, pages, size, used in rows:
+        stats[name] = {"rows": cells, "pages": pages, "size": size, "used": used}
+    return stats
+
+
+def schema(conn: sqlite3.Connection):
+    tables, indexes = [], []
+    for type_, name, tbl in conn.execute(
+        "SELECT type, name, tbl_name FROM sqlite_master WHERE type IN ('table', 'index') ORDER BY tbl_name, name"
+    ):
+        if type_ == "table":
+            if not name.startswith("sqlite_"):
+                tables.append(name)
+        else:
+            indexes.append((name, tbl))
+    return tables, indexes
+
+
+def row_count(conn, table, stats, exact):
+    if exact or table not in stats:
+        return conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+    return stats[table]["rows"]
+
+
+def sampled_rowids(conn, table, sample):
+    lo, hi = conn.execute(f'SELECT MIN(rowid), MAX(rowid) FROM "{table}"').fetchone()
+    if lo is None:
+        return []
+    if hi - lo + 1 <= sample:
+        return list(range(lo, hi + 1))
+    return random.sample(range(lo, hi + 1), sample)
+
+
+def find_orphans(conn, child, fk, parent, counts, full, sample):
+    """(orphan_count, checked_rows, exhaustive) for child.fk -> parent.id."""
+    if full or counts.get(child, 0) <= FULL_CHECK_ROWS:
+        n = conn.execute(f"""
+        SELECT COUNT(*) FROM "{child}" c
+        WHERE c.{fk} IS NOT NULL AND NOT EXISTS (SELECT 1 FROM "{parent}" p WHERE p.id = c.{fk})
+        """).fetchone()[0]
+        return n, counts.get(child, 0), True
+
+    ids = sampled_rowids(conn, child, sample)
+    orphans = checked = 0
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        row = conn.execute(f"""
+        SELECT COUNT(*),
+               SUM(c.{fk} IS NOT NULL AND NOT EXISTS (SELECT 1 FROM "{parent}" p WHERE p.id = c.{fk}))
+        FROM "{child}" c WHERE c.rowid IN ({marks})
+        """, chunk).fetchone()
+        checked += row[0]
+        orphans += row[1] or 0
+    return orphans, checked, False
+
+
+def find_duplicate_telegram_ids(conn, full):
+    """Duplicate telegram_id values; skipped when a unique index guards the column."""
+    guarded = False
+    for _, name, unique, *_ in conn.execute("PRAGMA index_list(users)"):
+        cols = [r[2] for r in conn.execute(f'PRAGMA index_info("{name}")')]
+        if unique and cols == ["telegram_id"]:
+            guarded = True
+    if guarded and not full:
+        return None
+    return conn.execute("""
+    SELECT telegram_id, COUNT(*) FROM users GROUP BY telegram_id HAVING COUNT(*) > 1 LIMIT 20
+    """).fetchall()
+
+
+def fix(path: Path) -> dict:
+    """Delete orphaned rows in one transaction."""
+    conn = sqlite3.connect(str(path), isolation_level=None)
+    try:
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute("BEGIN IMMEDIATE")
+        prices = conn.execute(
+            "DELETE FROM prices WHERE NOT EXISTS (SELECT 1 FROM butchers b WHERE b.id = prices.butcher_id)"
+        ).rowcount
+        butchers = conn.execute(
+            "DELETE FROM butchers WHERE NOT EXISTS (SELECT 1 FROM users u WHERE u.id = butchers.user_id)"
+        ).rowcount
+        # Prices of the butchers just removed
+        prices += conn.execute(
+            "DELETE FROM prices WHERE NOT EXISTS (SELECT 1 FROM butchers b WHERE b.id = prices.butcher_id)"
+        ).rowcount
+        conn.execute("COMMIT")
+        return {"prices": prices, "butchers": butchers}
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+
+def vacuum(path: Path) -> tuple:
+    """Switch to incremental auto-vacuum and rebuild the file. Returns (size before, size after)."""
+    before = path.stat().st_size
+    conn = sqlite3.connect(str(path), isolation_level=None)
+    try:
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    return before, path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot database inspection and health check")
+    parser.add_argument("--db", type=Path, default=Path(os.getenv("DB_PATH", DEFAULT_DB)))
+    parser.add_argument("--full", action="store_true", help="exact counts and exhaustive anomaly checks")
+    parser.add_argument("--sample", type=int, default=20_000, help="rows sampled per check on large tables")
+    parser.add_argument("--fix", action="store_true", help="delete orphaned rows (single transaction)")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="switch to incremental auto-vacuum (full VACUUM; stop the bot first)")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"❌ Database not found: {args.db}")
+        return 2
+
+    started = time.perf_counter()
+    conn = connect_ro(args.db)
+    problems = 0
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = ("none", "full", "incremental")[conn.execute("PRAGMA auto_vacuum").fetchone()[0]]
+        wal = args.db.with_name(args.db.name + "-wal")
+        wal_size = wal.stat().st_size if wal.exists() else 0
+
+        print(f"📁 {args.db}")
+        print(f"   size {human(page_size * page_count)} | {page_count} pages × {page_size} B | "
+              f"WAL {human(wal_size)}")
+        print(f"   free pages {freelist} ({freelist / max(page_count, 1):.1%} of file) | auto_vacuum {auto_vacuum}")
+        if auto_vacuum != "incremental":
+            print("   ⚠️ maintenance can't return free pages: run with --vacuum (bot stopped)")
+
+        stats = btree_stats(conn)
+        if not stats:
+            print("⚠️ dbstat is not available in this SQLite build, falling back to COUNT(*)")
+        tables, indexes = schema(conn)
+
+        counts = {}
+        print("\n📊 Tables")
+        for table in tables:
+            counts[table] = row_count(conn, table, stats, args.full)
+            st = stats.get(table)
+            if st:
+                print(f"   {table:<22}{counts[table]:>12,} rows {human(st['size']):>10}"
+                      f"  fill {st['used'] / max(st['size'], 1):.0%}")
+            else:
+                print(f"   {table:<22}{counts[table]:>12,} rows")
+
+        print("\n🗂 Indexes")
+        stat1 = {}
+        try:
+            stat1 = {idx: s for _, idx, s in conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1")}
+        except sqlite3.OperationalError:
+            pass
+        for name, table in indexes:
+            st = stats.get(name)
+            selectivity = ""
+            if name in stat1:
+                parts = stat1[name].split()
+                if len(parts) > 1:
+                    selectivity = f"  ~{parts[1]} rows/key"
+            if st:
+                print(f"   {name:<34}{table:<12}{human(st['size']):>10}  fill {st['used'] / max(st['size'], 1):.0%}"
+                      f"{selectivity}")
+            else:
+                print(f"   {name:<34}{table:<12}{selectivity}")
+        if not stat1:
+            print("   (no sqlite_stat1: run ANALYZE / maintenance for planner statistics)")
+
+        print("\n🔎 Anomalies")
+        for child, fk, parent in (("prices", "butcher_id", "butchers"), ("butchers", "user_id", "users")):
+            if child not in counts or parent not in counts:
+                continue
+            orphans, checked, exhaustive = find_orphans(conn, child, fk, parent, counts, args.full, args.sample)
+            scope = "all rows" if exhaustive else f"sample of {checked:,}"
+            mark = "❌" if orphans else "✅"
+            print(f"   {mark} orphaned {child} ({fk} → {parent}): {orphans} [{scope}]")
+            problems += bool(orphans)
+
+        if "users" in counts:
+            dups = find_duplicate_telegram_ids(conn, args.full)
+            if dups is None:
+                print("   ✅ duplicate telegram_id: guarded by unique index (use --full to verify)")
+            elif dups:
+                problems += 1
+                print(f"   ❌ duplicate telegram_id: {', '.join(f'{t}×{n}' for t, n in dups)}")
+            else:
+                print("   ✅ duplicate telegram_id: none")
+    finally:
+        conn.close()
+
+    if args.fix:
+        removed = fix(args.db)
+        print(f"\n🛠 Fixed: removed {removed['prices']} orphaned prices, {removed['butchers']} orphaned butchers")
+
+    if args.vacuum:
+        print(f"\n🧹 VACUUM {args.db} (auto_vacuum → incremental)...")
+        before, after = vacuum(args.db)
+        print(f"   {human(before)} → {human(after)}")
+
+    print(f"\n⏱ {time.perf_counter() - started:.2f}s")
+    return 1 if problems and not args.fix else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())